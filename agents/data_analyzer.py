@@ -1,13 +1,16 @@
-import os
+from typing import Any
 
 from crewai import Agent
 from crewai_tools import FileReadTool
 
+from agents.llm import create_llm
 from tools.code_interpreter_tool import E2BCodeInterpreterTool
 
 
 def create_data_cleanup_agent(
-    file_read_tool: FileReadTool, code_interpreter: E2BCodeInterpreterTool
+    file_read_tool: FileReadTool,
+    code_interpreter: E2BCodeInterpreterTool,
+    llm: Any = None,
 ) -> Agent:
     """
     Creates a Data Cleanup agent specialized in initial data preparation and analysis.
@@ -27,13 +30,15 @@ def create_data_cleanup_agent(
         initial summary statistics and helping others understand the basic structure and
         characteristics of datasets.""",
         tools=[code_interpreter],
-        llm=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+        llm=create_llm(llm, role="Data Cleanup"),
         verbose=True,
     )
 
 
 def create_data_analyzer_agent(
-    file_read_tool: FileReadTool, code_interpreter: E2BCodeInterpreterTool
+    file_read_tool: FileReadTool,
+    code_interpreter: E2BCodeInterpreterTool,
+    llm: Any = None,
 ) -> Agent:
     """
     Creates a Data Analyzer agent specialized in statistical analysis and pattern finding.
@@ -53,6 +58,6 @@ def create_data_analyzer_agent(
         use libraries like pandas, numpy, scipy, matplotlib, seaborn, and scikit-learn to 
         extract valuable insights from any dataset.""",
         tools=[code_interpreter],
-        llm=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+        llm=create_llm(llm, role="Data Analyzer"),
         verbose=True,
     )
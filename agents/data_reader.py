@@ -1,13 +1,16 @@
-import os
+from typing import Any
 
 from crewai import Agent
 from crewai_tools import FileReadTool
 
+from agents.llm import create_llm
 from tools.code_interpreter_tool import E2BCodeInterpreterTool
 
 
 def create_data_reader_agent(
-    file_read_tool: FileReadTool, code_interpreter: E2BCodeInterpreterTool
+    file_read_tool: FileReadTool,
+    code_interpreter: E2BCodeInterpreterTool,
+    llm: Any = None,
 ) -> Agent:
     """
     Creates a Data Reader agent specialized in loading and parsing unknown datasets.
@@ -24,6 +27,6 @@ def create_data_reader_agent(
         understand how to properly load data from different sources. You're skilled
         at detecting file formats and correctly parsing different types of data files.""",
         tools=[file_read_tool, code_interpreter],
-        llm=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+        llm=create_llm(llm, role="Data Reader"),
         verbose=True,
     )
@@ -1,13 +1,16 @@
-import os
+from typing import Any
 
 from crewai import Agent
 from crewai_tools import FileReadTool
 
+from agents.llm import create_llm
 from tools.code_interpreter_tool import E2BCodeInterpreterTool
 
 
 def create_insight_generator_agent(
-    file_read_tool: FileReadTool, code_interpreter: E2BCodeInterpreterTool
+    file_read_tool: FileReadTool,
+    code_interpreter: E2BCodeInterpreterTool,
+    llm: Any = None,
 ) -> Agent:
     """
     Creates an Insight Generator agent specialized in interpreting analysis results.
@@ -27,6 +30,6 @@ def create_insight_generator_agent(
         patterns and correlations actually matter in a practical context and can
         explain technical findings to non-technical audiences.""",
         tools=[code_interpreter],
-        llm=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+        llm=create_llm(llm, role="Insight Generator"),
         verbose=True,
     )
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict
+
+from crewai import LLM
+
+from tools.cassette import Cassette, get_cassette
+from tools.result_cache import ResultCache
+
+# Model used by every agent unless LLM_MODEL says otherwise
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Seconds a cached reply stays valid unless LLM_CACHE_TTL says otherwise
+DEFAULT_CACHE_TTL = 7 * 24 * 3600
+
+
+def request_key(model: str, messages: Any, **params: Any) -> str:
+    """
+    Key of an LLM request: the model, every message (which carries the tool
+    transcript of the agent so far) and the sampling parameters.
+    """
+    material = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class CachedLLM(LLM):
+    """
+    An LLM whose replies are served from a disk cache or a cassette.
+
+    With a cache, identical requests within the TTL are answered without
+    calling the provider. With a recording cassette every reply is saved; with
+    a replaying one every reply comes from the cassette and the provider is
+    never called.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        cache: ResultCache | None = None,
+        ttl: float | None = DEFAULT_CACHE_TTL,
+        cassette: Cassette | None = None,
+        **kwargs: Any,
+    ):
+        """
+        Initialize the cached LLM.
+
+        Args:
+            model: Model name, as for `crewai.LLM`
+            cache: Disk cache of replies (None to disable)
+            ttl: Seconds a cached reply stays valid (None for no expiry)
+            cassette: Cassette to record replies to or replay them from
+            **kwargs: Other arguments of `crewai.LLM`
+        """
+        super().__init__(model=model, **kwargs)
+        self.cache = cache
+        self.ttl = ttl
+        self.cassette = cassette
+
+    def call(
+        self,
+        messages: Any,
+        tools: Any = None,
+        callbacks: Any = None,
+        available_functions: Any = None,
+    ) -> Any:
+        key = request_key(
+            self.model,
+            messages,
+            tools=tools,
+            stop=self.stop,
+            temperature=self.temperature,
+        )
+        if self.cassette is not None and self.cassette.replaying:
+            return self.cassette.load("llm", key)["response"]
+        if self.cache is not None:
+            entry = self.cache.get(key)
+            if entry is not None and (
+                self.ttl is None or time.time() - entry["stored_at"] < self.ttl
+            ):
+                return entry["response"]
+
+        response = super().call(messages, tools, callbacks, available_functions)
+        # Replies that ran tools through function calling aren't plain text
+        if isinstance(response, str):
+            entry = {
+                "model": self.model,
+                "response": response,
+                "stored_at": time.time(),
+            }
+            if self.cache is not None:
+                self.cache.put(key, entry)
+            if self.cassette is not None and self.cassette.recording:
+                self.cassette.save("llm", key, entry)
+        return response
+
+
+_caches: Dict[str, ResultCache] = {}
+
+
+def llm_cache_from_env() -> ResultCache | None:
+    """Reply cache in LLM_CACHE_DIR (bounded by LLM_CACHE_MAX_MB), or None when unset."""
+    directory = os.getenv("LLM_CACHE_DIR")
+    if not directory:
+        return None
+    # One cache per directory, shared by all agents, so eviction sees every entry
+    if directory not in _caches:
+        max_mb = float(os.getenv("LLM_CACHE_MAX_MB", "256"))
+        _caches[directory] = ResultCache(
+            directory, max_entries=100_000, max_bytes=int(max_mb * 1e6)
+        )
+    return _caches[directory]
+
+
+def create_llm(llm: Any = None, role: str | None = None) -> Any:
+    """
+    LLM of an agent: `llm` when given (a `ModelRouter` picks the model of
+    `role`), otherwise LLM_MODEL, wrapped in a `CachedLLM` when a reply cache
+    (LLM_CACHE_DIR) or a cassette is active.
+    """
+    if llm is not None:
+        # Imported here: routing builds on this module
+        from agents.routing import ModelRouter
+
+        return llm.llm_for(role) if isinstance(llm, ModelRouter) else llm
+    model = os.getenv("LLM_MODEL", DEFAULT_MODEL)
+    cassette = get_cassette()
+    # Cached replies would leave holes in a recording
+    cache = llm_cache_from_env() if cassette is None else None
+    if cache is None and cassette is None:
+        return model
+    ttl = float(os.getenv("LLM_CACHE_TTL", DEFAULT_CACHE_TTL)) or None
+    return CachedLLM(model, cache=cache, ttl=ttl, cassette=cassette)
@@ -1,13 +1,16 @@
-import os
+from typing import Any
 
 from crewai import Agent
 from crewai_tools import FileReadTool
 
+from agents.llm import create_llm
 from tools.code_interpreter_tool import E2BCodeInterpreterTool
 
 
 def create_time_series_model_predictor_agent(
-    file_read_tool: FileReadTool, code_interpreter: E2BCodeInterpreterTool
+    file_read_tool: FileReadTool,
+    code_interpreter: E2BCodeInterpreterTool,
+    llm: Any = None,
 ) -> Agent:
     """
     Creates a Time Series Model Predictor agent specialized in evaluating data for machine learning model suitability.
@@ -28,6 +31,6 @@ def create_time_series_model_predictor_agent(
         and you have deep knowledge of different time series models like ARIMA, Prophet, LSTM, and others.
         You understand seasonality, trends, and other time-dependent patterns in data.""",
         tools=[code_interpreter],
-        llm=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+        llm=create_llm(llm, role="Time Series Model Predictor"),
         verbose=True,
     )
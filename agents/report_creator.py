@@ -1,8 +1,9 @@
-import os
+from typing import Any
 
 from crewai import Agent
 from crewai_tools import FileReadTool, FileWriterTool
 
+from agents.llm import create_llm
 from tools.code_interpreter_tool import E2BCodeInterpreterTool
 
 
@@ -10,6 +11,7 @@ def create_report_creator_agent(
     file_read_tool: FileReadTool,
     file_write_tool: FileWriterTool,
     code_interpreter: E2BCodeInterpreterTool,
+    llm: Any = None,
 ) -> Agent:
     """
     Creates a Report Creator agent specialized in generating final outputs.
@@ -29,6 +31,6 @@ def create_report_creator_agent(
         that highlight key insights and can structure information logically to guide the
         reader through complex analyses to clear conclusions.""",
         tools=[file_write_tool],
-        llm=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+        llm=create_llm(llm, role="Report Creator"),
         verbose=True,
     )
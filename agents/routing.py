@@ -0,0 +1,248 @@
+"""
+Per-agent model routing.
+
+A routing configuration assigns a model to each agent role, optionally with
+a latency and a token budget for the agent's stage. Once a stage goes over
+either budget, its remaining LLM calls go to a faster fallback model, so
+mechanical stages (loading a CSV) don't hold the run up while analytic ones
+keep the stronger model. The configuration is JSON, given inline or as a
+file path in LLM_ROUTES:
+
+    {
+        "default": "gpt-4o-mini",
+        "fallback": "gpt-4o-mini",
+        "agents": {
+            "Data Reader": {"model": "gpt-4o-mini", "latency_budget": 30},
+            "Insight Generator": {
+                "model": "gpt-4o",
+                "latency_budget": 300,
+                "token_budget": 60000
+            }
+        }
+    }
+
+Roles not listed use "default" (LLM_MODEL when omitted). A route's fallback
+defaults to the configuration's "fallback".
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from agents.llm import (
+    DEFAULT_CACHE_TTL,
+    DEFAULT_MODEL,
+    CachedLLM,
+    llm_cache_from_env,
+)
+from tools.cassette import Cassette, get_cassette
+from tools.result_cache import ResultCache
+from tools.result_encoder import estimate_tokens
+
+
+@dataclass
+class ModelRoute:
+    """Model of an agent role and the budgets of its stage."""
+
+    model: str
+    fallback: str | None = None
+    # Seconds from the stage's first LLM call after which it falls back
+    latency_budget: float | None = None
+    # Estimated prompt and completion tokens after which it falls back
+    token_budget: int | None = None
+
+
+class ModelUsage:
+    """LLM calls, time and estimated tokens per agent role and model."""
+
+    def __init__(self):
+        self.roles: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.fallbacks: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def record(self, role: str, model: str, seconds: float, tokens: int) -> None:
+        with self._lock:
+            entry = self.roles.setdefault(role, {}).setdefault(
+                model, {"calls": 0, "seconds": 0.0, "tokens": 0}
+            )
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+            entry["tokens"] += tokens
+
+    def fell_back(self, role: str, reason: str) -> None:
+        with self._lock:
+            self.fallbacks[role] = reason
+
+    def summary(self, role: str) -> str:
+        """Models a role used, e.g. "gpt-4o 6 call(s), 41.2s, ~18.3k tokens"."""
+        with self._lock:
+            models = dict(self.roles.get(role, {}))
+            reason = self.fallbacks.get(role)
+        used = "; ".join(
+            f"{model} {entry['calls']} call(s), {entry['seconds']:.1f}s, "
+            f"~{entry['tokens'] / 1e3:.1f}k tokens"
+            for model, entry in models.items()
+        )
+        return (used or "no LLM calls") + (f" (fell back: {reason})" if reason else "")
+
+
+class RoutedLLM(CachedLLM):
+    """An LLM following a route, switching to its fallback once over budget."""
+
+    def __init__(
+        self,
+        role: str,
+        route: ModelRoute,
+        usage: ModelUsage,
+        cache: ResultCache | None = None,
+        ttl: float | None = DEFAULT_CACHE_TTL,
+        cassette: Cassette | None = None,
+        **kwargs: Any,
+    ):
+        """
+        Initialize the routed LLM.
+
+        Args:
+            role: Role of the agent using the LLM
+            route: Model and budgets of the role
+            usage: Usage record shared by the run's agents
+            cache: Disk cache of replies (None to disable)
+            ttl: Seconds a cached reply stays valid (None for no expiry)
+            cassette: Cassette to record replies to or replay them from
+            **kwargs: Other arguments of `crewai.LLM`
+        """
+        super().__init__(route.model, cache=cache, ttl=ttl, cassette=cassette, **kwargs)
+        self.role = role
+        self.route = route
+        self.usage = usage
+        self.started: float | None = None
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    def _over_budget(self) -> str | None:
+        route = self.route
+        # Replays run faster than the recording, so only tokens decide there
+        if (
+            route.latency_budget is not None
+            and self.cassette is None
+            and time.perf_counter() - self.started > route.latency_budget
+        ):
+            return f"over the {route.latency_budget:g}s latency budget"
+        if route.token_budget is not None and self.tokens > route.token_budget:
+            return f"over the {route.token_budget} token budget"
+        return None
+
+    def call(
+        self,
+        messages: Any,
+        tools: Any = None,
+        callbacks: Any = None,
+        available_functions: Any = None,
+    ) -> Any:
+        with self._lock:
+            if self.started is None:
+                self.started = time.perf_counter()
+            fallback = self.route.fallback
+            if fallback and self.model != fallback:
+                reason = self._over_budget()
+                if reason is not None:
+                    print(
+                        f"{self.role} is {reason}, switching from {self.model} "
+                        f"to {fallback}"
+                    )
+                    self.usage.fell_back(self.role, reason)
+                    self.model = fallback
+            model = self.model
+
+        started = time.perf_counter()
+        response = super().call(messages, tools, callbacks, available_functions)
+        tokens = estimate_tokens(str(messages)) + estimate_tokens(str(response))
+        with self._lock:
+            self.tokens += tokens
+        self.usage.record(self.role, model, time.perf_counter() - started, tokens)
+        return response
+
+
+def _route(value: Any, default_fallback: str | None) -> ModelRoute:
+    if isinstance(value, str):
+        return ModelRoute(model=value, fallback=default_fallback)
+    if not isinstance(value, dict) or "model" not in value:
+        raise ValueError(f"A model route needs a 'model': {value!r}")
+    return ModelRoute(
+        model=value["model"],
+        fallback=value.get("fallback", default_fallback),
+        latency_budget=value.get("latency_budget"),
+        token_budget=value.get("token_budget"),
+    )
+
+
+class ModelRouter:
+    """
+    Routes of every agent role, and the usage of the run's routed LLMs.
+
+    Passed to the agent factories as their `llm`, it gives each agent a
+    `RoutedLLM` for its role.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize the router.
+
+        Args:
+            config: Routing configuration (see the module docstring)
+        """
+        fallback = config.get("fallback")
+        self.default = _route(
+            config.get("default") or os.getenv("LLM_MODEL", DEFAULT_MODEL), fallback
+        )
+        self.routes = {
+            role: _route(value, fallback)
+            for role, value in config.get("agents", {}).items()
+        }
+        self.usage = ModelUsage()
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter | None":
+        """Router of LLM_ROUTES (inline JSON or a JSON file), or None when unset."""
+        routes = os.getenv("LLM_ROUTES", "").strip()
+        if not routes:
+            return None
+        if not routes.startswith("{"):
+            with open(routes, encoding="utf-8") as f:
+                routes = f.read()
+        try:
+            return cls(json.loads(routes))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"LLM_ROUTES is not valid JSON: {e}") from e
+
+    def route(self, role: str | None) -> ModelRoute:
+        return self.routes.get(role, self.default)
+
+    def llm_for(self, role: str | None) -> RoutedLLM:
+        """A new LLM following the route of `role`."""
+        cassette = get_cassette()
+        # Cached replies would leave holes in a recording
+        cache = llm_cache_from_env() if cassette is None else None
+        ttl = float(os.getenv("LLM_CACHE_TTL", DEFAULT_CACHE_TTL)) or None
+        return RoutedLLM(
+            role or "agent",
+            self.route(role),
+            self.usage,
+            cache=cache,
+            ttl=ttl,
+            cassette=cassette,
+        )
+
+    def report(self, stages: Dict[str, str]) -> List[str]:
+        """
+        One line per stage with the models its agent used.
+
+        Args:
+            stages: Mapping of stage (task) name to the role of its agent
+        """
+        return [
+            f"{stage}: {self.usage.summary(role)}" for stage, role in stages.items()
+        ]
@@ -0,0 +1,123 @@
+import json
+import re
+import threading
+import time
+from typing import Any, Dict, List
+
+from crewai import LLM
+
+from tools.result_encoder import estimate_tokens
+
+# Cells each agent runs before giving its final answer
+DEFAULT_SCRIPT: Dict[str, List[str]] = {
+    "Data Reader": [
+        "import pandas as pd\ndf = pd.read_csv(DATASET_PATH)\ndf.head()",
+        "df.info()",
+    ],
+    "Data Cleanup": [
+        "df = df.drop_duplicates()\ndf = df.dropna(how='all')",
+        "df.describe()",
+    ],
+    "Data Analyzer": [
+        "df.describe(include='all')",
+        "df.select_dtypes('number').corr()",
+    ],
+    "Insight Generator": ["df.select_dtypes('number').mean()"],
+    "Time Series Model Predictor": [
+        "df.select_dtypes('number').rolling(7).mean().tail()"
+    ],
+    "Report Creator": [],
+}
+
+_ROLE = re.compile(r"You are ([^.\n]+)\.")
+
+
+class ScriptedLLM(LLM):
+    """
+    An LLM that replays a fixed script instead of calling a model.
+
+    Each agent (recognized by the role in its system prompt) runs the cells of
+    its script through the code interpreter, one per call, then returns a final
+    answer of `answer_chars` characters. The prompt size of every call is
+    recorded in `calls`, so benchmarks can report context growth per agent.
+    """
+
+    def __init__(
+        self,
+        script: Dict[str, List[str]] | None = None,
+        answer_chars: int = 2000,
+        latency: float = 0.0,
+    ):
+        """
+        Initialize the scripted LLM.
+
+        Args:
+            script: Cells run by each agent role (defaults to `DEFAULT_SCRIPT`)
+            answer_chars: Length of every final answer
+            latency: Seconds each call sleeps, to simulate model latency
+        """
+        super().__init__(model="scripted")
+        self.script = DEFAULT_SCRIPT if script is None else script
+        self.answer_chars = answer_chars
+        self.latency = latency
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        messages: Any,
+        tools: Any = None,
+        callbacks: Any = None,
+        available_functions: Any = None,
+    ) -> str:
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        match = _ROLE.search(prompt)
+        role = match.group(1) if match else "unknown"
+        step = prompt.count("\nObservation:")
+
+        with self._lock:
+            self.calls.append(
+                {
+                    "role": role,
+                    "step": step,
+                    "prompt_chars": len(prompt),
+                    "prompt_tokens": estimate_tokens(prompt),
+                }
+            )
+        if self.latency:
+            time.sleep(self.latency)
+
+        cells = self.script.get(role, [])
+        if step < len(cells):
+            return (
+                f"Thought: I need to run step {step + 1} of the analysis.\n"
+                "Action: code_interpreter\n"
+                f"Action Input: {json.dumps({'code': cells[step]})}"
+            )
+        body = f"{role} findings. " * (self.answer_chars // (len(role) + 11) + 1)
+        return (
+            "Thought: I now know the final answer\n"
+            f"Final Answer: {body[: self.answer_chars]}"
+        )
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 128_000
+
+    def context_sizes(self) -> Dict[str, Dict[str, int]]:
+        """Calls and largest prompt (in estimated tokens) per agent role."""
+        sizes: Dict[str, Dict[str, int]] = {}
+        for call in self.calls:
+            entry = sizes.setdefault(call["role"], {"calls": 0, "max_prompt_tokens": 0})
+            entry["calls"] += 1
+            entry["max_prompt_tokens"] = max(
+                entry["max_prompt_tokens"], call["prompt_tokens"]
+            )
+        return sizes
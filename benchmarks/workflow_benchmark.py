@@ -0,0 +1,261 @@
+"""
+Offline benchmark of the full six-task workflow.
+
+Runs `DataAnalysisWorkflow` against a scripted LLM and in-memory fake
+sandboxes, so only the orchestration overhead is measured: profiling, uploads,
+task scheduling, tool encoding and prompt growth. Datasets are synthesized by
+repeating the rows of data/grocery.csv.
+
+    python -m benchmarks.workflow_benchmark --scales 10 100 1000 --output bench.json
+    python -m benchmarks.workflow_benchmark --baseline bench.json  # fails on regressions
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from benchmarks.fake_llm import ScriptedLLM
+from tools.execution import Execution, Logs, Result
+from tools.fake_sandbox import FakeSandbox
+from tools.kernel_state import SNAPSHOT_PATH
+from tools.sandbox_pool import SandboxPool
+from tools.tracing import get_tracer
+from workflow.config import WorkflowConfig
+from workflow.data_analysis_workflow import DataAnalysisWorkflow
+
+SOURCE_DATASET = "data/grocery.csv"
+DATA_DIR = ".benchmark_data"
+DEFAULT_SCALES = [10, 100, 1000]
+
+# Stages slower than baseline by more than the tolerance, and by at least this
+# many seconds, are reported as regressions
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def scaled_dataset(
+    scale: int, source: str = SOURCE_DATASET, directory: str = DATA_DIR
+) -> str:
+    """Write (once) a copy of `source` with its rows repeated `scale` times."""
+    os.makedirs(directory, exist_ok=True)
+    name, extension = os.path.splitext(os.path.basename(source))
+    path = os.path.join(directory, f"{name}_x{scale}{extension}")
+    if not os.path.exists(path):
+        with open(source, "rb") as f:
+            header = f.readline()
+            body = f.read()
+        if not body.endswith(b"\n"):
+            body += b"\n"
+        with open(path + ".tmp", "wb") as f:
+            f.write(header)
+            for _ in range(scale):
+                f.write(body)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def fake_sandbox_factory(output_chars: int) -> Callable[[], FakeSandbox]:
+    """Fake sandboxes answering every cell with `output_chars` of stdout and a text result."""
+
+    def factory() -> FakeSandbox:
+        sandbox = FakeSandbox()
+
+        def handler(code: str) -> Execution:
+            # Let forked tools clone the (empty) kernel state
+            if "_snapshot_kernel" in code:
+                sandbox.files.write(SNAPSHOT_PATH, b"")
+            return Execution(
+                results=[Result(text="x" * (output_chars // 2), is_main_result=True)],
+                logs=Logs(stdout=["y" * (output_chars // 2)]),
+            )
+
+        sandbox.handler = handler
+        return sandbox
+
+    return factory
+
+
+def _peak_mb() -> float:
+    return tracemalloc.get_traced_memory()[1] / 1e6
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1e6 if sys.platform == "darwin" else rss / 1e3
+
+
+def run_once(
+    scale: int,
+    llm_latency: float = 0.0,
+    output_chars: int = 2000,
+    answer_chars: int = 2000,
+    quiet: bool = True,
+) -> Dict[str, Any]:
+    """
+    Run the workflow once on the dataset scaled `scale` times.
+
+    Returns:
+        Timings per stage, memory high-water marks and prompt sizes per agent
+    """
+    dataset_path = scaled_dataset(scale)
+    pool = SandboxPool(factory=fake_sandbox_factory(output_chars), max_size=4)
+    llm = ScriptedLLM(answer_chars=answer_chars, latency=llm_latency)
+    output = io.StringIO() if quiet else sys.stdout
+
+    # Spilled outputs go to a scratch directory, not the shared ./artifacts
+    artifact_dir = tempfile.TemporaryDirectory(prefix="benchmark-artifacts-")
+
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(output):
+            started = time.perf_counter()
+            workflow = DataAnalysisWorkflow(
+                dataset_path=dataset_path,
+                config=WorkflowConfig(
+                    backend="fake",
+                    memory=False,
+                    checkpoint=False,
+                    trace_path="",
+                    artifact_dir=artifact_dir.name,
+                ),
+                sandbox_pool=pool,
+                llm=llm,
+            )
+            setup_seconds = time.perf_counter() - started
+            setup_peak = _peak_mb()
+
+            tracemalloc.reset_peak()
+            started = time.perf_counter()
+            workflow.run()
+            run_seconds = time.perf_counter() - started
+            run_peak = _peak_mb()
+    finally:
+        tracemalloc.stop()
+        pool.close()
+        artifact_dir.cleanup()
+
+    stages: Dict[str, float] = {}
+    for span in get_tracer().finished(workflow.span.trace_id):
+        stages[span.name] = round(stages.get(span.name, 0.0) + span.seconds, 4)
+
+    return {
+        "scale": scale,
+        "dataset_bytes": os.path.getsize(dataset_path),
+        "rows": workflow.profile["shape"][0] if workflow.profile else None,
+        "setup_seconds": round(setup_seconds, 4),
+        "run_seconds": round(run_seconds, 4),
+        "stages": stages,
+        "memory_mb": {
+            "setup_peak": round(setup_peak, 1),
+            "run_peak": round(run_peak, 1),
+            "max_rss": round(_max_rss_mb(), 1),
+        },
+        "context": llm.context_sizes(),
+        "llm_calls": len(llm.calls),
+        "encoder": workflow.code_interpreter.result_encoder.stats,
+    }
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float
+) -> List[str]:
+    """List the stages and memory peaks that regressed against a baseline run."""
+    regressions = []
+    previous = {run["scale"]: run for run in baseline}
+    for run in results:
+        base = previous.get(run["scale"])
+        if base is None:
+            continue
+        metrics = {"setup": (run["setup_seconds"], base["setup_seconds"])}
+        metrics["run"] = (run["run_seconds"], base["run_seconds"])
+        for name, seconds in run["stages"].items():
+            if name in base["stages"]:
+                metrics[name] = (seconds, base["stages"][name])
+        for name, (now, then) in metrics.items():
+            if now > then * (1 + tolerance) and now - then >= MIN_REGRESSION_SECONDS:
+                regressions.append(f"x{run['scale']} {name}: {then:.3f}s -> {now:.3f}s")
+        for name, now in run["memory_mb"].items():
+            then = base["memory_mb"].get(name)
+            if name != "max_rss" and then and now > then * (1 + tolerance):
+                regressions.append(
+                    f"x{run['scale']} {name} memory: {then:.1f} MB -> {now:.1f} MB"
+                )
+    return regressions
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    for run in results:
+        print(
+            f"x{run['scale']}: {run['dataset_bytes'] / 1e6:.1f} MB, {run['rows']} rows, "
+            f"setup {run['setup_seconds']:.2f}s, run {run['run_seconds']:.2f}s, "
+            f"peak {run['memory_mb']['setup_peak']:.1f}/{run['memory_mb']['run_peak']:.1f} MB"
+        )
+        for name, seconds in sorted(run["stages"].items(), key=lambda item: -item[1]):
+            print(f"    {name:<32} {seconds:8.3f}s")
+        for role, sizes in run["context"].items():
+            print(
+                f"    context {role:<24} {sizes['calls']} call(s), "
+                f"max {sizes['max_prompt_tokens']} tokens"
+            )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Runs per scale (best is kept)"
+    )
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument(
+        "--output-chars", type=int, default=2000, help="Sandbox output per cell"
+    )
+    parser.add_argument(
+        "--answer-chars", type=int, default=2000, help="Final answer length"
+    )
+    parser.add_argument("--output", type=str, default=None, help="Save results as JSON")
+    parser.add_argument(
+        "--baseline", type=str, default=None, help="Results to compare against"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--verbose", action="store_true", help="Show the crew's output")
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        runs = [
+            run_once(
+                scale,
+                llm_latency=args.llm_latency,
+                output_chars=args.output_chars,
+                answer_chars=args.answer_chars,
+                quiet=not args.verbose,
+            )
+            for _ in range(max(1, args.repeat))
+        ]
+        results.append(
+            min(runs, key=lambda run: run["setup_seconds"] + run["run_seconds"])
+        )
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
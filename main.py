@@ -1,12 +1,43 @@
 import argparse
+import os
+import time
 
 from dotenv import load_dotenv
 
-from workflow.data_analysis_workflow import DataAnalysisWorkflow
+# CrewAI, its tools and the E2B client take seconds to import, so the workflow
+# is only imported once the arguments are known to be valid
+from workflow.config import WorkflowConfig
+from workflow.context_compaction import DEFAULT_CONTEXT_BUDGET
+from workflow.report import REPORT_EXTENSIONS
+
+STARTED = time.perf_counter()
 
 # Load environment variables
 load_dotenv()
 
+# Seconds from process start until the crew can start working, before a
+# warning is printed
+DEFAULT_STARTUP_BUDGET = 5.0
+
+
+def report_startup(marks, boot, budget: float) -> None:
+    """Print how long each startup phase took and warn when over budget."""
+    BLUE, YELLOW, RESET = "\033[94m", "\033[93m", "\033[0m"
+    phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in marks)
+    if boot is not None and boot.boot_seconds is not None:
+        phases += f" (sandbox boot {boot.boot_seconds:.2f}s"
+        if boot.upload_seconds is not None:
+            phases += f", dataset upload {boot.upload_seconds:.2f}s"
+        phases += " in the background)"
+    total = marks[-1][1]
+    if budget and total > budget:
+        print(
+            f"{YELLOW}Startup took {total:.2f}s, over the {budget:.1f}s budget: "
+            f"{phases}{RESET}"
+        )
+    else:
+        print(f"{BLUE}Startup: {phases}{RESET}")
+
 
 def setup_argparse():
     """Set up command line argument parsing."""
@@ -24,8 +55,8 @@ def setup_argparse():
         "--output",
         "-o",
         type=str,
-        help="Path to save the output report (default: output.md)",
-        default="output.md",
+        help="Path to save the output report (default: output.md, .json or .html by format)",
+        default=None,
     )
     parser.add_argument(
         "--format",
@@ -35,13 +66,200 @@ def setup_argparse():
         default="markdown",
         help="Output format for the report (default: markdown)",
     )
+    parser.add_argument(
+        "--backend",
+        "-b",
+        type=str,
+        choices=["e2b", "local"],
+        default=None,
+        help="Where to run generated code: E2B cloud sandbox or a local kernel (default: $CODE_INTERPRETER_BACKEND or e2b)",
+    )
+    parser.add_argument(
+        "--context-budget",
+        type=int,
+        default=None,
+        help=f"Compact each task's output to this many tokens in later tasks' context, e.g. {DEFAULT_CONTEXT_BUDGET} (default: outputs are passed verbatim)",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Run independent tasks concurrently, each in its own sandbox",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Save each task's output and the kernel state, so the run can be resumed with --resume",
+    )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        default=None,
+        help="Save a trace of the run as JSONL (.jsonl) or OpenTelemetry JSON (default: $TRACE_PATH)",
+    )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        default=None,
+        help="Analyze many datasets: a glob pattern, a directory or a manifest file (.manifest/.lst)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=2,
+        help="Number of datasets analyzed at once in batch mode (default: 2)",
+    )
+    parser.add_argument(
+        "--batch-output",
+        type=str,
+        default="batch_results",
+        help="Directory for per-dataset results and the batch summary (default: batch_results)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted run made with --checkpoint, skipping the tasks it completed",
+    )
+    parser.add_argument(
+        "--run-dir",
+        type=str,
+        default=None,
+        help="Directory of the run's checkpoints, implies --checkpoint; one subdirectory per dataset with --batch (default: runs/<dataset>-<hash>)",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Upload a typed Parquet copy of the dataset (requires pyarrow); the original is uploaded only when needed",
+    )
+    parser.add_argument(
+        "--no-report-agent",
+        action="store_true",
+        help="Skip the Report Creator agent; the report is rendered from the other agents' outputs",
+    )
+    parser.add_argument(
+        "--memory",
+        type=str,
+        choices=["off", "bounded", "local", "crewai"],
+        default=None,
+        help="Crew memory: off, an in-process store, a local embedded index (requires fastembed) or CrewAI's memory (default: $MEMORY_MODE or crewai)",
+    )
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument(
+        "--record",
+        type=str,
+        default=None,
+        metavar="DIR",
+        help="Record every LLM reply and sandbox execution of the run to a cassette directory",
+    )
+    cassette.add_argument(
+        "--replay",
+        type=str,
+        default=None,
+        metavar="DIR",
+        help="Replay a recorded run from its cassette, without any network access",
+    )
     return parser
 
 
+def setup_cassette(args):
+    """Activate the cassette of --record/--replay, returning it (or None)."""
+    if not (args.record or args.replay):
+        return None
+    from tools.cassette import Cassette, set_cassette
+
+    cassette = (
+        Cassette(args.record, "record")
+        if args.record
+        else Cassette(args.replay, "replay")
+    )
+    set_cassette(cassette)
+    if args.replay:
+        args.backend = "replay"
+    # Results served from the cell cache would be missing from the recording
+    os.environ.pop("CODE_INTERPRETER_CACHE_DIR", None)
+    return cassette
+
+
+def workflow_config(args, memory) -> WorkflowConfig:
+    """Options of the workflow(s), shared by single and batch runs."""
+    return WorkflowConfig(
+        output_format=args.format,
+        output_path=args.output,
+        report_llm=not args.no_report_agent,
+        backend=args.backend,
+        columnar=args.columnar,
+        parallel=args.parallel,
+        memory=memory,
+        context_budget=args.context_budget or None,
+        checkpoint=args.checkpoint or args.run_dir is not None,
+        run_dir=args.run_dir,
+        resume=args.resume,
+        trace_path=args.trace,
+    )
+
+
+def main_batch(args, config: WorkflowConfig, cassette):
+    """Analyze every dataset of a batch and print the throughput."""
+    from workflow.batch import resolve_datasets, run_batch
+
+    BLUE, RESET = "\033[94m", "\033[0m"
+    datasets = resolve_datasets(args.batch)
+    concurrency = args.concurrency
+    if cassette is not None and concurrency > 1:
+        # Sandboxes are keyed by creation order, which concurrent workflows
+        # would make differ between recording and replay
+        print(f"{BLUE}Analyzing one dataset at a time under --{cassette.mode}{RESET}")
+        concurrency = 1
+    print(
+        f"{BLUE}Starting batch analysis of {len(datasets)} datasets "
+        f"({concurrency} at a time)...{RESET}"
+    )
+    summary = run_batch(
+        datasets,
+        output_dir=args.batch_output,
+        concurrency=concurrency,
+        config=config,
+        trace_path=args.trace,
+    )
+    if cassette is not None:
+        print(f"{BLUE}{cassette.summary()}{RESET}")
+    print(
+        f"{BLUE}Batch complete: {summary['succeeded']}/{summary['datasets']} succeeded "
+        f"in {summary['seconds']}s ({summary['datasets_per_hour']} datasets/hour). "
+        f"Results saved to {args.batch_output}{RESET}"
+    )
+
+
 def main():
     """Main entry point for the application."""
     parser = setup_argparse()
     args = parser.parse_args()
+    if args.batch and args.output:
+        parser.error("--output does not apply to --batch; use --batch-output")
+    if not args.batch:
+        args.output = args.output or f"output{REPORT_EXTENSIONS[args.format]}"
+    cassette = setup_cassette(args)
+    memory = args.memory or os.getenv("MEMORY_MODE", "crewai")
+    if cassette is not None and memory == "crewai":
+        # CrewAI's memory calls an embedding API a replay can't reproduce
+        memory = "off"
+    config = workflow_config(args, memory)
+    if args.batch:
+        return main_batch(args, config, cassette)
+    marks = [("arguments", time.perf_counter() - STARTED)]
+
+    # Boot the sandbox and upload the dataset while the crew is being built
+    from tools.sandbox_boot import SandboxBoot
+
+    boot = None
+    try:
+        # With --columnar the workflow uploads the converted dataset itself
+        boot = SandboxBoot(
+            backend=args.backend,
+            dataset_path=None if args.columnar else args.dataset,
+        )
+    except Exception as e:
+        print(f"Booting the sandbox with the workflow instead: {e}")
 
     # Print welcome message
     BLUE, RESET = "\033[94m", "\033[0m"
@@ -50,9 +268,21 @@ def main():
     print(f"{BLUE}Output will be saved to: {args.output}{RESET}")
 
     try:
+        from workflow.data_analysis_workflow import DataAnalysisWorkflow
+
+        marks.append(("imports", time.perf_counter() - STARTED))
+
         # Create and run the data analysis workflow
         workflow = DataAnalysisWorkflow(
-            dataset_path=args.dataset, output_format=args.format
+            dataset_path=args.dataset,
+            config=config,
+            sandbox_boot=boot,
+        )
+        marks.append(("workflow ready", time.perf_counter() - STARTED))
+        report_startup(
+            marks,
+            boot,
+            float(os.getenv("STARTUP_BUDGET_SECONDS", DEFAULT_STARTUP_BUDGET)),
         )
         results = workflow.run()
         for result in results.tasks_output:
@@ -70,10 +300,15 @@ def main():
                 with open("insight_results", 'w') as f:
                     f.write(insight_results.raw)
 
+        if cassette is not None:
+            print(f"{BLUE}{cassette.summary()}{RESET}")
         print(f"{BLUE}Analysis complete! Results saved to {args.output}{RESET}")
 
     except Exception as e:
         print(f"Error during analysis: {e}")
+        # Hand back a sandbox the workflow never got to take over
+        if boot is not None:
+            boot.cancel()
         raise
 
 
@@ -1,13 +1,32 @@
 from crewai import Agent, Task
 
 
-def create_data_reading_task(agent: Agent, dataset_path: str) -> Task:
+def _profile_section(profile: str | None) -> str:
+    """Task description paragraph carrying the precomputed dataset profile."""
+    if not profile:
+        return ""
+    return f"""
+        A profile of the dataset was precomputed locally (shape, dtypes, inferred
+        column kinds, missing values, distinct counts, summary statistics). Trust it
+        instead of re-computing these in the code interpreter:
+        {profile}
+        """
+
+
+def create_data_reading_task(
+    agent: Agent,
+    dataset_path: str,
+    profile: str | None = None,
+    columnar: str | None = None,
+) -> Task:
     """
     Creates a task for reading and loading an unknown dataset.
 
     Args:
         agent: The Data Reader agent
         dataset_path: Path to the dataset file
+        profile: Precomputed dataset profile to include in the description
+        columnar: How to load the typed Parquet copy of the dataset, if one was made
 
     Returns:
         Task for loading the dataset
@@ -15,14 +34,15 @@ def create_data_reading_task(agent: Agent, dataset_path: str) -> Task:
     return Task(
         description=f"""
         Load the dataset at path: {dataset_path}
-        
+        {columnar or ""}
         Your responsibilities:
         1. Identify the file format and appropriate method to load it
-        2. Load the dataset using appropriate libraries
+        2. Load the dataset using appropriate libraries, unless the code interpreter
+           says it is already loaded in FRAMES["raw"]
         3. Return the loaded raw dataset as a variable that can be passed to the next agent
         
         If you encounter any issues with loading the data, try multiple times.
-        """,
+        """ + _profile_section(profile),
         expected_output="""
         A dictionary containing:
         1. The raw dataset (stored in a variable that can be passed to the next agent)
@@ -39,13 +59,17 @@ def create_data_reading_task(agent: Agent, dataset_path: str) -> Task:
     )
 
 
-def create_data_cleanup_task(agent: Agent, context) -> Task:
+def create_data_cleanup_task(
+    agent: Agent, context, profile: str | None = None, async_execution: bool = False
+) -> Task:
     """
     Creates a task for cleaning and preparing a dataset for analysis.
 
     Args:
         agent: The Data Cleanup agent
         context: Information from the previous task
+        profile: Precomputed dataset profile to include in the description
+        async_execution: Run concurrently with the other tasks of its stage
 
     Returns:
         Task for cleaning and preparing the dataset
@@ -60,10 +84,11 @@ def create_data_cleanup_task(agent: Agent, context) -> Task:
         3. Convert data types appropriately
         4. Handle outliers if necessary
         5. Provide summary statistics about the dataset
-        6. Return the cleaned dataset as a variable and a summary of its contents
+        6. Return the cleaned dataset as a variable and a summary of its contents, and
+           register it for later agents with FRAMES["clean"] = df_clean
         
         Focus on making the data ready for analysis by the Data Analyzer agent.
-        """,
+        """ + _profile_section(profile),
         expected_output="""
         A dictionary containing:
         1. The cleaned dataset (stored in a variable that can be passed to the next agent)
@@ -86,16 +111,20 @@ def create_data_cleanup_task(agent: Agent, context) -> Task:
         """,
         agent=agent,
         context=context,
+        async_execution=async_execution,
     )
 
 
-def create_data_analysis_task(agent: Agent, context) -> Task:
+def create_data_analysis_task(
+    agent: Agent, context, async_execution: bool = False
+) -> Task:
     """
     Creates a task for analyzing the prepared dataset.
 
     Args:
         agent: The Data Analyzer agent
         data_info: Information about the dataset from the previous task
+        async_execution: Run concurrently with the other tasks of its stage
 
     Returns:
         Task for analyzing the dataset
@@ -109,7 +138,8 @@ def create_data_analysis_task(agent: Agent, context) -> Task:
         2. Identify correlations and patterns
         3. Create visualizations to highlight key findings
         4. Perform statistical tests where appropriate
-        5. Engineer features if needed for better analysis
+        5. Engineer features if needed for better analysis, registering frames with
+           engineered features in FRAMES (e.g. FRAMES["features"])
         6. Identify outliers and anomalies
         
         Focus on finding meaningful patterns rather than just generating statistics.
@@ -133,10 +163,13 @@ def create_data_analysis_task(agent: Agent, context) -> Task:
         """,
         agent=agent,
         context=context,
+        async_execution=async_execution,
     )
 
 
-def create_insight_generation_task(agent: Agent, context) -> Task:
+def create_insight_generation_task(
+    agent: Agent, context, async_execution: bool = False
+) -> Task:
     """
     Creates a task for generating insights from the analysis.
 
@@ -144,6 +177,7 @@ def create_insight_generation_task(agent: Agent, context) -> Task:
         agent: The Insight Generator agent
         analysis_results: Results from the data analysis task
         data_info: Information about the dataset from the first task
+        async_execution: Run concurrently with the other tasks of its stage
 
     Returns:
         Task for generating insights
@@ -184,16 +218,39 @@ def create_insight_generation_task(agent: Agent, context) -> Task:
         """,
         agent=agent,
         context=context,
+        async_execution=async_execution,
     )
 
 
-def create_time_series_prediction_task(agent: Agent, context) -> Task:
+def _time_series_section(time_series: str | None) -> str:
+    """Task description paragraph carrying the precomputed time series screening."""
+    if not time_series:
+        return ""
+    return f"""
+        The dataset's time series were screened locally: date columns were detected,
+        the row count and every measure were resampled along each of them, and each
+        series got trend and seasonality strengths, ADF and KPSS stationarity tests
+        (5% level) and a suitability score. Start from these results instead of
+        searching for date columns or recomputing the tests; spend your code on
+        validating the best candidates and on the forecasting example:
+        {time_series}
+        """
+
+
+def create_time_series_prediction_task(
+    agent: Agent,
+    context,
+    async_execution: bool = False,
+    time_series: str | None = None,
+) -> Task:
     """
     Creates a task for suggesting time series data suitable for ML model training and prediction.
 
     Args:
         agent: The Time Series Model Predictor agent
         context: Results from previous tasks including data reading, cleanup, analysis, and insights
+        async_execution: Run concurrently with the other tasks of its stage
+        time_series: Precomputed time series screening to include in the description
 
     Returns:
         Task for time series model prediction suggestions
@@ -211,7 +268,7 @@ def create_time_series_prediction_task(agent: Agent, context) -> Task:
         6. Explain why certain time series are more suitable for prediction than others
         
         Focus on practical, actionable recommendations for time series prediction.
-        """,
+        """ + _time_series_section(time_series),
         expected_output="""
         A dictionary containing:
         1. Identified time series variables in the dataset
@@ -239,10 +296,21 @@ def create_time_series_prediction_task(agent: Agent, context) -> Task:
         """,
         agent=agent,
         context=context,
+        async_execution=async_execution,
     )
 
 
-def create_report_creation_task(agent: Agent, context) -> Task:
+# How the Report Creator is asked to format its report, by output format
+REPORT_FORMAT_INSTRUCTIONS = {
+    "markdown": "markdown",
+    "json": "a single JSON object with one key per report section",
+    "html": "a self-contained HTML document",
+}
+
+
+def create_report_creation_task(
+    agent: Agent, context, output_format: str = "markdown"
+) -> Task:
     """
     Creates a task for creating the final report.
 
@@ -251,24 +319,28 @@ def create_report_creation_task(agent: Agent, context) -> Task:
         insights: Insights generated from the previous task
         analysis_results: Results from the data analysis task
         data_info: Information about the dataset from the first task
+        output_format: Format of the report (markdown, json or html)
 
     Returns:
         Task for creating the final report
     """
+    report_format = REPORT_FORMAT_INSTRUCTIONS[output_format]
     return Task(
-        description="""
+        description=f"""
         Create a comprehensive report based on the dataset analysis and insights. Always use real data, not placeholders or sample data.
                 
         Your responsibilities:
         1. Structure the report in a logical, easy-to-follow format
-        2. Create clear visualizations that highlight key findings
+        2. Create clear visualizations that highlight key findings. Charts made by the
+           other agents are already saved locally: link them by the paths shown in the
+           code interpreter outputs instead of re-creating them
         3. Write explanations in accessible language
         4. Include an executive summary of the most important findings
-        5. Format the report as specified (default to markdown if not specified)
+        5. Format the report as {report_format}
         
         The report should tell a coherent story about the data.
         """,
-        expected_output="""
+        expected_output=f"""
         A complete report including:
         1. Executive summary
         2. Introduction to the dataset
@@ -278,7 +350,7 @@ def create_report_creation_task(agent: Agent, context) -> Task:
         6. Conclusions and recommendations
         7. Appendix with additional details (if needed)
         
-        The report should be formatted as markdown.
+        The report should be formatted as {report_format}.
         """,
         agent=agent,
         context=context,
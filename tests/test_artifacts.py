@@ -0,0 +1,131 @@
+import io
+import json
+import os
+import tarfile
+
+import pytest
+
+from tools.artifacts import ArtifactStore, archive_code, run_artifact_dir
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(str(tmp_path / "artifacts"))
+
+
+def tar(files: dict) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def test_artifacts_are_named_after_their_content(store):
+    path = store.put("hello", "txt")
+
+    assert store.put(b"hello", "txt") == path
+    assert store.put("other", "txt") != path
+    assert store.stats == {"written": 2, "deduplicated": 1, "bytes": 10}
+    with open(path) as f:
+        assert f.read() == "hello"
+
+
+def test_index_records_every_source(store):
+    path = store.put("data", "csv", source="a.csv")
+    store.put("data", "csv", source="copy/a.csv")
+    store.put("data", "csv", source="a.csv")
+
+    entry = store.index()[os.path.basename(path)]
+
+    assert entry["kind"] == "csv"
+    assert entry["bytes"] == 4
+    assert entry["count"] == 3
+    assert entry["sources"] == ["a.csv", "copy/a.csv"]
+
+
+def test_stores_sharing_a_directory_merge_their_index(store):
+    other = ArtifactStore(store.directory)
+
+    first = store.put("one", "txt")
+    second = other.put("two", "txt")
+    store.put("three", "txt")
+
+    names = set(ArtifactStore(store.directory).index())
+    assert {os.path.basename(first), os.path.basename(second)} <= names
+    assert len(names) == 3
+
+
+def test_chart_flag_is_kept_once_set(store):
+    path = store.put(b"<svg/>", "svg", chart=True)
+    store.put(b"<svg/>", "svg", source="copy.svg")
+
+    assert store.index()[os.path.basename(path)]["chart"]
+    assert store.charts() == [path]
+
+
+def test_charts_are_listed_oldest_first(store):
+    store.put(b"<table>", "html")
+    first = store.put_base64("AAAA", "png", chart=True)
+    second = store.put_base64("AQID", "png", chart=True)
+
+    assert store.charts() == [first, second]
+
+
+def test_archive_members_are_stored_by_content(store):
+    data = tar(
+        {
+            "charts/sales.PNG": b"png",
+            "../escape.csv": b"a,b\n",
+            "notes": b"text",
+        }
+    )
+
+    paths = store.put_archive(data)
+
+    assert set(paths) == {"charts/sales.PNG", "../escape.csv", "notes"}
+    for path in paths.values():
+        assert os.path.dirname(path) == store.directory
+    assert paths["notes"].endswith(".bin")
+    assert store.charts() == [paths["charts/sales.PNG"]]
+    assert store.index()[os.path.basename(paths["../escape.csv"])]["sources"] == [
+        "../escape.csv"
+    ]
+
+
+def test_corrupt_index_starts_over(store):
+    store.put("one", "txt")
+    with open(os.path.join(store.directory, "index.json"), "w") as f:
+        f.write("{")
+
+    path = store.put("two", "txt")
+
+    assert list(store.index()) == [os.path.basename(path)]
+
+
+def test_archive_code_packs_new_matching_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("old.png", "marker", "new.png", "uploaded.csv", "notes.txt"):
+        (tmp_path / name).write_text(name)
+    os.utime("old.png", (0, 0))
+    output = io.StringIO()
+    monkeypatch.setattr("sys.stdout", output)
+
+    exec(archive_code("out.tar.gz", since="marker", exclude={"uploaded.csv"}))
+
+    with tarfile.open("out.tar.gz") as archive:
+        names = archive.getnames()
+    assert names == ["new.png"]
+    assert json.loads(output.getvalue()) == ["new.png"]
+
+
+def test_run_artifact_dirs_are_unique(monkeypatch, tmp_path):
+    monkeypatch.setenv("ARTIFACT_DIR", str(tmp_path))
+
+    first, second = run_artifact_dir("grocery"), run_artifact_dir("grocery")
+
+    assert first != second
+    assert os.path.dirname(first) == str(tmp_path)
+    assert os.path.basename(first).startswith("grocery-")
@@ -0,0 +1,187 @@
+import pytest
+
+import tools.cassette as cassette_module
+from tools.cassette import (
+    Cassette,
+    CassetteMiss,
+    RecordingSandbox,
+    ReplaySandbox,
+    get_cassette,
+)
+from tools.cell_monitor import CellCancelled
+from tools.execution import Execution, ExecutionError, Logs, Result
+from tools.fake_sandbox import FakeSandbox
+
+
+class CountingHandler:
+    """Answers each cell with how many cells the sandbox has run so far."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, code: str) -> Execution:
+        self.calls += 1
+        if code == "fail":
+            return Execution(error=ExecutionError("ValueError", "bad", "tb"))
+        if code == "timeout":
+            raise TimeoutError("cell timed out")
+        if code == "cancel":
+            raise CellCancelled("output limit")
+        return Execution(
+            results=[Result(text=f"{code} #{self.calls}", is_main_result=True)],
+            logs=Logs(stdout=[f"{self.calls}\n"]),
+        )
+
+
+def record(directory: str, cells: list, sandboxes: int = 1) -> list:
+    """Run `cells` in each of `sandboxes` recorded sandboxes, returning outputs."""
+    cassette = Cassette(directory, "record")
+    outputs = []
+    for _ in range(sandboxes):
+        sandbox = RecordingSandbox(FakeSandbox(CountingHandler()), cassette)
+        outputs.append([sandbox.run_code(code).results[0].text for code in cells])
+    return outputs
+
+
+def replay(directory: str, cells: list, sandboxes: int = 1) -> list:
+    cassette = Cassette(directory, "replay")
+    outputs = []
+    for _ in range(sandboxes):
+        sandbox = ReplaySandbox(cassette)
+        outputs.append([sandbox.run_code(code).results[0].text for code in cells])
+    return outputs
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown cassette mode"):
+        Cassette(str(tmp_path), "rewind")
+
+
+def test_replay_needs_a_recorded_cassette(tmp_path):
+    with pytest.raises(ValueError, match="No cassette to replay"):
+        Cassette(str(tmp_path / "missing"), "replay")
+
+
+def test_keys_are_stable_across_cassettes(tmp_path):
+    first = Cassette(str(tmp_path), "record")
+    second = Cassette(str(tmp_path), "record")
+
+    assert first.key("run_code", "df.head()") == second.key("run_code", "df.head()")
+    assert first.key("run_code", "df.head()") != first.key("run_code", "df.tail()")
+    assert first.key("a", "bc") != first.key("ab", "c")
+
+
+def test_repeated_requests_get_one_key_per_occurrence(tmp_path):
+    cassette = Cassette(str(tmp_path), "record")
+
+    keys = [cassette.key("run_code", "df.head()", scope="1") for _ in range(2)]
+
+    assert keys[0].endswith("-0") and keys[1].endswith("-1")
+    assert cassette.key("run_code", "df.head()", scope="2").endswith("-0")
+
+
+def test_replay_serves_each_occurrence_its_own_output(tmp_path):
+    cells = ["df.head()", "df = clean(df)", "df.head()"]
+    recorded = record(str(tmp_path), cells)
+
+    replayed = replay(str(tmp_path), cells)
+
+    assert replayed == recorded
+    assert recorded[0][0] != recorded[0][2]
+
+
+def test_sandboxes_replay_in_creation_order(tmp_path):
+    cells = ["df.head()", "df.describe()"]
+    recorded = record(str(tmp_path), cells, sandboxes=2)
+
+    assert replay(str(tmp_path), cells, sandboxes=2) == recorded
+
+
+def test_replay_restores_logs_and_errors(tmp_path):
+    cassette = Cassette(str(tmp_path), "record")
+    sandbox = RecordingSandbox(FakeSandbox(CountingHandler()), cassette)
+    sandbox.run_code("print(1)")
+    sandbox.run_code("fail")
+
+    sandbox = ReplaySandbox(Cassette(str(tmp_path), "replay"))
+    streamed = []
+    execution = sandbox.run_code("print(1)", on_stdout=streamed.append)
+    failed = sandbox.run_code("fail")
+
+    assert execution.logs.stdout == ["1\n"]
+    assert [message.line for message in streamed] == ["1\n"]
+    assert failed.error.name == "ValueError"
+    assert failed.error.traceback == "tb"
+    assert sandbox.executed == ["print(1)", "fail"]
+
+
+def test_replay_raises_what_the_sandbox_raised(tmp_path):
+    cassette = Cassette(str(tmp_path), "record")
+    sandbox = RecordingSandbox(FakeSandbox(CountingHandler()), cassette)
+    for code, error in (("timeout", TimeoutError), ("cancel", CellCancelled)):
+        with pytest.raises(error):
+            sandbox.run_code(code)
+
+    sandbox = ReplaySandbox(Cassette(str(tmp_path), "replay"))
+
+    with pytest.raises(TimeoutError, match="cell timed out"):
+        sandbox.run_code("timeout")
+    with pytest.raises(CellCancelled, match="output limit"):
+        sandbox.run_code("cancel")
+
+
+def test_file_reads_are_replayed(tmp_path):
+    cassette = Cassette(str(tmp_path), "record")
+    fake = FakeSandbox()
+    fake.files.write("chart.png", b"\x89PNG")
+    sandbox = RecordingSandbox(fake, cassette)
+    sandbox.files.read("chart.png", format="bytes")
+    sandbox.files.exists("missing.csv")
+
+    files = ReplaySandbox(Cassette(str(tmp_path), "replay")).files
+
+    assert files.read("chart.png", format="bytes") == b"\x89PNG"
+    assert files.exists("missing.csv") is False
+
+
+def test_unrecorded_request_is_a_miss(tmp_path):
+    record(str(tmp_path), ["df.head()"])
+    sandbox = ReplaySandbox(Cassette(str(tmp_path), "replay"))
+
+    with pytest.raises(CassetteMiss, match="record the run again"):
+        sandbox.run_code("df.tail()")
+
+
+def test_stats(tmp_path):
+    record(str(tmp_path), ["a", "b"])
+    cassette = Cassette(str(tmp_path), "replay")
+    ReplaySandbox(cassette).run_code("a")
+
+    assert cassette.stats == {"recorded": 0, "replayed": 1}
+    assert cassette.summary().endswith("0 recorded, 1 replayed")
+
+
+def test_cassette_from_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(cassette_module, "_cassette", None)
+    monkeypatch.setenv("CASSETTE_DIR", str(tmp_path))
+    monkeypatch.setenv("CASSETTE_MODE", "record")
+
+    cassette = get_cassette()
+
+    assert cassette.recording
+    assert get_cassette() is cassette
+
+
+def test_llm_request_key_ignores_parameter_order():
+    pytest.importorskip("crewai")
+    from agents.llm import request_key
+
+    messages = [{"role": "user", "content": "hi"}]
+
+    key = request_key("gpt-4o-mini", messages, stop=None, temperature=0)
+
+    assert request_key("gpt-4o-mini", messages, temperature=0, stop=None) == key
+    assert request_key("gpt-4o", messages, stop=None, temperature=0) != key
+    assert (
+        request_key("gpt-4o-mini", messages + messages, stop=None, temperature=0) != key
+    )
@@ -0,0 +1,199 @@
+import pytest
+
+import tools.local_kernel
+from tools.cell_monitor import CellCancelled, CellLimits, CellMonitor
+from tools.execution import Execution, ExecutionError
+from tools.local_kernel import LocalKernelSandbox
+from tools.sandbox_pool import SandboxPool
+
+IGNORE_SIGINT = """
+import signal, time
+signal.signal(signal.SIGINT, signal.SIG_IGN)
+time.sleep(30)
+"""
+
+
+class StreamingSandbox:
+    """A sandbox without `interrupt()` streaming scripted output lines."""
+
+    def __init__(self, lines, error=None, running=True):
+        self.lines = lines
+        self.error = error
+        self.running = running
+
+    def run_code(self, code, on_stdout=None, **kwargs):
+        for line in self.lines:
+            on_stdout(line)
+        if self.error is not None:
+            raise self.error
+        return Execution()
+
+    def is_running(self) -> bool:
+        return self.running
+
+
+class InterruptibleSandbox(StreamingSandbox):
+    """A sandbox reporting an interrupted cell as a KeyboardInterrupt."""
+
+    def __init__(self, lines):
+        super().__init__(lines)
+        self.interrupted = False
+
+    def interrupt(self) -> None:
+        self.interrupted = True
+
+    def run_code(self, code, on_stdout=None, **kwargs):
+        super().run_code(code, on_stdout=on_stdout)
+        return Execution(error=ExecutionError("KeyboardInterrupt", "", ""))
+
+
+class TimeoutException(Exception):
+    pass
+
+
+@pytest.fixture
+def kernel():
+    sandbox = LocalKernelSandbox()
+    yield sandbox
+    sandbox.kill()
+
+
+def test_limits_from_env(monkeypatch):
+    monkeypatch.setenv("CELL_MAX_SECONDS", "0")
+    monkeypatch.setenv("CELL_MAX_OUTPUT_BYTES", "2048")
+    monkeypatch.setenv("CELL_MAX_MEMORY_MB", "512")
+
+    limits = CellLimits.from_env()
+
+    assert limits.max_seconds is None
+    assert limits.max_output_bytes == 2048
+    assert limits.max_memory_mb == 512.0
+
+
+def test_output_limit_aborts_stream_and_keeps_partial_output():
+    sandbox = StreamingSandbox(["a" * 60 + "\n"] * 5)
+    monitor = CellMonitor(sandbox, CellLimits(max_output_bytes=100))
+
+    execution = monitor.execute(sandbox.run_code, "print('a')")
+
+    assert execution.error.name == "CellCancelled"
+    assert "limit 100" in execution.error.value
+    assert execution.logs.stdout == ["a" * 60 + "\n"] * 2
+    assert monitor.abandoned
+
+
+def test_output_limit_interrupts_and_relabels_the_error():
+    sandbox = InterruptibleSandbox(["a" * 60 + "\n"] * 5)
+    monitor = CellMonitor(sandbox, CellLimits(max_output_bytes=100))
+
+    execution = monitor.execute(sandbox.run_code, "print('a')")
+
+    assert sandbox.interrupted
+    assert execution.error.name == "CellCancelled"
+    assert execution.error.value == monitor.cancelled
+    assert not monitor.abandoned
+
+
+def test_output_is_forwarded_to_the_sink():
+    received = []
+    sandbox = StreamingSandbox(["one\n", "two\n"])
+    monitor = CellMonitor(
+        sandbox, CellLimits(), sink=lambda kind, text: received.append((kind, text))
+    )
+
+    execution = monitor.execute(sandbox.run_code, "")
+
+    assert execution.error is None
+    assert received == [("stdout", "one\n"), ("stdout", "two\n")]
+    assert monitor.output_bytes == 8
+
+
+def test_sandbox_timeout_returns_partial_output():
+    sandbox = StreamingSandbox(["partial\n"], error=TimeoutException("timed out"))
+    monitor = CellMonitor(sandbox, CellLimits(max_seconds=1))
+
+    execution = monitor.execute(sandbox.run_code, "")
+
+    assert execution.error.name == "TimeoutError"
+    assert "limit 1s" in execution.error.value
+    assert execution.logs.stdout == ["partial\n"]
+    assert monitor.abandoned
+
+
+def test_recover_reraises_other_errors():
+    monitor = CellMonitor(StreamingSandbox([]), CellLimits())
+
+    with pytest.raises(ValueError):
+        monitor.recover(ValueError("boom"))
+    assert isinstance(monitor.recover(CellCancelled("stop")).error, ExecutionError)
+
+
+def test_error_of_a_stopped_kernel_abandons_the_sandbox():
+    sandbox = StreamingSandbox([], running=False)
+    monitor = CellMonitor(sandbox, CellLimits())
+
+    monitor.finish(Execution(error=ExecutionError("NameError", "x", "")))
+
+    assert monitor.abandoned
+
+
+def test_local_kernel_wall_time_limit(kernel):
+    monitor = CellMonitor(kernel, CellLimits(max_seconds=0.5))
+
+    execution = monitor.execute(kernel.run_code, "import time\ntime.sleep(10)")
+
+    assert execution.error.name == "TimeoutError"
+    assert not monitor.abandoned
+    assert "".join(kernel.run_code("print(1)").logs.stdout) == "1\n"
+
+
+def test_local_kernel_memory_limit(kernel):
+    # Any Python process is over 1 MB, so the first probe cancels the cell
+    monitor = CellMonitor(kernel, CellLimits(max_memory_mb=1))
+
+    execution = monitor.execute(kernel.run_code, "import time\ntime.sleep(10)")
+
+    assert execution.error.name == "CellCancelled"
+    assert "MB of memory" in execution.error.value
+    assert not monitor.abandoned
+
+
+def test_local_kernel_killed_for_ignoring_interrupt_is_abandoned(kernel, monkeypatch):
+    monkeypatch.setattr(tools.local_kernel, "INTERRUPT_GRACE", 0.5)
+    monitor = CellMonitor(kernel, CellLimits(max_seconds=0.5))
+
+    execution = monitor.execute(kernel.run_code, IGNORE_SIGINT)
+
+    assert execution.error.name == "KernelDied"
+    assert monitor.abandoned
+    assert not kernel.is_running()
+
+
+def test_tool_replaces_a_kernel_killed_by_a_runaway_cell(monkeypatch, tmp_path):
+    pytest.importorskip("crewai")
+    from tools.code_interpreter_tool import E2BCodeInterpreterTool
+
+    monkeypatch.setattr(tools.local_kernel, "INTERRUPT_GRACE", 0.5)
+    monkeypatch.delenv("CODE_INTERPRETER_CACHE_DIR", raising=False)
+    pool = SandboxPool(factory=LocalKernelSandbox, max_size=2)
+    tool = E2BCodeInterpreterTool(
+        backend="local",
+        sandbox_pool=pool,
+        artifact_dir=str(tmp_path),
+        cell_limits=CellLimits(max_seconds=0.5),
+        stream_output=False,
+    )
+    try:
+        first = tool._code_interpreter_tool
+        tool._run("x = 1")
+
+        output = tool._run(IGNORE_SIGINT)
+
+        assert "KernelDied" in output and "kernel was restarted" in output
+        assert tool._code_interpreter_tool is not first
+        assert pool.stats["discarded"] == 1
+        assert '"stdout":"2\\n"' in tool._run("print(1 + 1)")
+        assert "NameError" in tool._run("print(x)")
+    finally:
+        tool.close()
+        pool.close()
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from workflow.checkpoint import RunCheckpoint, default_run_dir
+
+TASKS = ["data_loading", "data_cleaning", "feature_engineering", "report_creation"]
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n")
+    return str(path)
+
+
+@pytest.fixture
+def run_dir(tmp_path):
+    return str(tmp_path / "run")
+
+
+def test_saved_tasks_are_resumed(dataset, run_dir):
+    checkpoint = RunCheckpoint(run_dir, dataset)
+    checkpoint.save("data_loading", "loaded")
+    checkpoint.save("data_cleaning", "cleaned", snapshot=b"kernel", lineage="abc")
+
+    resumed = RunCheckpoint(run_dir, dataset)
+
+    assert list(resumed.completed) == ["data_loading", "data_cleaning"]
+    assert resumed.output("data_cleaning") == "cleaned"
+    assert "snapshot" not in resumed.completed["data_loading"]
+    assert resumed.completed["data_cleaning"]["lineage"] == "abc"
+
+
+def test_checkpoints_of_a_changed_dataset_are_ignored(dataset, run_dir, capsys):
+    RunCheckpoint(run_dir, dataset).save("data_loading", "loaded")
+
+    with open(dataset, "a") as f:
+        f.write("3,4\n")
+    resumed = RunCheckpoint(run_dir, dataset)
+
+    assert resumed.completed == {}
+    assert "the dataset has changed" in capsys.readouterr().out
+
+
+def test_torn_manifest_starts_over(dataset, run_dir):
+    RunCheckpoint(run_dir, dataset)
+    with open(os.path.join(run_dir, "checkpoint.json"), "w") as f:
+        f.write("{")
+
+    assert RunCheckpoint(run_dir, dataset).completed == {}
+
+
+def test_latest_snapshot_follows_the_task_order(dataset, run_dir):
+    checkpoint = RunCheckpoint(run_dir, dataset)
+    # Saved out of order, as concurrent tasks may complete
+    checkpoint.save("feature_engineering", "features", snapshot=b"two", lineage="2")
+    checkpoint.save("data_cleaning", "cleaned", snapshot=b"one", lineage="1")
+    checkpoint.save("report_creation", "report")
+
+    assert checkpoint.latest_snapshot(TASKS) == ("feature_engineering", b"two", "2")
+    assert checkpoint.latest_snapshot(TASKS[:2]) == ("data_cleaning", b"one", "1")
+
+
+def test_latest_snapshot_without_any_snapshot(dataset, run_dir):
+    checkpoint = RunCheckpoint(run_dir, dataset)
+    checkpoint.save("data_loading", "loaded")
+
+    assert checkpoint.latest_snapshot(TASKS) is None
+
+
+def test_reset_clears_checkpoints_and_artifacts(dataset, run_dir):
+    checkpoint = RunCheckpoint(run_dir, dataset)
+    checkpoint.save("data_loading", "loaded")
+    os.makedirs(checkpoint.artifact_dir)
+    with open(os.path.join(checkpoint.artifact_dir, "chart.png"), "wb") as f:
+        f.write(b"png")
+
+    checkpoint.reset()
+
+    assert checkpoint.completed == {}
+    assert not os.path.exists(checkpoint.artifact_dir)
+    assert RunCheckpoint(run_dir, dataset).completed == {}
+
+
+def test_default_run_dir_is_named_after_the_content(dataset, tmp_path):
+    run_dir = default_run_dir(dataset, runs_dir=str(tmp_path / "runs"))
+
+    assert os.path.basename(run_dir).startswith("data-")
+    assert default_run_dir(dataset, runs_dir=str(tmp_path / "runs")) == run_dir
+    with open(dataset, "a") as f:
+        f.write("3,4\n")
+    assert default_run_dir(dataset, runs_dir=str(tmp_path / "runs")) != run_dir
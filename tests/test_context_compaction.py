@@ -0,0 +1,126 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from tools.result_encoder import estimate_tokens
+from workflow.context_compaction import (
+    DEFAULT_CONTEXT_BUDGET,
+    ContextCompactor,
+    digest,
+    parse_structured,
+)
+
+STRUCTURED = {
+    "key_findings": [f"finding {index}: " + "detail " * 20 for index in range(50)],
+    "statistics": {f"column_{index}": index * 1.5 for index in range(100)},
+    "recommendation": "x" * 2000,
+}
+
+
+class FakeTask:
+    """Task exposing the attributes the compactor touches."""
+
+    def __init__(self, raw: str, callback=None):
+        self.output = SimpleNamespace(raw=raw)
+        self.callback = callback
+
+    def finish(self) -> None:
+        self.callback(self.output)
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        '{"a": 1, "b": [1, 2]}',
+        'Here is the result:\n```json\n{"a": 1, "b": [1, 2]}\n```\nDone.',
+        "Final answer: {'a': 1, 'b': [1, 2]} as requested",
+    ],
+)
+def test_parse_structured(raw):
+    assert parse_structured(raw) == {"a": 1, "b": [1, 2]}
+
+
+@pytest.mark.parametrize(
+    "raw", ["plain text", "{not: valid}", "[1, 2]", "} backwards {", ""]
+)
+def test_parse_structured_without_a_dictionary(raw):
+    assert parse_structured(raw) is None
+
+
+def test_output_within_budget_is_kept():
+    assert digest("short output", budget=100) == "short output"
+
+
+def test_structured_digest_keeps_every_top_level_key():
+    raw = json.dumps(STRUCTURED, indent=2)
+
+    compacted = digest(raw, budget=300)
+
+    assert estimate_tokens(compacted) <= 300
+    shrunk = json.loads(compacted)
+    assert list(shrunk) == list(STRUCTURED)
+    assert shrunk["key_findings"][-1].endswith("more items")
+    assert shrunk["statistics"]["..."].endswith("more keys")
+    assert shrunk["recommendation"].endswith("...")
+
+
+def test_structured_digest_shrinks_only_as_far_as_needed():
+    raw = json.dumps(STRUCTURED, indent=2)
+
+    loose = json.loads(digest(raw, budget=1500))
+    tight = json.loads(digest(raw, budget=300))
+
+    assert len(loose["key_findings"]) > len(tight["key_findings"])
+
+
+def test_free_text_keeps_head_and_tail():
+    raw = "head " + "filler " * 1000 + " tail"
+
+    compacted = digest(raw, budget=50)
+
+    assert compacted.startswith("head ")
+    assert compacted.endswith(" tail")
+    assert "bytes omitted" in compacted
+    assert len(compacted) < 300
+
+
+def test_structured_output_too_large_for_any_level_is_truncated():
+    raw = json.dumps({f"key_{index}": index for index in range(500)})
+
+    compacted = digest(raw, budget=50)
+
+    assert "bytes omitted" in compacted
+    assert len(compacted) < 300
+
+
+def test_callback_compacts_and_restore_puts_the_output_back():
+    raw = "filler " * 2000
+    chained = []
+    task = FakeTask(raw, callback=chained.append)
+    compactor = ContextCompactor(budget=100)
+    compactor.install({"analysis": task}, ["analysis"])
+
+    task.finish()
+
+    assert chained == [task.output]
+    assert estimate_tokens(task.output.raw) < 150
+    assert compactor.stats["analysis"]["raw_tokens"] == estimate_tokens(raw)
+    compactor.restore({"analysis": task})
+    assert task.output.raw == raw
+
+
+def test_budget_per_task():
+    compactor = ContextCompactor(budget={"analysis": 100})
+
+    assert compactor.budget_for("analysis") == 100
+    assert compactor.budget_for("cleanup") == DEFAULT_CONTEXT_BUDGET
+
+
+def test_summary():
+    compactor = ContextCompactor(budget=100)
+    task = FakeTask("filler " * 2000)
+    compactor.install({"analysis": task}, ["analysis"])
+    task.finish()
+
+    assert compactor.summary().startswith("context digests of 1 task(s): ~")
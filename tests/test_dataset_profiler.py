@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import workflow.dataset_profiler as dataset_profiler
+from workflow.dataset_profiler import (
+    _DuplicateCounter,
+    format_profile,
+    infer_kind,
+    profile_dataset,
+)
+
+GROCERY = "data/grocery.csv"
+
+
+def columns_by_name(profile: dict) -> dict:
+    return {column["name"]: column for column in profile["columns"]}
+
+
+def test_grocery_shape_and_column_kinds():
+    profile = profile_dataset(GROCERY)
+    columns = columns_by_name(profile)
+
+    assert profile["shape"] == [990, 17]
+    assert profile["format"] == "csv"
+    assert profile["duplicate_rows"] == 0
+    assert columns["Catagory"]["kind"] == "categorical"
+    assert columns["Date_Received"]["kind"] == "datetime"
+    assert columns["Stock_Quantity"]["kind"] == "numeric"
+    assert columns["Unit_Price"]["kind"] == "currency"
+    assert columns["percentage"]["kind"] == "percent"
+
+
+def test_grocery_missing_and_unique_counts():
+    columns = columns_by_name(profile_dataset(GROCERY))
+
+    assert columns["Catagory"]["missing"] == 1
+    assert columns["Catagory"]["unique"] == 7
+    assert columns["Status"]["unique"] == 3
+    # Identifier-like columns get no top values
+    assert "top_values" not in columns["Product_ID"]
+    assert sum(columns["Status"]["top_values"].values()) == 990
+    assert columns["Unit_Price"]["min"] == pytest.approx(0.2)
+    assert columns["Unit_Price"]["max"] == pytest.approx(98.43)
+    assert columns["Date_Received"]["min"].startswith("2024-02-25")
+
+
+def test_statistics_are_merged_across_chunks(tmp_path):
+    path = tmp_path / "data.csv"
+    pd.DataFrame(
+        {
+            "amount": [1.0, 2.0, None, 4.0, 5.0, 6.0, 7.0],
+            "city": ["a", "b", "a", "a", None, "b", "a"],
+        }
+    ).to_csv(path, index=False)
+
+    whole = profile_dataset(str(path))
+    chunked = profile_dataset(str(path), chunksize=2)
+
+    assert whole == chunked
+    amount = columns_by_name(chunked)["amount"]
+    assert amount["missing"] == 1
+    assert amount["mean"] == pytest.approx(25 / 6, abs=1e-4)
+    assert amount["std"] == pytest.approx(np.std([1, 2, 4, 5, 6, 7]), abs=1e-4)
+    assert (amount["min"], amount["max"]) == (1.0, 7.0)
+    assert columns_by_name(chunked)["city"]["top_values"] == {"a": 4, "b": 2}
+
+
+def test_duplicate_rows_across_chunks(tmp_path):
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"a": [1, 2, 1, 3, 1, 2], "b": ["x", "y", "x", "z", "x", "y"]}).to_csv(
+        path, index=False
+    )
+
+    assert profile_dataset(str(path), chunksize=2)["duplicate_rows"] == 3
+
+
+def test_duplicate_rows_are_estimated_past_the_tracked_rows(tmp_path, monkeypatch):
+    path = tmp_path / "data.csv"
+    # 4,000 distinct rows, each appearing twice
+    pd.DataFrame({"id": np.tile(np.arange(4_000), 2)}).to_csv(path, index=False)
+    monkeypatch.setattr(
+        dataset_profiler,
+        "_DuplicateCounter",
+        lambda: _DuplicateCounter(max_rows=500),
+    )
+
+    duplicate_rows = profile_dataset(str(path), chunksize=1_000)["duplicate_rows"]
+
+    assert duplicate_rows.startswith("~")
+    assert 2_000 < int(duplicate_rows[1:]) < 8_000
+
+
+def test_duplicate_counter_is_exact_within_its_bound():
+    counter = _DuplicateCounter(max_rows=10)
+    counter.update(np.array([1, 2, 2, 3], dtype="uint64"))
+    counter.update(np.array([3, 3, 4], dtype="uint64"))
+
+    assert not counter.estimated
+    assert counter.duplicates == 3
+
+
+def test_duplicate_counter_memory_is_bounded():
+    counter = _DuplicateCounter(max_rows=100)
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        counter.update(rng.integers(0, 2**63, 1_000).astype("uint64"))
+
+    assert len(counter.hashes) <= 100
+    assert counter.estimated
+
+
+@pytest.mark.parametrize(
+    "values, kind",
+    [
+        ([1, 2, 3], "numeric"),
+        ([True, False], "boolean"),
+        (["$1.50", "$20"], "currency"),
+        (["1.5%", "-2%"], "percent"),
+        (["1,000", "2,500"], "numeric_text"),
+        (["2024-01-01", "2024-02-15"], "datetime"),
+        (["red", "blue"], "categorical"),
+    ],
+)
+def test_infer_kind(values, kind):
+    assert infer_kind(pd.Series(values)) == kind
+
+
+def test_format_profile_is_compact_json():
+    text = format_profile(profile_dataset(GROCERY))
+
+    assert text.startswith('{"path":"data/grocery.csv"')
+    assert ", " not in text[:100]
+
+
+def test_unsupported_format(tmp_path):
+    path = tmp_path / "data.xyz"
+    path.write_text("a")
+
+    with pytest.raises(ValueError):
+        profile_dataset(str(path))
@@ -0,0 +1,196 @@
+import json
+import os
+
+import pytest
+
+from workflow.report import (
+    ReportRenderer,
+    charts_section,
+    overview_section,
+    task_section,
+)
+
+PROFILE = {
+    "format": "csv",
+    "shape": [3, 1],
+    "duplicate_rows": 0,
+    "columns": [{"name": "price", "kind": "currency", "mean": -1.23456}],
+}
+
+NESTED = {
+    "changes": [
+        {"column": "price", "delta": -4.5, "rows": {"before": 5}},
+        ["dropped", -1, [2, 3]],
+    ],
+    "summary": {"rows": 3, "range": [-2.0, 7]},
+}
+
+
+@pytest.fixture
+def render(tmp_path):
+    def render(output_format: str, sections: list, name: str = "report") -> str:
+        path = str(tmp_path / name)
+        renderer = ReportRenderer(path, output_format)
+        for key, content in sections:
+            renderer.add(key, content)
+        renderer.close()
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    return render
+
+
+def test_markdown_report(render, tmp_path):
+    chart = str(tmp_path / "artifacts" / "chart.png")
+
+    text = render(
+        "markdown",
+        [
+            ("overview", overview_section(PROFILE, "data.csv")),
+            ("data_cleanup", task_section("Dropped **3** rows.")),
+            ("charts", charts_section([chart])),
+        ],
+    )
+
+    assert text.startswith("# Data Analysis Report\n\n## Dataset overview\n")
+    assert "- **rows**: 3" in text
+    assert "| name | kind | missing | unique | mean | min | max |" in text
+    assert "| price | currency |  |  | -1.235 |  |  |" in text
+    assert "## Data cleanup\n\nDropped **3** rows.\n" in text
+    assert "![chart.png](artifacts/chart.png)" in text
+
+
+def test_json_report(render, tmp_path):
+    text = render(
+        "json",
+        [
+            ("overview", overview_section(None, "data.csv")),
+            ("insight_generation", task_section('{"top": ["a", "b"]}')),
+            ("charts", charts_section([str(tmp_path / "notes.txt")])),
+        ],
+    )
+
+    report = json.loads(text)
+    assert report["title"] == "Data Analysis Report"
+    assert [section["id"] for section in report["sections"]] == [
+        "overview",
+        "insight_generation",
+        "charts",
+    ]
+    assert report["sections"][1] == {
+        "id": "insight_generation",
+        "title": "Insights",
+        "data": {"top": ["a", "b"]},
+    }
+    assert report["sections"][2]["images"] == ["notes.txt"]
+
+
+def test_html_report(render, tmp_path):
+    text = render(
+        "html",
+        [
+            ("overview", overview_section(PROFILE, "<data>.csv")),
+            (
+                "charts",
+                charts_section([str(tmp_path / "a.png"), str(tmp_path / "notes.txt")]),
+            ),
+        ],
+    )
+
+    assert text.startswith("<!DOCTYPE html>")
+    assert text.endswith("</body>\n</html>\n")
+    assert '<section id="overview">' in text
+    assert "&lt;data&gt;.csv" in text
+    assert "<th>name</th>" in text and "<td>-1.235</td>" in text
+    assert '<img src="a.png" alt="a.png">' in text
+    assert '<a href="notes.txt">notes.txt</a>' in text
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown report format 'pdf'"):
+        ReportRenderer(str(tmp_path / "report"), "pdf")
+
+
+def test_sections_are_written_in_report_order(tmp_path):
+    path = str(tmp_path / "report.json")
+    renderer = ReportRenderer(path, "json")
+
+    renderer.add("data_analysis", {"text": "analysis"})
+    renderer.add("data_cleanup", {"text": "cleanup"})
+    assert renderer.written == []
+
+    renderer.add("overview", {"text": "overview"})
+    assert renderer.written == ["overview", "data_cleanup", "data_analysis"]
+    renderer.close()
+
+
+def test_sections_fill_in_while_the_report_is_open(tmp_path):
+    path = str(tmp_path / "report.md")
+    renderer = ReportRenderer(path, "markdown")
+
+    renderer.add("overview", {"text": "first"})
+
+    with open(path) as f:
+        assert "first" in f.read()
+    renderer.close()
+
+
+def test_missing_sections_are_skipped_at_close(tmp_path):
+    path = str(tmp_path / "report.json")
+    renderer = ReportRenderer(path, "json")
+    renderer.add("overview", {"text": "overview"})
+    renderer.add("data_cleanup", None)
+    renderer.add("charts", {"images": ["chart.png"]})
+
+    renderer.close()
+
+    assert renderer.closed
+    assert renderer.written == ["overview", "charts"]
+    with open(path) as f:
+        assert len(json.load(f)["sections"]) == 2
+    # Sections arriving late are dropped
+    renderer.add("data_analysis", {"text": "late"})
+    assert renderer.written == ["overview", "charts"]
+
+
+def test_nested_data_in_markdown(render):
+    text = render("markdown", [("data_cleanup", {"data": NESTED})])
+
+    assert text.split("## Data cleanup\n\n")[1].strip() == "\n".join(
+        [
+            "- **changes**:",
+            "  - **column**: price, **delta**: -4.5",
+            "    - **rows**:",
+            "      - **before**: 5",
+            "  - dropped, -1",
+            "    - 2, 3",
+            "- **summary**:",
+            "  - **rows**: 3",
+            "  - **range**:",
+            "    - -2",
+            "    - 7",
+        ]
+    )
+
+
+def test_nested_data_in_html(render):
+    text = render("html", [("data_cleanup", {"data": NESTED})])
+
+    assert (
+        "<ul><li><strong>changes</strong>: <ul>"
+        "<li><ul><li><strong>column</strong>: price</li>"
+        "<li><strong>delta</strong>: -4.5</li>"
+        "<li><strong>rows</strong>: <ul><li><strong>before</strong>: 5</li></ul>"
+        "</li></ul></li>"
+        "<li><ul><li>dropped</li><li>-1</li><li><ul><li>2</li><li>3</li></ul></li>"
+        "</ul></li></ul></li>"
+    ) in text
+    assert "<li>-2</li><li>7</li>" in text
+
+
+def test_report_directory_is_created(tmp_path):
+    path = str(tmp_path / "reports" / "run" / "report.md")
+
+    ReportRenderer(path).close()
+
+    assert os.path.exists(path)
@@ -0,0 +1,120 @@
+import os
+
+import pytest
+
+from tools.result_cache import (
+    ResultCache,
+    cache_key,
+    extend_lineage,
+    is_side_effect_free,
+    normalize_code,
+)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "cache"), max_entries=3)
+
+
+def test_formatting_and_comments_do_not_change_the_key():
+    key = cache_key("df.head( )  # first rows", "digest", "")
+
+    assert cache_key("df.head()", "digest", "") == key
+    assert normalize_code("df.head( )  # first rows") == "df.head()"
+
+
+def test_key_depends_on_dataset_and_lineage():
+    key = cache_key("df.head()", "digest", "")
+
+    assert cache_key("df.head()", "other", "") != key
+    assert cache_key("df.head()", "digest", extend_lineage("", "df = df[1:]")) != key
+
+
+def test_lineage_follows_the_mutating_cells_in_order():
+    first = extend_lineage(extend_lineage("", "a = 1"), "b = 2")
+
+    assert extend_lineage(extend_lineage("", "a=1"), "b=2") == first
+    assert extend_lineage(extend_lineage("", "b = 2"), "a = 1") != first
+
+
+def test_unparsable_code_is_keyed_on_its_text():
+    assert normalize_code("  %timeit df.head()\n") == "%timeit df.head()"
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("df.head()", True),
+        ("print(df['a'].describe())\nlen(df)", True),
+        ("df.groupby('a').sum()", False),
+        ("df = df.dropna()", False),
+        ("import pandas", False),
+        ("df.drop(columns=['a'], inplace=True)", False),
+        ("df.apply(lambda row: row)", False),
+        ("%timeit df.head()", False),
+        ("", False),
+    ],
+)
+def test_is_side_effect_free(code, expected):
+    assert is_side_effect_free(code) is expected
+
+
+def test_get_and_put(cache):
+    assert cache.get("a") is None
+
+    cache.put("a", {"stdout": ["1\n"]})
+
+    assert cache.get("a") == {"stdout": ["1\n"]}
+    assert cache.stats == {"hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    for key in "abc":
+        cache.put(key, {"key": key})
+    cache.get("a")
+
+    cache.put("d", {"key": "d"})
+
+    assert cache.get("b") is None
+    assert [cache.get(key) is not None for key in "acd"] == [True, True, True]
+    assert cache.stats["evictions"] == 1
+    assert not os.path.exists(os.path.join(cache.directory, "b.json"))
+
+
+def test_entries_are_evicted_past_the_size_limit(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=100)
+
+    cache.put("a", {"text": "x" * 60})
+    cache.put("b", {"text": "y" * 60})
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+
+def test_entries_survive_a_restart(cache):
+    cache.put("a", {"key": "a"})
+
+    reopened = ResultCache(cache.directory)
+
+    assert reopened.get("a") == {"key": "a"}
+
+
+def test_reopening_with_a_smaller_limit_evicts(cache):
+    for index, key in enumerate("abc"):
+        cache.put(key, {"key": key})
+        # Restarts order the entries by modification time
+        os.utime(cache._path(key), (index, index))
+
+    reopened = ResultCache(cache.directory, max_entries=1)
+
+    assert sorted(os.listdir(cache.directory)) == ["c.json"]
+    assert reopened.get("c") == {"key": "c"}
+
+
+def test_corrupt_entry_is_a_miss(cache):
+    cache.put("a", {"key": "a"})
+    with open(cache._path("a"), "w") as f:
+        f.write("{")
+
+    assert cache.get("a") is None
+    assert cache.stats["misses"] == 1
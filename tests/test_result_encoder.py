@@ -0,0 +1,142 @@
+import base64
+import json
+import os
+
+import pytest
+
+from tools.artifacts import ArtifactStore
+from tools.execution import Execution, ExecutionError, Logs, Result
+from tools.result_encoder import (
+    ResultEncoder,
+    execution_record,
+    format_savings,
+    truncate,
+)
+
+PNG = base64.b64encode(b"\x89PNG fake chart").decode()
+
+
+@pytest.fixture
+def encoder(tmp_path):
+    return ResultEncoder(
+        ArtifactStore(str(tmp_path / "artifacts")),
+        max_log_chars=60,
+        max_text_chars=30,
+    )
+
+
+def encode(encoder, execution) -> dict:
+    return json.loads(encoder.encode(execution_record(execution)))
+
+
+def test_execution_record_is_plain_json():
+    execution = Execution(
+        results=[Result(text="3", is_main_result=True)],
+        logs=Logs(stdout=["a\n", "b\n"]),
+        error=ExecutionError("ValueError", "bad", "Traceback ..."),
+    )
+
+    record = execution_record(execution)
+
+    assert json.loads(json.dumps(record)) == {
+        "results": [{"text": "3"}],
+        "stdout": ["a\n", "b\n"],
+        "stderr": [],
+        "error": {"name": "ValueError", "value": "bad", "traceback": "Traceback ..."},
+    }
+
+
+def test_empty_fields_are_dropped(encoder):
+    output = encoder.encode(execution_record(Execution(logs=Logs(stdout=["1\n"]))))
+
+    assert output == '{"stdout":"1\\n"}'
+
+
+def test_truncate_keeps_head_and_tail():
+    text = "a" * 100 + "b" * 100
+
+    cut = truncate(text, 30)
+
+    assert cut.startswith("a" * 20) and cut.endswith("b" * 10)
+    assert "[170 bytes omitted]" in cut
+    assert truncate("short", 30) == "short"
+
+
+def test_truncate_counts_omitted_bytes_not_characters():
+    assert "[170 bytes omitted]" in truncate("é" * 100, 15)
+
+
+def test_long_logs_are_cut_and_spilled(encoder):
+    stdout = [f"line {index}\n" for index in range(100)]
+
+    output = encode(encoder, Execution(logs=Logs(stdout=stdout)))
+
+    assert output["stdout"].startswith("line 0\n")
+    assert "bytes omitted" in output["stdout"]
+    path = output["stdout"].rsplit("[full output: ", 1)[1].rstrip("]")
+    with open(path) as f:
+        assert f.read() == "".join(stdout)
+
+
+def test_long_text_result_is_spilled(encoder):
+    output = encode(encoder, Execution(results=[Result(text="x" * 100)]))
+
+    text = output["results"][0]["text"]
+    assert text.startswith("x" * 20 + "\n... [70 bytes omitted] ...\n")
+    assert "[full output: " in text
+
+
+def test_traceback_is_cut_but_not_spilled(encoder):
+    error = ExecutionError("KeyError", "'a'", "frame\n" * 100)
+
+    output = encode(encoder, Execution(error=error))
+
+    assert output["error"]["name"] == "KeyError"
+    assert "bytes omitted" in output["error"]["traceback"]
+    assert "full output" not in output["error"]["traceback"]
+
+
+def test_images_are_spilled_as_charts(encoder):
+    result = Result(text="<Figure size 640x480 with 1 Axes>", png=PNG)
+
+    output = encode(encoder, Execution(results=[result]))
+
+    path = output["results"][0]["png"]
+    assert output["results"][0] == {"png": path}
+    with open(path, "rb") as f:
+        assert f.read() == b"\x89PNG fake chart"
+    assert encoder.artifacts.charts() == [path]
+
+
+def test_html_is_spilled_but_not_a_chart(encoder):
+    output = encode(encoder, Execution(results=[Result(text="df", html="<table>")]))
+
+    assert output["results"][0]["text"] == "df"
+    assert output["results"][0]["html"].endswith(".html")
+    assert encoder.artifacts.charts() == []
+
+
+def test_json_results_are_kept_inline_when_short(encoder):
+    output = encode(encoder, Execution(results=[Result(json={"a": 1})]))
+
+    assert output["results"][0]["json"] == '{"a": 1}'
+
+
+def test_same_chart_is_stored_once(encoder):
+    first = encode(encoder, Execution(results=[Result(png=PNG)]))
+    second = encode(encoder, Execution(results=[Result(png=PNG)]))
+
+    assert first == second
+    assert encoder.artifacts.stats["deduplicated"] == 1
+    assert len(os.listdir(encoder.artifacts.directory)) == 2
+
+
+def test_savings_compare_with_the_verbose_format(encoder):
+    encoder.encode(execution_record(Execution(logs=Logs(stdout=["1\n"] * 20))))
+
+    assert encoder.stats["calls"] == 1
+    assert encoder.stats["compact_tokens"] < encoder.stats["verbose_tokens"]
+    assert encoder.savings().startswith("1 call(s): ~")
+    assert format_savings({"calls": 0, "verbose_tokens": 0, "compact_tokens": 0}) == (
+        "0 call(s): ~0 tokens instead of ~0 (0% saved)"
+    )
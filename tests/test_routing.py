@@ -0,0 +1,167 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+crewai = pytest.importorskip("crewai")
+
+import agents.routing as routing  # noqa: E402
+from agents.routing import ModelRoute, ModelRouter, ModelUsage, RoutedLLM  # noqa: E402
+from tools.cassette import Cassette  # noqa: E402
+
+CONFIG = {
+    "default": "small",
+    "fallback": "fast",
+    "agents": {
+        "Data Reader": "small",
+        "Insight Generator": {
+            "model": "large",
+            "latency_budget": 30,
+            "token_budget": 100,
+        },
+        "Report Creator": {"model": "large", "fallback": "medium"},
+    },
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def provider(monkeypatch):
+    """Answer every provider call with the model that was asked."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.delenv("LLM_CACHE_DIR", raising=False)
+    monkeypatch.setattr(routing, "get_cassette", lambda: None)
+    calls = []
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        calls.append(self.model)
+        return f"reply from {self.model}"
+
+    monkeypatch.setattr(crewai.LLM, "call", call)
+    return calls
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(
+        routing, "time", SimpleNamespace(perf_counter=clock.perf_counter)
+    )
+    return clock
+
+
+def routed(route: ModelRoute, **options) -> RoutedLLM:
+    return RoutedLLM("Insight Generator", route, ModelUsage(), **options)
+
+
+def test_router_reads_routes_and_fallbacks():
+    router = ModelRouter(CONFIG)
+
+    assert router.route("Data Reader") == ModelRoute("small", fallback="fast")
+    assert router.route("Insight Generator") == ModelRoute(
+        "large", fallback="fast", latency_budget=30, token_budget=100
+    )
+    assert router.route("Report Creator").fallback == "medium"
+    assert router.route("Unknown") == ModelRoute("small", fallback="fast")
+
+
+def test_route_without_a_model_is_rejected():
+    with pytest.raises(ValueError, match="needs a 'model'"):
+        ModelRouter({"agents": {"Data Reader": {"latency_budget": 5}}})
+
+
+def test_routes_from_env(monkeypatch, tmp_path):
+    path = tmp_path / "routes.json"
+    path.write_text(json.dumps(CONFIG))
+
+    monkeypatch.setenv("LLM_ROUTES", str(path))
+    assert ModelRouter.from_env().route("Insight Generator").model == "large"
+    monkeypatch.setenv("LLM_ROUTES", '{"default": "tiny"}')
+    assert ModelRouter.from_env().route(None).model == "tiny"
+    monkeypatch.setenv("LLM_ROUTES", "{not json")
+    with pytest.raises(ValueError, match="not valid JSON"):
+        ModelRouter.from_env()
+    monkeypatch.setenv("LLM_ROUTES", "")
+    assert ModelRouter.from_env() is None
+
+
+def test_token_budget_switches_to_the_fallback(provider, clock):
+    llm = routed(ModelRoute("large", fallback="fast", token_budget=100))
+
+    llm.call("x" * 800)
+    llm.call("short")
+    llm.call("short")
+
+    assert provider == ["large", "fast", "fast"]
+    assert llm.usage.fallbacks == {"Insight Generator": "over the 100 token budget"}
+    assert llm.usage.roles["Insight Generator"]["large"]["calls"] == 1
+    assert llm.usage.roles["Insight Generator"]["fast"]["calls"] == 2
+
+
+def test_calls_within_budget_keep_the_model(provider, clock):
+    llm = routed(ModelRoute("large", fallback="fast", token_budget=1000))
+
+    for _ in range(3):
+        llm.call("short")
+
+    assert provider == ["large"] * 3
+    assert llm.usage.fallbacks == {}
+
+
+def test_latency_budget_counts_from_the_first_call(provider, clock):
+    clock.now = 100.0
+    llm = routed(ModelRoute("large", fallback="fast", latency_budget=30))
+
+    llm.call("short")
+    clock.now = 129.0
+    llm.call("short")
+    clock.now = 131.0
+    llm.call("short")
+
+    assert provider == ["large", "large", "fast"]
+    assert "30s latency budget" in llm.usage.fallbacks["Insight Generator"]
+
+
+def test_latency_budget_is_ignored_with_a_cassette(provider, clock, tmp_path):
+    cassette = Cassette(str(tmp_path), "record")
+    llm = routed(
+        ModelRoute("large", fallback="fast", latency_budget=30), cassette=cassette
+    )
+
+    llm.call("short")
+    clock.now = 1000.0
+    llm.call("short")
+
+    assert provider == ["large", "large"]
+
+
+def test_no_fallback_without_a_fallback_model(provider, clock):
+    llm = routed(ModelRoute("large", token_budget=1))
+
+    llm.call("x" * 800)
+    llm.call("short")
+
+    assert provider == ["large", "large"]
+
+
+def test_report_lists_the_models_of_each_stage(clock):
+    router = ModelRouter(CONFIG)
+    llm = router.llm_for("Insight Generator")
+    llm.call("x" * 800)
+    llm.call("short")
+
+    lines = router.report(
+        {"insight_generation": "Insight Generator", "data_loading": "Data Reader"}
+    )
+
+    assert lines[0].startswith("insight_generation: large 1 call(s), ")
+    assert "; fast 1 call(s), " in lines[0]
+    assert lines[0].endswith("(fell back: over the 100 token budget)")
+    assert lines[1] == "data_loading: no LLM calls"
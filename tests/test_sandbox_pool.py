@@ -0,0 +1,145 @@
+import threading
+
+import pytest
+
+from tools.execution import Execution, ExecutionError
+from tools.fake_sandbox import FakeSandbox
+from tools.sandbox_pool import SandboxPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def make_pool(**kwargs) -> tuple:
+    created = []
+
+    def factory():
+        sandbox = FakeSandbox()
+        created.append(sandbox)
+        return sandbox
+
+    clock = kwargs.pop("clock", FakeClock())
+    return SandboxPool(factory=factory, clock=clock, **kwargs), created, clock
+
+
+def test_released_sandbox_is_reused_after_reset():
+    pool, created, _ = make_pool(max_size=2)
+
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+
+    assert second is first
+    assert len(created) == 1
+    assert first.executed == ["%reset -f"]
+    assert pool.stats["created"] == 1
+    assert pool.stats["reused"] == 1
+
+
+def test_acquire_times_out_when_pool_is_exhausted():
+    pool, _, _ = make_pool(max_size=1, clock=lambda: 0.0)
+    pool.acquire()
+
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0)
+    assert pool.size == 1
+
+
+def test_acquire_blocks_until_a_sandbox_is_released():
+    pool, created, _ = make_pool(max_size=1)
+    leased = pool.acquire()
+    acquired = []
+
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+
+    pool.release(leased)
+    waiter.join(5)
+    assert acquired == [leased]
+    assert len(created) == 1
+
+
+def test_idle_sandboxes_are_evicted_after_ttl():
+    pool, created, clock = make_pool(max_size=2, idle_ttl=10)
+    sandbox = pool.acquire()
+    pool.release(sandbox)
+
+    clock.advance(9)
+    assert pool.evict_idle() == 0
+    clock.advance(1)
+    assert pool.evict_idle() == 1
+
+    assert sandbox.killed
+    assert pool.size == 0
+    assert pool.stats["evicted"] == 1
+
+
+def test_expired_sandbox_is_replaced_on_acquire():
+    pool, created, clock = make_pool(max_size=1, idle_ttl=10)
+    pool.release(pool.acquire())
+
+    clock.advance(10)
+    sandbox = pool.acquire()
+
+    assert sandbox is created[1]
+    assert created[0].killed
+    assert pool.stats["evicted"] == 1
+
+
+def test_sandbox_failing_reset_is_discarded():
+    pool, created, _ = make_pool(max_size=1)
+    sandbox = pool.acquire()
+    sandbox.handler = lambda code: Execution(
+        error=ExecutionError("NameError", "reset failed", "")
+    )
+
+    pool.release(sandbox)
+
+    assert sandbox.killed
+    assert pool.size == 0
+    assert pool.stats["discarded"] == 1
+    assert pool.acquire() is created[1]
+
+
+def test_unhealthy_idle_sandbox_is_discarded_on_acquire():
+    pool, created, _ = make_pool(max_size=1)
+    sandbox = pool.acquire()
+    pool.release(sandbox)
+    sandbox.killed = True
+
+    assert pool.acquire() is created[1]
+    assert pool.stats["discarded"] == 1
+    assert pool.stats["reused"] == 0
+
+
+def test_prewarm_fills_pool_to_min_size():
+    pool, created, _ = make_pool(min_size=2, max_size=3)
+
+    assert pool.prewarm() == 2
+    assert pool.prewarm() == 0
+    assert pool.acquire() in created
+    assert len(created) == 2
+
+
+def test_closed_pool_kills_released_sandboxes():
+    pool, _, _ = make_pool(max_size=2)
+    idle = pool.acquire()
+    leased = pool.acquire()
+    pool.release(idle)
+
+    pool.close()
+    assert idle.killed
+    pool.release(leased)
+    assert leased.killed
+    with pytest.raises(RuntimeError):
+        pool.acquire()
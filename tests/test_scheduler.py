@@ -0,0 +1,130 @@
+import pytest
+
+from tools.fake_sandbox import FakeSandbox
+from tools.sandbox_pool import SandboxPool
+from workflow.config import WorkflowConfig
+from workflow.scheduler import concurrent_tasks, plan_stages
+
+DIAMOND = {
+    "read": [],
+    "clean": ["read"],
+    "left": ["clean"],
+    "right": ["clean"],
+    "report": ["left", "right"],
+}
+
+
+def test_stages_follow_the_critical_path():
+    assert plan_stages(DIAMOND) == [
+        ["read"],
+        ["clean"],
+        ["left", "right"],
+        ["report"],
+    ]
+
+
+def test_stages_keep_declaration_order():
+    stages = plan_stages({"b": [], "a": [], "c": ["a", "b"]})
+
+    assert stages == [["b", "a"], ["c"]]
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError, match="Unknown task dependencies: missing"):
+        plan_stages({"a": ["missing"]})
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        plan_stages({"a": ["b"], "b": ["a"]})
+
+
+def test_multi_task_stage_runs_concurrently():
+    assert concurrent_tasks(plan_stages(DIAMOND)) == {"left", "right"}
+
+
+def test_final_multi_task_stage_runs_sequentially():
+    # A crew can't end with more than one async task
+    stages = [["read"], ["left", "right"]]
+
+    assert concurrent_tasks(stages) == set()
+
+
+def test_stage_after_a_concurrent_stage_runs_sequentially():
+    # Consecutive async tasks would all start together
+    stages = [["a", "b"], ["c", "d"], ["e", "f"], ["report"]]
+
+    assert concurrent_tasks(stages) == {"a", "b", "e", "f"}
+
+
+def test_single_task_stages_never_run_concurrently():
+    assert concurrent_tasks([["a"], ["b"], ["c"]]) == set()
+
+
+@pytest.fixture
+def make_workflow(monkeypatch, tmp_path):
+    pytest.importorskip("crewai_tools")
+    from workflow.data_analysis_workflow import DataAnalysisWorkflow
+
+    # Agents build their LLM client up front; nothing is called
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.delenv("MODEL_ROUTING", raising=False)
+    pool = SandboxPool(factory=FakeSandbox, max_size=4)
+    workflows = []
+
+    def make(**options) -> DataAnalysisWorkflow:
+        config = WorkflowConfig(
+            backend="fake",
+            profile=False,
+            time_series=False,
+            memory=False,
+            trace_path="",
+            artifact_dir=str(tmp_path / "artifacts"),
+            **options,
+        )
+        workflow = DataAnalysisWorkflow(
+            "data/grocery.csv", config=config, sandbox_pool=pool
+        )
+        workflows.append(workflow)
+        return workflow
+
+    yield make
+    for workflow in workflows:
+        for interpreter in workflow._unique_interpreters():
+            interpreter.close()
+    pool.close()
+
+
+def async_tasks(crew) -> list:
+    return [task.async_execution for task in crew.tasks]
+
+
+def test_workflow_runs_sequentially_by_default(make_workflow):
+    workflow = make_workflow()
+
+    crew = workflow._create_crew()
+
+    assert workflow.concurrent == set()
+    assert not any(async_tasks(crew))
+    assert len(workflow._unique_interpreters()) == 1
+
+
+def test_parallel_workflow_forks_the_concurrent_tasks(make_workflow):
+    workflow = make_workflow(parallel=True)
+
+    crew = workflow._create_crew()
+
+    assert workflow.concurrent == {"insight_generation", "time_series_prediction"}
+    assert async_tasks(crew) == [False, False, False, True, True, False]
+    assert len(workflow._unique_interpreters()) == 3
+
+
+def test_report_less_workflow_ends_with_a_sequential_stage(make_workflow):
+    workflow = make_workflow(parallel=True, report_llm=False)
+
+    crew = workflow._create_crew()
+
+    assert "report_creation" not in workflow.tasks
+    assert workflow.stages[-1] == ["insight_generation", "time_series_prediction"]
+    assert workflow.concurrent == set()
+    assert not any(async_tasks(crew))
@@ -0,0 +1,169 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from workflow.dataset_profiler import profile_dataset
+from workflow.time_series import detect_time_series, format_time_series
+
+GROCERY = "data/grocery.csv"
+
+DATE_COLUMNS = ["Date_Received", "Last_Order_Date", "Expiration_Date"]
+
+
+def write_series(path, days: int, rows_per_day: int, value, seed: int = 0) -> str:
+    """Write `rows_per_day` rows per day whose amounts add up to `value(t)`."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2022-01-01", periods=days, freq="D")
+    t = np.repeat(np.arange(days), rows_per_day)
+    amount = np.repeat([value(day, rng) for day in range(days)], rows_per_day)
+    pd.DataFrame(
+        {
+            "order_date": dates[t].strftime("%Y-%m-%d"),
+            "amount": (amount / rows_per_day).round(4),
+            "discount": [f"{rate:.1f}%" for rate in rng.uniform(0, 10, len(t))],
+            "store_id": rng.integers(1, 9, len(t)),
+            "city": rng.choice(["a", "b"], len(t)),
+        }
+    ).to_csv(path, index=False)
+    return str(path)
+
+
+def variable(screening: dict, measure: str) -> dict:
+    return next(
+        variable
+        for variable in screening["time_series_variables"]
+        if variable["measure"] == measure
+    )
+
+
+@pytest.fixture
+def trended(tmp_path):
+    return write_series(
+        tmp_path / "trended.csv",
+        days=120,
+        rows_per_day=5,
+        value=lambda day, rng: 100 + 2 * day + rng.normal(0, 5),
+    )
+
+
+def test_grocery_date_columns_are_resampled_weekly():
+    screening = detect_time_series(GROCERY, profile=profile_dataset(GROCERY))
+
+    assert list(screening["date_columns"]) == DATE_COLUMNS
+    for axis in screening["date_columns"].values():
+        assert axis["frequency"] == "weekly"
+        assert axis["periods"] == 54
+    assert screening["series_screened"] > len(screening["time_series_variables"])
+
+
+def test_grocery_variables_have_the_shape_the_task_expects():
+    variables = detect_time_series(GROCERY)["time_series_variables"]
+
+    assert len(variables) == 12
+    scores = [variable["suitability_score"] for variable in variables]
+    assert scores == sorted(scores, reverse=True)
+    for variable in variables:
+        assert 0 <= variable["suitability_score"] <= 10
+        assert variable["date_column"] in DATE_COLUMNS
+        assert variable["prediction_horizon"] in (
+            "short-term",
+            "medium-term",
+            "long-term",
+        )
+        assert variable["recommended_models"]
+        assert {"trend", "seasonality", "stationary"} <= set(
+            variable["characteristics"]
+        )
+        # Identifiers are not measures
+        assert "ID" not in variable["measure"]
+
+
+def test_trended_series(trended):
+    screening = detect_time_series(trended)
+    amount = variable(screening, "amount")
+
+    assert screening["date_columns"]["order_date"]["frequency"] == "daily"
+    assert amount["name"] == "amount (sum) per day of order_date"
+    assert amount["characteristics"]["trend"]
+    assert amount["characteristics"]["trend_slope_per_period"] == pytest.approx(
+        2, abs=0.1
+    )
+    assert amount["characteristics"]["stationary"] is False
+    assert amount["recommended_models"][0] == "ARIMA (differenced)"
+
+
+def test_stationary_noise(tmp_path):
+    path = write_series(
+        tmp_path / "noise.csv",
+        days=200,
+        rows_per_day=5,
+        value=lambda day, rng: 100 + rng.normal(0, 5),
+    )
+
+    amount = variable(detect_time_series(path), "amount")
+
+    assert not amount["characteristics"]["trend"]
+    assert amount["characteristics"]["stationary"] is True
+
+
+def test_weekly_seasonality(tmp_path):
+    path = write_series(
+        tmp_path / "seasonal.csv",
+        days=140,
+        rows_per_day=5,
+        value=lambda day, rng: 100
+        + 30 * np.sin(2 * np.pi * day / 7)
+        + rng.normal(0, 2),
+    )
+
+    amount = variable(detect_time_series(path), "amount")
+
+    assert amount["characteristics"]["seasonality"]
+    assert amount["characteristics"]["seasonal_period"] == 7
+    assert amount["recommended_models"][0] == "SARIMA"
+
+
+def test_sparse_days_fall_back_to_a_coarser_frequency(tmp_path):
+    path = tmp_path / "sparse.csv"
+    dates = pd.date_range("2020-01-01", periods=1_000, freq="3D")
+    pd.DataFrame(
+        {"order_date": dates.strftime("%Y-%m-%d"), "amount": np.arange(1_000)}
+    ).to_csv(path, index=False)
+
+    screening = detect_time_series(str(path))
+
+    assert screening["date_columns"]["order_date"]["frequency"] == "monthly"
+
+
+def test_too_few_periods_are_skipped(tmp_path):
+    path = write_series(
+        tmp_path / "short.csv", days=5, rows_per_day=5, value=lambda day, rng: day
+    )
+
+    screening = detect_time_series(path)
+
+    assert screening["date_columns"]["order_date"] == {
+        "skipped": "too few or too sparse periods"
+    }
+    assert screening["time_series_variables"] == []
+
+
+def test_percentages_are_averaged(trended):
+    discount = variable(detect_time_series(trended), "discount")
+
+    assert discount["aggregation"] == "mean"
+    assert 0 < discount["characteristics"]["mean"] < 10
+
+
+def test_chunked_screening_matches_a_single_pass(trended):
+    assert detect_time_series(trended, chunksize=37) == detect_time_series(trended)
+
+
+def test_format_time_series_is_compact_json(trended):
+    screening = detect_time_series(trended)
+    text = format_time_series(screening)
+
+    assert json.loads(text)["series_screened"] == screening["series_screened"]
+    assert ", " not in text
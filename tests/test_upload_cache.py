@@ -0,0 +1,118 @@
+import pytest
+
+import tools.upload_cache as upload_cache
+from tools.fake_sandbox import FakeSandbox
+from tools.local_kernel import LocalKernelSandbox
+from tools.sandbox_pool import SandboxPool
+from tools.upload_cache import cached_upload, file_digest, get_manifest
+
+
+class Uploader:
+    """Upload callable counting the transfers it makes."""
+
+    def __init__(self, sandbox):
+        self.sandbox = sandbox
+        self.uploaded = []
+
+    def __call__(self, path: str) -> str:
+        with open(path, "rb") as f:
+            self.sandbox.files.write(path, f.read())
+        self.uploaded.append(path)
+        return path
+
+
+@pytest.fixture
+def kernel(monkeypatch, tmp_path):
+    # Relative paths are local files here and sandbox files in the kernel's workdir
+    monkeypatch.chdir(tmp_path)
+    sandbox = LocalKernelSandbox()
+    yield sandbox
+    sandbox.kill()
+    upload_cache.forget_manifest(sandbox)
+
+
+def write(path: str, content: str) -> str:
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+
+def test_file_digest_is_memoized_per_content(tmp_path):
+    path = write(str(tmp_path / "a.csv"), "a,b\n1,2\n")
+    first = file_digest(path)
+
+    assert file_digest(path) == first
+    write(path, "a,b\n3,4\n")
+    assert file_digest(path) != first
+
+
+def test_unchanged_file_is_skipped(kernel):
+    upload = Uploader(kernel)
+    path = write("data.csv", "a,b\n1,2\n")
+
+    cached_upload(kernel, path, upload)
+    cached_upload(kernel, path, upload)
+
+    assert upload.uploaded == ["data.csv"]
+    assert get_manifest(kernel).stats == {"uploaded": 1, "skipped": 1, "copied": 0}
+
+
+def test_renamed_duplicate_is_copied_in_the_sandbox(kernel):
+    upload = Uploader(kernel)
+    cached_upload(kernel, write("data.csv", "a,b\n1,2\n"), upload)
+
+    cached_upload(kernel, write("copy.csv", "a,b\n1,2\n"), upload)
+
+    assert upload.uploaded == ["data.csv"]
+    assert kernel.files.read("copy.csv") == "a,b\n1,2\n"
+    assert get_manifest(kernel).stats["copied"] == 1
+    # A copy, not a link: rewriting one leaves the other alone
+    kernel.files.write("data.csv", "changed")
+    assert kernel.files.read("copy.csv") == "a,b\n1,2\n"
+
+
+def test_file_missing_in_the_sandbox_is_uploaded_again(kernel):
+    upload = Uploader(kernel)
+    path = write("data.csv", "a,b\n1,2\n")
+    cached_upload(kernel, path, upload)
+
+    kernel.files.remove(path)
+    cached_upload(kernel, path, upload)
+
+    assert upload.uploaded == ["data.csv", "data.csv"]
+    assert kernel.files.read(path) == "a,b\n1,2\n"
+
+
+def test_file_rewritten_in_the_sandbox_is_uploaded_again(kernel):
+    upload = Uploader(kernel)
+    path = write("data.csv", "a,b\n1,2\n")
+    cached_upload(kernel, path, upload)
+
+    kernel.run_code("open('data.csv', 'w').write('cleaned')")
+    cached_upload(kernel, path, upload)
+
+    assert len(upload.uploaded) == 2
+    assert kernel.files.read(path) == "a,b\n1,2\n"
+
+
+def test_manifest_survives_in_the_sandbox(kernel):
+    cached_upload(kernel, write("data.csv", "a,b\n1,2\n"), Uploader(kernel))
+    upload_cache.forget_manifest(kernel)
+
+    # A new manifest reads the one mirrored inside the sandbox
+    assert get_manifest(kernel).holds("data.csv", file_digest("data.csv"))
+
+
+def test_pool_drops_the_manifest_of_killed_sandboxes():
+    pool = SandboxPool(factory=FakeSandbox, max_size=2)
+    kept, discarded = pool.acquire(), pool.acquire()
+    get_manifest(kept)
+    get_manifest(discarded)
+
+    pool.discard(discarded)
+    assert discarded.sandbox_id not in upload_cache._manifests
+    assert kept.sandbox_id in upload_cache._manifests
+
+    pool.release(kept)
+    pool.close()
+    assert kept.sandbox_id not in upload_cache._manifests
@@ -0,0 +1,216 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import tarfile
+import threading
+import time
+from typing import Any, Dict, List
+
+# Local directory artifacts are spilled to unless configured otherwise
+DEFAULT_ARTIFACT_DIR = "artifacts"
+
+# Index of the artifacts in a store directory, with where each came from
+INDEX_FILE = "index.json"
+
+# Extensions of the sandbox files harvested as charts
+CHART_EXTENSIONS = ("png", "jpg", "jpeg", "svg")
+
+# Stores writing to the same directory (a tool and its forks) share the index
+_index_lock = threading.Lock()
+
+# Files generated in a sandbox that are downloaded as artifacts
+DEFAULT_DOWNLOAD_PATTERNS = (
+    "**/*.png",
+    "**/*.jpg",
+    "**/*.jpeg",
+    "**/*.svg",
+    "**/*.html",
+    "**/*.pdf",
+    "**/*.csv",
+    "**/*.xlsx",
+    "**/*.json",
+    "**/*.md",
+)
+
+# Sandbox files larger than this are left out of downloads
+MAX_DOWNLOAD_BYTES = 50 * 1024 * 1024
+
+
+def run_artifact_dir(name: str) -> str:
+    """A new directory for one run's artifacts, under $ARTIFACT_DIR or ./artifacts."""
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(
+        os.getenv("ARTIFACT_DIR", DEFAULT_ARTIFACT_DIR),
+        f"{name}-{stamp}-{os.urandom(2).hex()}",
+    )
+
+
+def archive_code(
+    target: str,
+    patterns=DEFAULT_DOWNLOAD_PATTERNS,
+    since: str | None = None,
+    exclude=(),
+    max_bytes: int = MAX_DOWNLOAD_BYTES,
+) -> str:
+    """
+    Sandbox-side code packing the files matching `patterns` into a gzipped tar.
+
+    Only files modified after the file `since` (if given) and not listed in
+    `exclude` are packed. The archived paths are printed as JSON.
+    """
+    return f"""
+def _archive_files(target, patterns, since, exclude, max_bytes):
+    import glob, json, os, tarfile
+    threshold = os.path.getmtime(since) if since and os.path.exists(since) else None
+    names = set()
+    for pattern in patterns:
+        for name in glob.glob(pattern, recursive=True):
+            if not os.path.isfile(name) or name in exclude:
+                continue
+            if threshold is not None and os.path.getmtime(name) < threshold:
+                continue
+            if os.path.getsize(name) <= max_bytes:
+                names.add(name)
+    with tarfile.open(target, "w:gz") as archive:
+        for name in sorted(names):
+            archive.add(name)
+    print(json.dumps(sorted(names)))
+
+_archive_files({target!r}, {list(patterns)!r}, {since!r}, {set(exclude)!r}, {max_bytes!r})
+del _archive_files
+"""
+
+
+class ArtifactStore:
+    """
+    Content-addressed local store for charts, HTML and long outputs.
+
+    Artifacts are named after the SHA-256 of their content, so writing the
+    same chart twice stores it once and returns the same path. `index.json`
+    records the kind, size and sources of every artifact and whether it is a
+    chart, so reports can list and link them.
+    """
+
+    def __init__(self, directory: str | None = None):
+        """
+        Initialize the artifact store.
+
+        Args:
+            directory: Directory to write artifacts to (defaults to $ARTIFACT_DIR or ./artifacts)
+        """
+        self.directory = directory or os.getenv("ARTIFACT_DIR", DEFAULT_ARTIFACT_DIR)
+        self.stats = {"written": 0, "deduplicated": 0, "bytes": 0}
+        self._lock = threading.Lock()
+
+    def put(
+        self,
+        data: bytes | str,
+        extension: str,
+        source: str = "result",
+        chart: bool = False,
+    ) -> str:
+        """
+        Store an artifact.
+
+        Args:
+            data: Raw bytes, or text to store as UTF-8
+            extension: File extension without the dot (png, svg, html, txt, ...)
+            source: Where the artifact came from (an execution result or a sandbox path)
+            chart: Whether the artifact is a chart (an image output or file)
+
+        Returns:
+            Local path of the stored artifact
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        name = f"{hashlib.sha256(data).hexdigest()[:16]}.{extension}"
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            if os.path.exists(path):
+                self.stats["deduplicated"] += 1
+            else:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(data)
+                self.stats["written"] += 1
+                self.stats["bytes"] += len(data)
+        self._index(name, extension, len(data), source, chart)
+        return path
+
+    def put_base64(
+        self, data: str, extension: str, source: str = "result", chart: bool = False
+    ) -> str:
+        """Store a base64-encoded artifact (as returned for PNG/JPEG results)."""
+        return self.put(base64.b64decode(data), extension, source, chart)
+
+    def put_archive(self, data: bytes) -> Dict[str, str]:
+        """
+        Store every file of a tar archive (e.g. files downloaded from a sandbox).
+
+        Members are stored by content like any other artifact, never extracted
+        under their own names, so archive paths can't escape the store. Images
+        count as charts.
+
+        Returns:
+            Local path of each archived file, by its path in the archive
+        """
+        paths = {}
+        with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                extension = os.path.splitext(member.name)[1].lstrip(".") or "bin"
+                content = archive.extractfile(member).read()
+                extension = extension.lower()
+                paths[member.name] = self.put(
+                    content, extension, member.name, extension in CHART_EXTENSIONS
+                )
+        return paths
+
+    def _index(
+        self, name: str, extension: str, size: int, source: str, chart: bool
+    ) -> None:
+        # Re-read the index so stores sharing the directory don't drop entries
+        with _index_lock:
+            index = self.index()
+            entry = index.setdefault(
+                name,
+                {
+                    "kind": extension,
+                    "bytes": size,
+                    "sources": [],
+                    "stored_at": time.time(),
+                },
+            )
+            entry["count"] = entry.get("count", 0) + 1
+            entry["chart"] = entry.get("chart", False) or chart
+            if source not in entry["sources"]:
+                entry["sources"].append(source)
+            with open(os.path.join(self.directory, INDEX_FILE + ".tmp"), "w") as f:
+                json.dump(index, f, indent=2)
+            os.replace(
+                os.path.join(self.directory, INDEX_FILE + ".tmp"),
+                os.path.join(self.directory, INDEX_FILE),
+            )
+
+    def index(self) -> Dict[str, Dict[str, Any]]:
+        """Entries of `index.json`, by artifact file name."""
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE)) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def charts(self) -> List[str]:
+        """Local paths of the stored charts, oldest first."""
+        entries = sorted(self.index().items(), key=lambda item: item[1]["stored_at"])
+        return [
+            os.path.join(self.directory, name)
+            for name, entry in entries
+            if entry.get("chart")
+        ]
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self.stats)
@@ -0,0 +1,115 @@
+import os
+from typing import Any, Callable, Dict, Protocol
+
+# Backend used when neither the tool nor CODE_INTERPRETER_BACKEND selects one
+DEFAULT_BACKEND = "e2b"
+
+
+class SandboxFiles(Protocol):
+    def write(self, path: str, data: Any) -> Any: ...
+
+    def read(self, path: str, format: str = "text") -> Any: ...
+
+
+class ExecutionBackend(Protocol):
+    """
+    What the code interpreter tool needs from a sandbox.
+
+    `e2b_code_interpreter.Sandbox` satisfies it as-is; `LocalKernelSandbox` and
+    `FakeSandbox` implement it without any network access.
+    """
+
+    files: SandboxFiles
+
+    def run_code(self, code: str, **kwargs: Any) -> Any: ...
+
+    def set_timeout(self, timeout: int) -> None: ...
+
+    def kill(self) -> Any: ...
+
+
+def e2b_sandbox_factory(timeout: int = 600) -> ExecutionBackend:
+    """Create a new E2B sandbox; the E2B client is only imported when needed."""
+    from e2b_code_interpreter import Sandbox
+
+    return Sandbox(timeout=timeout)
+
+
+def local_sandbox_factory(timeout: int = 600) -> ExecutionBackend:
+    """Start a persistent local kernel process."""
+    from tools.local_kernel import LocalKernelSandbox
+
+    return LocalKernelSandbox(timeout=timeout)
+
+
+def fake_sandbox_factory(timeout: int = 600) -> ExecutionBackend:
+    """Create an in-memory sandbox that doesn't execute code."""
+    from tools.fake_sandbox import FakeSandbox
+
+    return FakeSandbox(timeout=timeout)
+
+
+def replay_sandbox_factory(timeout: int = 600) -> ExecutionBackend:
+    """Create a sandbox answering every cell from the active cassette."""
+    from tools.cassette import ReplaySandbox, get_cassette
+
+    cassette = get_cassette()
+    if cassette is None or not cassette.replaying:
+        raise ValueError(
+            "The replay backend needs a cassette in replay mode (set CASSETTE_DIR)"
+        )
+    return ReplaySandbox(cassette, timeout=timeout)
+
+
+BACKENDS: Dict[str, Callable[..., ExecutionBackend]] = {
+    "e2b": e2b_sandbox_factory,
+    "local": local_sandbox_factory,
+    "fake": fake_sandbox_factory,
+    "replay": replay_sandbox_factory,
+}
+
+
+async def connect_async(sandbox: ExecutionBackend, backend: str) -> Any | None:
+    """
+    Attach an async client to an existing sandbox.
+
+    The client talks to the same E2B sandbox, so it shares the kernel state of
+    the synchronous one. Backends without an async client return None and are
+    driven from a worker thread instead.
+    """
+    if backend != "e2b" or getattr(sandbox, "sync_only", False):
+        return None
+    from e2b_code_interpreter import AsyncSandbox
+
+    return await AsyncSandbox.connect(sandbox.sandbox_id)
+
+
+def resolve_backend(backend: str | None = None) -> str:
+    """Return the backend name to use, falling back to CODE_INTERPRETER_BACKEND."""
+    name = backend or os.getenv("CODE_INTERPRETER_BACKEND", DEFAULT_BACKEND)
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown code interpreter backend '{name}'. Choose one of: {', '.join(BACKENDS)}"
+        )
+    return name
+
+
+def create_sandbox(backend: str | None = None, timeout: int = 600) -> ExecutionBackend:
+    """
+    Create a sandbox for the given backend.
+
+    Args:
+        backend: Name of the backend (e2b, local or fake)
+        timeout: Sandbox lifetime in seconds
+
+    Returns:
+        A new sandbox implementing `ExecutionBackend`, recorded to the active
+        cassette when one is recording
+    """
+    from tools.cassette import RecordingSandbox, get_cassette
+
+    sandbox = BACKENDS[resolve_backend(backend)](timeout=timeout)
+    cassette = get_cassette()
+    if cassette is not None and cassette.recording:
+        return RecordingSandbox(sandbox, cassette)
+    return sandbox
@@ -0,0 +1,271 @@
+"""
+Record/replay of a run's sandbox executions and LLM replies.
+
+In record mode every sandbox cell, sandbox file read and LLM reply is saved
+to a cassette directory as it happens. In replay mode the same run is served
+entirely from the cassette: sandboxes are in-memory `ReplaySandbox`es and the
+LLM never calls the provider, so a replay takes seconds and needs no network.
+
+Sandbox requests are keyed by the sandbox's creation order, the request and
+how many times that sandbox already saw it, so cells re-run at different
+states (`df.head()` before and after cleanup) replay their own output. LLM
+replies are keyed by the full request, which includes every tool output the
+agent has seen so far.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict
+
+from tools.execution import Execution, ExecutionError, Logs, OutputMessage, Result
+from tools.fake_sandbox import FakeFilesystem, FakeSandbox
+from tools.result_encoder import execution_record
+
+CASSETTE_MODES = ("record", "replay")
+
+
+class CassetteMiss(Exception):
+    """Raised when a replayed run makes a request the cassette didn't record."""
+
+
+class Cassette:
+    """A directory of recorded requests and their responses."""
+
+    def __init__(self, directory: str, mode: str):
+        """
+        Open a cassette.
+
+        Args:
+            directory: Directory holding the recordings
+            mode: "record" to save responses, "replay" to serve them
+        """
+        if mode not in CASSETTE_MODES:
+            raise ValueError(
+                f"Unknown cassette mode '{mode}'. Choose one of: {', '.join(CASSETTE_MODES)}"
+            )
+        if mode == "replay" and not os.path.isdir(directory):
+            raise ValueError(f"No cassette to replay in {directory}")
+        self.directory = directory
+        self.mode = mode
+        self.stats = {"recorded": 0, "replayed": 0}
+        self._counts: Dict[str, int] = {}
+        self._sandboxes = 0
+        self._lock = threading.Lock()
+        for kind in ("llm", "sandbox"):
+            os.makedirs(os.path.join(directory, kind), exist_ok=True)
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def next_sandbox(self) -> int:
+        """Ordinal of a newly created sandbox, the same in record and replay."""
+        with self._lock:
+            self._sandboxes += 1
+            return self._sandboxes
+
+    def key(self, *parts: str, scope: str | None = None) -> str:
+        """
+        Key of a request.
+
+        Args:
+            parts: What identifies the request
+            scope: Count repeated requests within this scope (e.g. a sandbox),
+                giving each occurrence its own key; None for content-only keys
+        """
+        digest = hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:40]
+        if scope is None:
+            return digest
+        with self._lock:
+            counter = f"{scope}:{digest}"
+            occurrence = self._counts.get(counter, 0)
+            self._counts[counter] = occurrence + 1
+        return f"{scope}-{digest}-{occurrence}"
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.directory, kind, f"{key}.json")
+
+    def save(self, kind: str, key: str, value: Dict[str, Any]) -> None:
+        path = self._path(kind, key)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(path + ".tmp", path)
+        with self._lock:
+            self.stats["recorded"] += 1
+
+    def load(self, kind: str, key: str) -> Dict[str, Any]:
+        try:
+            with open(self._path(kind, key), encoding="utf-8") as f:
+                value = json.load(f)
+        except FileNotFoundError:
+            raise CassetteMiss(
+                f"The cassette in {self.directory} has no recorded {kind} response "
+                f"for this request ({key}); record the run again"
+            ) from None
+        with self._lock:
+            self.stats["replayed"] += 1
+        return value
+
+    def summary(self) -> str:
+        return (
+            f"cassette {self.directory} ({self.mode}): {self.stats['recorded']} "
+            f"recorded, {self.stats['replayed']} replayed"
+        )
+
+
+_cassette: Cassette | None = None
+
+
+def set_cassette(cassette: Cassette | None) -> None:
+    """Make `cassette` the process-wide cassette (None to stop recording/replaying)."""
+    global _cassette
+    _cassette = cassette
+
+
+def get_cassette() -> Cassette | None:
+    """
+    Return the process-wide cassette, opened from CASSETTE_DIR and
+    CASSETTE_MODE the first time when they are set.
+    """
+    global _cassette
+    if _cassette is None and os.getenv("CASSETTE_DIR"):
+        _cassette = Cassette(
+            os.environ["CASSETTE_DIR"], os.getenv("CASSETTE_MODE", "replay")
+        )
+    return _cassette
+
+
+def _execution(record: Dict[str, Any]) -> Execution:
+    error = record["error"]
+    return Execution(
+        results=[Result(**formats) for formats in record["results"]],
+        logs=Logs(stdout=list(record["stdout"]), stderr=list(record["stderr"])),
+        error=ExecutionError(**error) if error else None,
+    )
+
+
+def _raise(recorded: Dict[str, Any]) -> None:
+    # Imported here: the monitor only matters when a cell was cut short
+    from tools.cell_monitor import CellCancelled
+
+    name, message = recorded["name"], recorded["message"]
+    if name == "CellCancelled":
+        raise CellCancelled(message)
+    if "timeout" in name.lower():
+        raise TimeoutError(message)
+    raise RuntimeError(f"{name}: {message}")
+
+
+class _RecordingFiles:
+    def __init__(self, files: Any, cassette: Cassette, scope: str):
+        self._files = files
+        self._cassette = cassette
+        self._scope = scope
+
+    def read(self, path: str, format: str = "text"):
+        key = self._cassette.key("read", path, format, scope=self._scope)
+        data = self._files.read(path, format=format)
+        raw = data if isinstance(data, (bytes, bytearray)) else str(data).encode()
+        self._cassette.save(
+            "sandbox", key, {"data": base64.b64encode(bytes(raw)).decode("ascii")}
+        )
+        return data
+
+    def exists(self, path: str) -> bool:
+        key = self._cassette.key("exists", path, scope=self._scope)
+        exists = self._files.exists(path)
+        self._cassette.save("sandbox", key, {"exists": bool(exists)})
+        return exists
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._files, name)
+
+
+class RecordingSandbox:
+    """Proxy of a sandbox saving its executions and file reads to a cassette."""
+
+    # The async client would bypass the recording
+    sync_only = True
+
+    def __init__(self, sandbox: Any, cassette: Cassette):
+        self._sandbox = sandbox
+        self._cassette = cassette
+        self._scope = str(cassette.next_sandbox())
+        self.files = _RecordingFiles(sandbox.files, cassette, self._scope)
+
+    def run_code(self, code: str, **kwargs) -> Any:
+        key = self._cassette.key("run_code", code, scope=self._scope)
+        try:
+            execution = self._sandbox.run_code(code, **kwargs)
+        except Exception as e:
+            self._cassette.save(
+                "sandbox",
+                key,
+                {"raised": {"name": type(e).__name__, "message": str(e)}},
+            )
+            raise
+        self._cassette.save("sandbox", key, execution_record(execution))
+        return execution
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._sandbox, name)
+
+
+class _ReplayFiles(FakeFilesystem):
+    def __init__(self, cassette: Cassette, scope: str):
+        super().__init__()
+        self._cassette = cassette
+        self._scope = scope
+
+    def read(self, path: str, format: str = "text"):
+        key = self._cassette.key("read", path, format, scope=self._scope)
+        data = base64.b64decode(self._cassette.load("sandbox", key)["data"])
+        return data if format == "bytes" else data.decode("utf-8")
+
+    def exists(self, path: str) -> bool:
+        key = self._cassette.key("exists", path, scope=self._scope)
+        return self._cassette.load("sandbox", key)["exists"]
+
+
+class ReplaySandbox(FakeSandbox):
+    """An in-memory sandbox answering every request from a cassette."""
+
+    def __init__(self, cassette: Cassette, timeout: int = 600):
+        super().__init__(timeout=timeout)
+        self.cassette = cassette
+        self._scope = str(cassette.next_sandbox())
+        self.files = _ReplayFiles(cassette, self._scope)
+
+    def interrupt(self) -> None:
+        # Recorded executions already reflect any interruption; a monitor
+        # replaying the stream must not cut it short a second time
+        pass
+
+    def run_code(
+        self, code: str, on_stdout=None, on_stderr=None, on_result=None, **kwargs
+    ) -> Execution:
+        self.executed.append(code)
+        key = self.cassette.key("run_code", code, scope=self._scope)
+        record = self.cassette.load("sandbox", key)
+        if "raised" in record:
+            _raise(record["raised"])
+        execution = _execution(record)
+        # Replay the stream too, so output is shown and limits apply as recorded
+        for callback, lines in (
+            (on_stdout, execution.logs.stdout),
+            (on_stderr, execution.logs.stderr),
+        ):
+            if callback is not None:
+                for line in lines:
+                    callback(OutputMessage(line, 0, error=callback is on_stderr))
+        if on_result is not None:
+            for result in execution.results:
+                on_result(result)
+        return execution
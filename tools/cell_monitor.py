@@ -0,0 +1,223 @@
+import inspect
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List
+
+from tools.execution import Execution, ExecutionError, Logs
+
+# Default limits of a single cell
+DEFAULT_MAX_SECONDS = 300.0
+DEFAULT_MAX_OUTPUT_BYTES = 1_000_000
+
+# Seconds between two memory probes of the sandbox
+MEMORY_POLL_INTERVAL = 0.5
+
+
+class CellCancelled(Exception):
+    """Raised from an output callback to abort a cell that went over its limits."""
+
+
+def _env_limit(name: str, default: float | None, cast: Callable = float):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return cast(value) if value not in ("", "0") else None
+
+
+@dataclass
+class CellLimits:
+    """
+    Thresholds past which a running cell is cancelled (None for no limit).
+
+    `max_memory_mb` is only enforced on the local kernel, the one backend
+    whose memory can be probed; remote sandboxes ignore it.
+    """
+
+    max_seconds: float | None = DEFAULT_MAX_SECONDS
+    max_output_bytes: int | None = DEFAULT_MAX_OUTPUT_BYTES
+    max_memory_mb: float | None = None
+
+    @classmethod
+    def from_env(cls) -> "CellLimits":
+        """Read CELL_MAX_SECONDS, CELL_MAX_OUTPUT_BYTES and CELL_MAX_MEMORY_MB (0 disables)."""
+        return cls(
+            max_seconds=_env_limit("CELL_MAX_SECONDS", DEFAULT_MAX_SECONDS),
+            max_output_bytes=_env_limit(
+                "CELL_MAX_OUTPUT_BYTES", DEFAULT_MAX_OUTPUT_BYTES, int
+            ),
+            max_memory_mb=_env_limit("CELL_MAX_MEMORY_MB", None),
+        )
+
+
+class CellMonitor:
+    """
+    Streams the output of one cell and cancels it when it exceeds its limits.
+
+    Output chunks are forwarded to `sink(kind, text)` as they arrive. The cell
+    is cancelled once its output exceeds `max_output_bytes`, or the kernel's
+    memory exceeds `max_memory_mb` (local kernel only, polled from a watchdog
+    thread); wall time is enforced with the sandbox's own execution timeout.
+    Sandboxes that can `interrupt()` a cell (the local kernel) are interrupted
+    and report the partial output themselves. For the others only the output
+    stream is aborted: the cell keeps running in the kernel, so `abandoned` is
+    set and the caller must replace the sandbox. The same goes for a kernel
+    that died with its cell.
+    """
+
+    def __init__(
+        self,
+        sandbox: Any,
+        limits: CellLimits,
+        sink: Callable[[str, str], None] | None = None,
+    ):
+        self.sandbox = sandbox
+        self.limits = limits
+        self.sink = sink
+        self.stdout: List[str] = []
+        self.stderr: List[str] = []
+        self.results: List[Any] = []
+        self.output_bytes = 0
+        self.cancelled: str | None = None
+        # Set when the cell may still be running in a kernel that couldn't be
+        # interrupted
+        self.abandoned = False
+        self.started = time.monotonic()
+        self._done = threading.Event()
+        self._watchdog: threading.Thread | None = None
+
+    def _on_output(self, kind: str, message: Any) -> None:
+        # A limit hit by the watchdog is acted on with the next chunk
+        if self.cancelled and not hasattr(self.sandbox, "interrupt"):
+            raise CellCancelled(self.cancelled)
+        text = getattr(message, "line", message)
+        text = text if isinstance(text, str) else str(text)
+        (self.stdout if kind == "stdout" else self.stderr).append(text)
+        self.output_bytes += len(text.encode("utf-8"))
+        if self.sink is not None:
+            self.sink(kind, text)
+        limit = self.limits.max_output_bytes
+        if limit is not None and self.output_bytes > limit and not self.cancelled:
+            self.cancel(
+                f"Cell cancelled after producing {self.output_bytes} bytes of output "
+                f"(limit {limit}). Print summaries (head(), describe(), value_counts()) "
+                "instead of whole tables."
+            )
+
+    def on_stdout(self, message: Any) -> None:
+        self._on_output("stdout", message)
+
+    def on_stderr(self, message: Any) -> None:
+        self._on_output("stderr", message)
+
+    def on_result(self, result: Any) -> None:
+        self.results.append(result)
+
+    def cancel(self, reason: str) -> None:
+        """Stop the cell; raises `CellCancelled` when the sandbox can't be interrupted."""
+        self.cancelled = reason
+        interrupt = getattr(self.sandbox, "interrupt", None)
+        if interrupt is not None:
+            interrupt()
+        elif threading.current_thread() is not self._watchdog:
+            raise CellCancelled(reason)
+
+    def _watch_memory(self) -> None:
+        probe = getattr(self.sandbox, "memory_usage", None)
+        limit = self.limits.max_memory_mb
+        while not self._done.wait(MEMORY_POLL_INTERVAL):
+            usage = probe()
+            if usage is not None and usage / 1e6 > limit:
+                self.cancel(
+                    f"Cell cancelled when the kernel reached {usage / 1e6:.0f} MB of "
+                    f"memory (limit {limit:.0f} MB). Work on a sample, select fewer "
+                    "columns or avoid joins that multiply rows."
+                )
+                return
+
+    def __enter__(self) -> "CellMonitor":
+        if self.limits.max_memory_mb and hasattr(self.sandbox, "memory_usage"):
+            self._watchdog = threading.Thread(target=self._watch_memory, daemon=True)
+            self._watchdog.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._done.set()
+
+    def callbacks(self) -> dict:
+        """Keyword arguments to pass to `run_code`."""
+        return {
+            "on_stdout": self.on_stdout,
+            "on_stderr": self.on_stderr,
+            "on_result": self.on_result,
+            "timeout": self.limits.max_seconds,
+        }
+
+    def recover(self, error: BaseException) -> Execution:
+        """
+        Build the partial execution of a cell whose `run_code` raised.
+
+        Cancellations and timeouts return the output received so far; any
+        other error is re-raised.
+        """
+        if isinstance(error, CellCancelled):
+            reason = self.cancelled or str(error)
+            name = "CellCancelled"
+        elif "timeout" in type(error).__name__.lower():
+            reason = (
+                f"Cell cancelled after {time.monotonic() - self.started:.0f}s "
+                f"(limit {self.limits.max_seconds:.0f}s); output so far is shown."
+            )
+            name = "TimeoutError"
+        else:
+            raise error
+        self.abandoned = not hasattr(self.sandbox, "interrupt")
+        return Execution(
+            results=self.results,
+            logs=Logs(stdout=self.stdout, stderr=self.stderr),
+            error=ExecutionError(name, reason, ""),
+        )
+
+    def finish(self, execution: Any) -> Any:
+        """
+        Label the error of a cell that was interrupted for going over a limit.
+
+        A cell that took its kernel down with it (e.g. killed for ignoring the
+        interrupt) is flagged as `abandoned` too, so the sandbox gets replaced.
+        """
+        if execution.error is not None and self._kernel_died(execution.error):
+            self.abandoned = True
+        if self.cancelled and execution.error is not None:
+            execution.error = ExecutionError("CellCancelled", self.cancelled, "")
+        return execution
+
+    def _kernel_died(self, error: Any) -> bool:
+        if error.name == "KernelDied":
+            return True
+        # Async clients probe over the network; their errors are raised instead
+        is_running = getattr(self.sandbox, "is_running", None)
+        if is_running is None or inspect.iscoroutinefunction(is_running):
+            return False
+        try:
+            return not is_running()
+        except Exception:
+            return False
+
+    def execute(self, run_code: Callable[..., Any], code: str) -> Any:
+        """Run `code` with `run_code`, streaming its output and enforcing the limits."""
+        with self:
+            try:
+                execution = run_code(code, **self.callbacks())
+            except Exception as e:
+                execution = self.recover(e)
+        return self.finish(execution)
+
+    async def aexecute(self, run_code: Callable[..., Any], code: str) -> Any:
+        """Async counterpart of `execute`, for async sandbox clients."""
+        with self:
+            try:
+                execution = await run_code(code, **self.callbacks())
+            except Exception as e:
+                execution = self.recover(e)
+        return self.finish(execution)
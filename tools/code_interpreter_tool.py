@@ -1,11 +1,50 @@
+import asyncio
+import io
 import json
 import os
-from typing import Type
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Type
 
 from crewai.tools import BaseTool
-from e2b_code_interpreter import Sandbox
 from pydantic import BaseModel, Field
 
+from tools.artifacts import DEFAULT_DOWNLOAD_PATTERNS, ArtifactStore, archive_code
+from tools.backends import ExecutionBackend, connect_async, resolve_backend
+from tools.cell_monitor import CellLimits, CellMonitor
+from tools.frame_registry import (
+    describe_frames,
+    parse_summary,
+    preload_code,
+    summary_code,
+)
+from tools.kernel_state import SNAPSHOT_PATH, restore_code, snapshot_code
+from tools.result_cache import (
+    ResultCache,
+    cache_key,
+    extend_lineage,
+    is_side_effect_free,
+)
+from tools.result_encoder import ResultEncoder, estimate_tokens, execution_record
+from tools.sandbox_pool import SandboxPool, get_sandbox_pool
+from tools.tracing import Span, get_tracer
+from tools.upload_cache import cached_upload, file_digest, get_manifest
+from tools.uploads import (
+    DEFAULT_CHUNK_SIZE,
+    UploadBatchSummary,
+    UploadStats,
+    stream_upload,
+    with_retries,
+)
+
+# Sandbox file marking when the tool took the sandbox over; files modified
+# later are this run's outputs
+SESSION_MARKER = ".session_started"
+
+# Sandbox path of the archive files are downloaded in
+DOWNLOAD_ARCHIVE = ".outputs.tar.gz"
+
 
 class E2BCodeInterpreterSchema(BaseModel):
     """Input schema for the CodeInterpreterTool, used by the agent."""
@@ -19,8 +58,12 @@ class E2BCodeInterpreterSchema(BaseModel):
 class E2BCodeInterpreterTool(BaseTool):
     """
     This is a tool that runs arbitrary code in a Python Jupyter notebook.
-    It uses E2B to run the notebook in a secure cloud sandbox.
-    It requires an E2B_API_KEY to create a sandbox.
+    By default it uses E2B to run the notebook in a secure cloud sandbox, which
+    requires an E2B_API_KEY. The "local" backend runs cells in a persistent
+    local kernel process instead, for trusted datasets and offline runs.
+
+    Sandboxes are leased from a warm `SandboxPool` and returned to it on `close`,
+    so back-to-back runs don't pay the sandbox cold-start latency.
 
     Provides file management capabilities to upload datasets and other files to the sandbox.
     """
@@ -28,123 +71,716 @@ class E2BCodeInterpreterTool(BaseTool):
     name: str = "code_interpreter"
     description: str = "Execute Python code in a Jupyter notebook cell and return any rich data (eg charts), stdout, stderr, and errors."
     args_schema: Type[BaseModel] = E2BCodeInterpreterSchema
-    _code_interpreter_tool: Sandbox | None = None
+    _code_interpreter_tool: ExecutionBackend | None = None
+    _sandbox_pool: SandboxPool | None = None
     result_as_answer: bool = False
     dataset_path: str | None = None
+    on_demand_files: List[str] = []
+    backend: str = "e2b"
+    upload_chunk_size: int = DEFAULT_CHUNK_SIZE
+    upload_compression: str | None = Field(
+        default_factory=lambda: os.getenv("UPLOAD_COMPRESSION") or None
+    )
+    upload_concurrency: int = Field(
+        default_factory=lambda: int(os.getenv("UPLOAD_CONCURRENCY", "4"))
+    )
+    upload_retries: int = 2
+    upload_cache: bool = Field(
+        default_factory=lambda: os.getenv("UPLOAD_CACHE", "1") != "0"
+    )
+    cell_limits: CellLimits = Field(default_factory=CellLimits.from_env)
+    stream_output: bool = Field(
+        default_factory=lambda: os.getenv("CELL_STREAM", "1") != "0"
+    )
+    preload_dataset: bool = Field(
+        default_factory=lambda: os.getenv("PRELOAD_DATASET", "1") != "0"
+    )
+    frames: Dict[str, Dict[str, Any]] = {}
+    _result_cache: ResultCache | None = None
+    _result_encoder: ResultEncoder | None = None
+    _dataset_digest: str | None = None
+    _lineage: str = ""
+    _upload_stats: List[UploadStats] = []
+    _last_upload_summary: UploadBatchSummary | None = None
+    _parent: BaseTool | None = None
+    _snapshot: tuple | None = None
+    _snapshot_lock: Any = None
+    _async_sandbox: tuple | None = None
+    _on_demand_uploaded: List[str] = []
+    _base_description: str = ""
 
     def __init__(
-        self, *args, result_as_answer=False, dataset_path: str = None, **kwargs
+        self,
+        *args,
+        result_as_answer=False,
+        dataset_path: str = None,
+        sandbox_pool: SandboxPool | None = None,
+        backend: str | None = None,
+        sandbox: ExecutionBackend | None = None,
+        result_cache: ResultCache | None = None,
+        artifact_dir: str | None = None,
+        on_demand_files: List[str] | None = None,
+        **kwargs,
     ):
         # Call the superclass's init method
         super().__init__(*args, **kwargs)
 
         self.result_as_answer = result_as_answer
+        self.backend = resolve_backend(backend)
 
         # Ensure that the E2B_API_KEY environment variable is set
-        if "E2B_API_KEY" not in os.environ:
+        if (
+            sandbox_pool is None
+            and sandbox is None
+            and self.backend == "e2b"
+            and "E2B_API_KEY" not in os.environ
+        ):
             raise Exception(
                 "Code Interpreter tool called while E2B_API_KEY environment variable is not set. Please get your E2B API key here https://e2b.dev/docs and set the E2B_API_KEY environment variable."
             )
 
-        # Initialize the code interpreter tool
-        self._code_interpreter_tool = Sandbox(timeout=600)
+        # Lease a warm sandbox from the pool, unless one was leased (and possibly
+        # booted in the background) for us
+        self._sandbox_pool = sandbox_pool or get_sandbox_pool(self.backend)
+        self._code_interpreter_tool = (
+            sandbox if sandbox is not None else self._sandbox_pool.acquire()
+        )
+        self._upload_stats = []
+        self._result_cache = result_cache or ResultCache.from_env()
+        self._result_encoder = ResultEncoder(ArtifactStore(artifact_dir))
+        self._lineage = ""
+        self._snapshot_lock = threading.Lock()
+        self._base_description = self.description
         self.dataset_path = dataset_path
+        # Files uploaded only once a cell refers to them (e.g. the original of a
+        # dataset uploaded as Parquet)
+        self.on_demand_files = list(on_demand_files or [])
+        self._on_demand_uploaded = []
+        if self.dataset_path:
+            self._dataset_digest = file_digest(self.dataset_path)
+        if self.cell_limits.max_memory_mb and self.backend != "local":
+            print(
+                f"CELL_MAX_MEMORY_MB is only enforced on the local kernel, "
+                f"not on the {self.backend} backend"
+            )
+        self._start_session()
+
+    def _start_session(self) -> None:
+        """Upload and preload the dataset and mark the start of the session."""
         if self.dataset_path:
             self.upload_file(self.dataset_path)
+            if self.preload_dataset:
+                self._preload()
+        try:
+            self._code_interpreter_tool.files.write(SESSION_MARKER, "")
+        except Exception as e:
+            print(f"Error marking the sandbox session: {e}")
 
+    def _replace_sandbox(self) -> None:
+        """
+        Swap the sandbox for a fresh one from the pool, after a cancelled cell
+        kept running in a kernel that couldn't be interrupted or took the
+        kernel down with it.
+
+        The kernel state is lost: the dataset is uploaded and preloaded again
+        and the on-demand files become pending again.
+        """
+        abandoned = self._code_interpreter_tool
+        self._code_interpreter_tool = self._sandbox_pool.acquire()
+        self._async_sandbox = None
+        self._snapshot = None
+        self._lineage = ""
+        self.on_demand_files = self.on_demand_files + self._on_demand_uploaded
+        self._on_demand_uploaded = []
+        # Killing the sandbox is what stops a runaway cell
+        self._sandbox_pool.discard(abandoned)
+        self._start_session()
+
+    def _preload(self) -> None:
+        """Parse the dataset once into the kernel's frame registry."""
+        code = preload_code(self.dataset_path)
+        if code is None:
+            return
+        with get_tracer().span("sandbox.preload", path=self.dataset_path):
+            try:
+                execution = self._code_interpreter_tool.run_code(code)
+                if execution.error:
+                    raise RuntimeError(execution.error)
+                # Later cells run in (and are cached against) the preloaded state
+                self._lineage = extend_lineage(self._lineage, code)
+                self.refresh_frames()
+            except Exception as e:
+                print(f"Skipping dataset preload: {e}")
+
+    def refresh_frames(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Read the frames registered in the kernel and advertise them in the
+        tool description, so agents reuse them instead of re-parsing files.
+
+        Returns:
+            Shape and memory footprint (MB) per registered frame
+        """
+        try:
+            execution = self._code_interpreter_tool.run_code(summary_code())
+            stdout = "".join(getattr(execution.logs, "stdout", []) or [])
+            self.advertise_frames(parse_summary(stdout))
+        except Exception as e:
+            print(f"Error reading the frame registry: {e}")
+        return self.frames
+
+    def advertise_frames(self, frames: Dict[str, Dict[str, Any]]) -> None:
+        """Describe `frames` as available in the kernel to the agents using the tool."""
+        self.frames = dict(frames)
+        self.description = self._base_description + describe_frames(self.frames)
 
     def _run(self, code: str) -> str:
-        # Execute the code using the code interpreter
-        print(code)
-        self._code_interpreter_tool.set_timeout(300)
-        execution = self._code_interpreter_tool.run_code(code)
+        with get_tracer().span(
+            "code_interpreter.run",
+            backend=self.backend,
+            code_bytes=len(code.encode("utf-8")),
+        ) as span:
+            # Execute the code using the code interpreter
+            print(code)
+            record = self._execute(code, span)
+
+            # Encode the result compactly since CrewAI expects a string output;
+            # charts and HTML are spilled to the artifact store
+            content, verbose_tokens = self._result_encoder.encode_counted(record)
+            self._trace_result(span, record, content, verbose_tokens)
+
+            return content
+
+    async def _arun(self, code: str) -> str:
+        # Same as `_run`, without blocking the event loop on the sandbox. The
+        # span isn't made current: coroutines share the event loop's thread.
+        tracer = get_tracer()
+        span = tracer.start_span(
+            "code_interpreter.run",
+            backend=self.backend,
+            code_bytes=len(code.encode("utf-8")),
+            asynchronous=True,
+        )
+        error = None
+        try:
+            print(code)
+            record = await self._aexecute(code, span)
+            content, verbose_tokens = self._result_encoder.encode_counted(record)
+            self._trace_result(span, record, content, verbose_tokens)
+
+            return content
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            tracer.end_span(span, error)
+
+    @staticmethod
+    def _trace_result(
+        span: Span, record: dict, content: str, verbose_tokens: int
+    ) -> None:
+        span.set(
+            results=len(record["results"]),
+            stdout_bytes=sum(len(line) for line in record["stdout"]),
+            stderr_bytes=sum(len(line) for line in record["stderr"]),
+            result_bytes=len(content.encode("utf-8")),
+            result_tokens=estimate_tokens(content),
+            # Tokens the verbose output format would have cost
+            verbose_tokens=verbose_tokens,
+            error=record["error"]["name"] if record["error"] else None,
+        )
+
+    @property
+    def result_encoder(self) -> ResultEncoder:
+        """Encoder of tool output, with its token savings in `stats`."""
+        return self._result_encoder
+
+    def _execute(self, code: str, span: Span) -> dict:
+        """
+        Run a cell, answering side-effect-free cells from the result cache.
+
+        Cached results are keyed by the normalized code, the dataset content
+        hash and the lineage of state-mutating cells run before it, so a hit is
+        only possible when the kernel is known to be in the same state.
+
+        Args:
+            code: Code of the cell
+            span: Span of the tool call, annotated and parenting the sandbox span
+        """
+        if self._parent is not None:
+            self._clone_parent_state()
+
+        key, cached = self._lookup(code, span)
+        if cached is not None:
+            return cached
+
+        self._upload_on_demand(code)
+        with get_tracer().span(
+            "sandbox.run_code", parent=span, backend=self.backend
+        ) as run_span:
+            self._code_interpreter_tool.set_timeout(self._sandbox_timeout())
+            monitor = self._monitor(self._code_interpreter_tool, run_span)
+            try:
+                execution = monitor.execute(self._code_interpreter_tool.run_code, code)
+            finally:
+                self._trace_run(run_span, monitor)
+        if monitor.abandoned:
+            self._restart_after(execution)
+        return self._record(key, execution)
+
+    async def _aexecute(self, code: str, span: Span) -> dict:
+        """Async counterpart of `_execute`, using the sandbox's async client."""
+        if self._parent is not None:
+            await asyncio.to_thread(self._clone_parent_state)
+
+        client = await self._async_client()
+        if client is None:
+            return await asyncio.to_thread(self._execute, code, span)
+
+        key, cached = self._lookup(code, span)
+        if cached is not None:
+            return cached
+
+        if self.on_demand_files:
+            await asyncio.to_thread(self._upload_on_demand, code)
+        # Not made current: coroutines share the event loop's thread
+        tracer = get_tracer()
+        run_span = tracer.start_span(
+            "sandbox.run_code", parent=span, backend=self.backend
+        )
+        error = None
+        try:
+            await client.set_timeout(self._sandbox_timeout())
+            monitor = self._monitor(client, run_span)
+            try:
+                execution = await monitor.aexecute(client.run_code, code)
+            finally:
+                self._trace_run(run_span, monitor)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            tracer.end_span(run_span, error)
+        if monitor.abandoned:
+            await asyncio.to_thread(self._restart_after, execution)
+        return self._record(key, execution)
+
+    @staticmethod
+    def _trace_run(span: Span, monitor: CellMonitor) -> None:
+        span.set(
+            output_bytes=monitor.output_bytes,
+            cancelled=monitor.cancelled,
+            abandoned=monitor.abandoned,
+        )
+
+    def _restart_after(self, execution) -> None:
+        """Replace the sandbox of an abandoned cell and tell the agent."""
+        with get_tracer().span("sandbox.replace", backend=self.backend):
+            self._replace_sandbox()
+        execution.error.value += (
+            " The kernel was restarted, so variables from earlier cells are gone; "
+            "the dataset was loaded again."
+        )
+
+    def _upload_on_demand(self, code: str) -> None:
+        """Upload the on-demand files a cell refers to by path or file name."""
+        for file_path in list(self.on_demand_files):
+            if file_path in code or os.path.basename(file_path) in code:
+                self.upload_file(file_path)
+                self.on_demand_files.remove(file_path)
+                self._on_demand_uploaded.append(file_path)
+
+    def _sandbox_timeout(self) -> int:
+        # Keep the sandbox alive for at least as long as a cell may run
+        return int(max(300, (self.cell_limits.max_seconds or 0) + 60))
+
+    def _monitor(self, sandbox, span: Span | None = None) -> CellMonitor:
+        """
+        Monitor streaming a cell's output to the console and the trace, and
+        cancelling it once it goes over `cell_limits`. The partial output of a
+        cancelled cell is returned to the agent with a `CellCancelled` error.
+        """
+
+        def sink(kind: str, text: str) -> None:
+            if self.stream_output:
+                print(text, end="" if text.endswith("\n") else "\n", flush=True)
+            if span is not None:
+                span.add_event(kind, text=text[:200], bytes=len(text.encode("utf-8")))
+
+        return CellMonitor(sandbox, self.cell_limits, sink)
+
+    def _lookup(self, code: str, span: Span) -> tuple:
+        """
+        Return the cache key of a side-effect-free cell and its cached result,
+        noting on `span` whether the cache answered it.
+
+        Any other cell is folded into the lineage instead and gets no key.
+        """
+        if self._result_cache is None or not is_side_effect_free(code):
+            self._lineage = extend_lineage(self._lineage, code)
+            span.set(cache_hit=False)
+            return None, None
+        key = cache_key(code, self._dataset_digest, self._lineage)
+        cached = self._result_cache.get(key)
+        span.set(cache_hit=cached is not None)
+        return key, cached
 
+    def _record(self, key: str | None, execution) -> dict:
         # Extract relevant execution details
-        result = {
-            "results": [str(item) for item in execution.results],
-            "stdout": execution.logs.stdout,
-            "stderr": execution.logs.stderr,
-            "error": str(execution.error),
-        }
+        record = execution_record(execution)
+        if key is not None and execution.error is None:
+            self._result_cache.put(key, record)
+        return record
+
+    async def _async_client(self):
+        """
+        Async client of this tool's sandbox, or None for backends without one.
+
+        Clients are bound to the event loop they were created on, so a new one
+        is attached when the tool is used from another loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_sandbox is None or self._async_sandbox[0] is not loop:
+            client = await connect_async(self._code_interpreter_tool, self.backend)
+            self._async_sandbox = (loop, client)
+        return self._async_sandbox[1]
+
+    @property
+    def lineage(self) -> str:
+        """Hash of the state-mutating cells run so far, identifying the kernel state."""
+        return self._lineage
 
-        # Convert the result dictionary to a JSON string since CrewAI expects a string output
-        content = json.dumps(result, indent=2)
+    def snapshot_state(self) -> bytes:
+        """
+        Pickle the kernel's user namespace (dataframes, models, imports).
+
+        Snapshots are memoized per cell lineage, so several forks taken from
+        the same state only snapshot the kernel once.
+
+        Returns:
+            The snapshot, to be loaded with `restore_state`
+        """
+        with self._snapshot_lock:
+            if self._snapshot is None or self._snapshot[0] != self._lineage:
+                execution = self._code_interpreter_tool.run_code(snapshot_code())
+                if execution.error:
+                    raise RuntimeError(f"Failed to snapshot kernel: {execution.error}")
+                data = self._code_interpreter_tool.files.read(
+                    SNAPSHOT_PATH, format="bytes"
+                )
+                self._snapshot = (self._lineage, bytes(data))
+            return self._snapshot[1]
 
-        return content
+    def restore_state(self, snapshot: bytes, lineage: str | None = None) -> None:
+        """
+        Load a snapshot taken with `snapshot_state` into this tool's kernel.
 
-    def write(self, filename: str, content) -> str:
+        Args:
+            snapshot: Snapshot bytes
+            lineage: Cell lineage of the snapshot, so cached results stay valid
+        """
+        self.write(SNAPSHOT_PATH, snapshot)
+        execution = self._code_interpreter_tool.run_code(restore_code())
+        if execution.error:
+            raise RuntimeError(f"Failed to restore kernel: {execution.error}")
+        if lineage is not None:
+            self._lineage = lineage
+
+    def fork(self) -> "E2BCodeInterpreterTool":
+        """
+        Create a tool with its own sandbox that starts from this tool's state.
+
+        The fork leases a separate sandbox right away but clones the kernel
+        lazily, on its first cell, so it picks up whatever state this tool has
+        reached by then (e.g. the cleaned dataframe once cleanup has finished).
+        Forks let independent tasks run concurrently without sharing a kernel.
+        """
+        child = E2BCodeInterpreterTool(
+            result_as_answer=self.result_as_answer,
+            dataset_path=self.dataset_path,
+            sandbox_pool=self._sandbox_pool,
+            backend=self.backend,
+            result_cache=self._result_cache,
+            artifact_dir=self._result_encoder.artifacts.directory,
+            on_demand_files=self.on_demand_files,
+            # The clone brings the parent's frames along
+            preload_dataset=False,
+        )
+        child._parent = self
+        child.advertise_frames(self.frames)
+        return child
+
+    def _clone_parent_state(self) -> None:
+        parent, self._parent = self._parent, None
+        snapshot = parent.snapshot_state()
+        self.restore_state(snapshot, lineage=parent._lineage)
+
+    def write(
+        self,
+        filename: str,
+        content,
+        compression: str | None = None,
+        progress: Callable[[UploadStats], None] | None = None,
+    ) -> str:
         """
         Write content to a file in the sandbox.
 
+        File-like content is streamed in chunks of `upload_chunk_size` bytes, so
+        memory use stays bounded no matter how big the file is.
+
         Args:
             filename: The name of the file to write to
             content: The content to write (can be a string, bytes, or file-like object)
+            compression: Compress chunks on the wire with "gzip" or "zstd"
+                (defaults to `upload_compression`)
+            progress: Callback receiving the running `UploadStats` after each chunk
 
         Returns:
             Path to the file in the sandbox
         """
         try:
-            # If content is a file-like object (has read method)
-            if hasattr(content, "read"):
-                content_bytes = content.read()
-                if isinstance(content_bytes, str):
-                    content_bytes = content_bytes.encode("utf-8")
-            # If content is a string, convert to bytes
-            elif isinstance(content, str):
-                content_bytes = content.encode("utf-8")
-            # If content is already bytes, use it directly
-            elif isinstance(content, bytes):
-                content_bytes = content
-            else:
-                raise ValueError(f"Unsupported content type: {type(content)}")
-
-            # Write the file to the sandbox
-            self._code_interpreter_tool.files.write(filename, content_bytes)
-
-            # Return the path to the file in the sandbox
+            with get_tracer().span("sandbox.write", path=filename) as span:
+                # If content is a string, convert to bytes
+                if isinstance(content, str):
+                    content = io.BytesIO(content.encode("utf-8"))
+                # If content is already bytes, wrap it so it can be read in chunks
+                elif isinstance(content, bytes):
+                    content = io.BytesIO(content)
+                # Otherwise it has to be a file-like object (has read method)
+                elif not hasattr(content, "read"):
+                    raise ValueError(f"Unsupported content type: {type(content)}")
+
+                # Stream the file to the sandbox
+                compression = compression or self.upload_compression
+                stats = stream_upload(
+                    self._code_interpreter_tool,
+                    filename,
+                    content,
+                    chunk_size=self.upload_chunk_size,
+                    compression=compression,
+                    progress=progress,
+                )
+                self._upload_stats.append(stats)
+                span.set(
+                    bytes_read=stats.bytes_read,
+                    bytes_sent=stats.bytes_sent,
+                    chunks=stats.chunks,
+                    compression=compression,
+                )
+                if stats.chunks > 1:
+                    print(f"Uploaded {stats.summary()}")
+
+                # Return the path to the file in the sandbox
+                return filename
+        except Exception as e:
+            print(f"Error writing file to sandbox: {e}")
+            raise
+
+    async def awrite(
+        self, filename: str, content, compression: str | None = None
+    ) -> str:
+        """
+        Async counterpart of `write`.
+
+        Content that fits in one chunk is written with the async client; larger
+        or compressed content is streamed in chunks from a worker thread.
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        compression = compression or self.upload_compression
+        client = await self._async_client()
+        if (
+            client is None
+            or not isinstance(content, bytes)
+            or compression
+            or len(content) > self.upload_chunk_size
+        ):
+            return await asyncio.to_thread(self.write, filename, content, compression)
+
+        try:
+            started = time.perf_counter()
+            await client.files.write(filename, content)
+            self._upload_stats.append(
+                UploadStats(
+                    path=filename,
+                    total_bytes=len(content),
+                    bytes_read=len(content),
+                    bytes_sent=len(content),
+                    chunks=1,
+                    seconds=time.perf_counter() - started,
+                )
+            )
             return filename
         except Exception as e:
             print(f"Error writing file to sandbox: {e}")
             raise
 
-    def upload_files(self, file_paths: list) -> list:
+    @property
+    def upload_stats(self) -> List[UploadStats]:
+        """Statistics of every upload made through this tool."""
+        return list(self._upload_stats)
+
+    def upload_files(
+        self,
+        file_paths: list,
+        concurrency: int | None = None,
+        retries: int | None = None,
+    ) -> list:
         """
-        Upload multiple files to the sandbox.
+        Upload multiple files to the sandbox concurrently.
 
         Args:
             file_paths: List of file paths to upload
+            concurrency: Maximum number of files in flight (defaults to `upload_concurrency`)
+            retries: Retries per file before giving up (defaults to `upload_retries`)
 
         Returns:
-            List of uploaded file paths in the sandbox
+            List of uploaded file paths in the sandbox, in the order given
         """
-        uploaded_files = []
-        for file_path in file_paths:
+        concurrency = max(1, concurrency or self.upload_concurrency)
+        retries = self.upload_retries if retries is None else retries
+        retry_count = 0
+        retry_lock = threading.Lock()
+
+        def upload(file_path: str) -> str:
+            def on_retry(attempt: int, error: Exception) -> None:
+                nonlocal retry_count
+                with retry_lock:
+                    retry_count += 1
+                print(
+                    f"Retrying upload of {file_path} (attempt {attempt + 1}): {error}"
+                )
+
             try:
-                with open(file_path, "rb") as f:
-                    sandbox_path = self.write(file_path, f)
-                    uploaded_files.append(sandbox_path)
+                with tracer.attach(batch_span):
+                    return with_retries(
+                        lambda: self.upload_file(file_path),
+                        retries=retries,
+                        on_retry=on_retry,
+                    )
             except Exception as e:
                 print(f"Error uploading file {file_path}: {e}")
                 raise
+
+        started = time.perf_counter()
+        already_recorded = len(self._upload_stats)
+        tracer = get_tracer()
+        with tracer.span(
+            "sandbox.upload_batch", files=len(file_paths), concurrency=concurrency
+        ) as batch_span:
+            with ThreadPoolExecutor(
+                max_workers=min(concurrency, len(file_paths) or 1)
+            ) as pool:
+                uploaded_files = list(pool.map(upload, file_paths))
+
+        new_stats = self._upload_stats[already_recorded:]
+        self._last_upload_summary = UploadBatchSummary(
+            files=len(uploaded_files),
+            total_bytes=sum(stats.bytes_read for stats in new_stats),
+            seconds=time.perf_counter() - started,
+            concurrency=concurrency,
+            retries=retry_count,
+        )
+        batch_span.set(bytes=self._last_upload_summary.total_bytes, retries=retry_count)
+        print(f"Uploaded {self._last_upload_summary.summary()}")
         return uploaded_files
 
+    @property
+    def last_upload_summary(self) -> UploadBatchSummary | None:
+        """Throughput summary of the most recent `upload_files` call."""
+        return self._last_upload_summary
+
+    async def aupload_files(
+        self,
+        file_paths: list,
+        concurrency: int | None = None,
+        retries: int | None = None,
+    ) -> list:
+        """
+        Async counterpart of `upload_files`, for use from an event loop.
+
+        Args:
+            file_paths: List of file paths to upload
+            concurrency: Maximum number of files in flight (defaults to `upload_concurrency`)
+            retries: Retries per file before giving up (defaults to `upload_retries`)
+
+        Returns:
+            List of uploaded file paths in the sandbox, in the order given
+        """
+        return await asyncio.to_thread(
+            self.upload_files, file_paths, concurrency, retries
+        )
+
+    async def aupload_file(self, file_path: str) -> str:
+        """Async counterpart of `upload_file`."""
+        return await asyncio.to_thread(self.upload_file, file_path)
+
     def upload_file(self, file_path: str) -> str:
         """
         Upload a single file to the sandbox.
 
+        With `upload_cache` enabled, uploads are keyed by content hash: a file
+        the sandbox still holds unchanged is skipped, and identical content under
+        a new name is copied sandbox-side instead of being transferred again.
+
         Args:
             file_path: Path to the file to upload
 
         Returns:
             Path to the uploaded file in the sandbox
         """
+        def upload(path: str) -> str:
+            with open(path, "rb") as f:
+                return self.write(path, f)
+
         try:
-            with open(file_path, "rb") as f:
-                return self.write(file_path, f)
+            if not self.upload_cache:
+                with get_tracer().span("sandbox.upload", path=file_path):
+                    return upload(file_path)
+            return cached_upload(self._code_interpreter_tool, file_path, upload)
         except Exception as e:
             print(f"Error uploading file {file_path}: {e}")
             raise
 
+    def download_files(self, patterns=DEFAULT_DOWNLOAD_PATTERNS) -> Dict[str, str]:
+        """
+        Download the files this run generated in the sandbox (charts, exported
+        tables, ...) to the artifact store, in a single archive transfer.
+
+        Files older than the tool's session and files uploaded from here are
+        left out, so pooled sandboxes don't hand back earlier runs' outputs.
+
+        Args:
+            patterns: Glob patterns of the files to download
+
+        Returns:
+            Local path of each downloaded file, by its sandbox path
+        """
+        sandbox = self._code_interpreter_tool
+        with get_tracer().span("sandbox.download") as span:
+            code = archive_code(
+                DOWNLOAD_ARCHIVE,
+                patterns,
+                since=SESSION_MARKER,
+                exclude=list(get_manifest(sandbox).files),
+            )
+            execution = sandbox.run_code(code)
+            if execution.error:
+                raise RuntimeError(f"Failed to archive sandbox files: {execution.error}")
+            stdout = "".join(execution.logs.stdout).strip()
+            if not stdout or not json.loads(stdout.splitlines()[-1]):
+                return {}
+            data = bytes(sandbox.files.read(DOWNLOAD_ARCHIVE, format="bytes"))
+            paths = self._result_encoder.artifacts.put_archive(data)
+            span.set(files=len(paths), bytes=len(data))
+        return paths
+
     def close(self):
-        # Close the interpreter tool when done
-        self._code_interpreter_tool.kill()
+        # Return the sandbox to the pool so the next run can reuse it
+        if self._code_interpreter_tool is not None:
+            self._sandbox_pool.release(self._code_interpreter_tool)
+            self._code_interpreter_tool = None
+            self._async_sandbox = None
+
+    async def aclose(self):
+        # Releasing resets the kernel, which would block the event loop
+        await asyncio.to_thread(self.close)
@@ -0,0 +1,113 @@
+"""
+Lightweight execution result types that mirror the ones returned by
+`e2b_code_interpreter`, so local and fake sandboxes can be used in place of an
+E2B sandbox without importing the E2B client.
+"""
+
+from typing import Iterable, List, Optional
+
+
+class OutputMessage:
+    """A chunk of stdout or stderr streamed while a cell is running."""
+
+    def __init__(self, line: str, timestamp: int, error: bool = False):
+        self.line = line
+        self.timestamp = timestamp
+        self.error = error
+
+    def __str__(self) -> str:
+        return self.line
+
+
+class Logs:
+    """Captured stdout and stderr of a single cell execution."""
+
+    def __init__(
+        self, stdout: List[str] | None = None, stderr: List[str] | None = None
+    ):
+        self.stdout = stdout or []
+        self.stderr = stderr or []
+
+    def __repr__(self) -> str:
+        return f"Logs(stdout: {self.stdout}, stderr: {self.stderr})"
+
+
+class Result:
+    """A single rich result (the value of the last expression, a chart, ...)."""
+
+    FORMATS = ("text", "html", "markdown", "svg", "png", "jpeg", "latex", "json")
+
+    def __init__(
+        self,
+        text: Optional[str] = None,
+        html: Optional[str] = None,
+        markdown: Optional[str] = None,
+        svg: Optional[str] = None,
+        png: Optional[str] = None,
+        jpeg: Optional[str] = None,
+        latex: Optional[str] = None,
+        json: Optional[dict] = None,
+        is_main_result: bool = False,
+    ):
+        self.text = text
+        self.html = html
+        self.markdown = markdown
+        self.svg = svg
+        self.png = png
+        self.jpeg = jpeg
+        self.latex = latex
+        self.json = json
+        self.is_main_result = is_main_result
+
+    def formats(self) -> Iterable[str]:
+        """Return the names of the formats this result is available in."""
+        return [name for name in self.FORMATS if getattr(self, name) is not None]
+
+    def __str__(self) -> str:
+        return str(self.text) if self.text is not None else ""
+
+    def __repr__(self) -> str:
+        return (
+            f"Result({self.text})"
+            if self.text
+            else f"Result(Formats: {self.formats()})"
+        )
+
+
+class ExecutionError:
+    """An error raised by the executed code."""
+
+    def __init__(self, name: str, value: str, traceback: str):
+        self.name = name
+        self.value = value
+        self.traceback = traceback
+
+    def __repr__(self) -> str:
+        return f"ExecutionError(name={self.name!r}, value={self.value!r})"
+
+
+class Execution:
+    """The outcome of running one cell: results, logs and an optional error."""
+
+    def __init__(
+        self,
+        results: List[Result] | None = None,
+        logs: Logs | None = None,
+        error: ExecutionError | None = None,
+        execution_count: Optional[int] = None,
+    ):
+        self.results = results or []
+        self.logs = logs or Logs()
+        self.error = error
+        self.execution_count = execution_count
+
+    @property
+    def text(self) -> Optional[str]:
+        """Text of the main result, if any."""
+        for result in self.results:
+            if result.is_main_result:
+                return result.text
+        return None
+
+    def __repr__(self) -> str:
+        return f"Execution(Results: {self.results}, Logs: {self.logs}, Error: {self.error})"
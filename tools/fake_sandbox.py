@@ -0,0 +1,69 @@
+import itertools
+from typing import Callable, Dict, List
+
+from tools.execution import Execution
+
+_sandbox_ids = itertools.count(1)
+
+
+class FakeFilesystem:
+    """In-memory replacement for the sandbox `files` API."""
+
+    def __init__(self):
+        self.files: Dict[str, bytes] = {}
+
+    def write(self, path: str, data) -> str:
+        if hasattr(data, "read"):
+            data = data.read()
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.files[path] = bytes(data)
+        return path
+
+    def read(self, path: str, format: str = "text"):
+        if path not in self.files:
+            raise FileNotFoundError(path)
+        data = self.files[path]
+        return data if format == "bytes" else data.decode("utf-8")
+
+    def exists(self, path: str) -> bool:
+        return path in self.files
+
+    def remove(self, path: str) -> None:
+        self.files.pop(path, None)
+
+
+class FakeSandbox:
+    """
+    A sandbox that never touches the network.
+
+    Code is not executed; every cell is recorded in `executed` and answered by
+    `handler` (an empty `Execution` by default). Useful for exercising pool
+    sizing, eviction and reuse, and for offline benchmarks of the workflow.
+    """
+
+    def __init__(
+        self, handler: Callable[[str], Execution] | None = None, timeout: int = 600
+    ):
+        self.sandbox_id = f"fake-{next(_sandbox_ids)}"
+        self.handler = handler
+        self.timeout = timeout
+        self.files = FakeFilesystem()
+        self.executed: List[str] = []
+        self.killed = False
+
+    def run_code(self, code: str, **kwargs) -> Execution:
+        if self.killed:
+            raise RuntimeError(f"Sandbox {self.sandbox_id} has been killed")
+        self.executed.append(code)
+        return self.handler(code) if self.handler else Execution()
+
+    def set_timeout(self, timeout: int) -> None:
+        self.timeout = timeout
+
+    def is_running(self) -> bool:
+        return not self.killed
+
+    def kill(self) -> bool:
+        self.killed = True
+        return True
@@ -0,0 +1,92 @@
+"""
+Sandbox-side registry of named dataframes shared by every agent.
+
+The dataset is parsed once, when the sandbox is set up, into
+`FRAMES["raw"]` (also bound to `df`). Stages add the frames they derive, e.g.
+`FRAMES["clean"] = df_clean`, so later cells reuse them instead of re-reading
+and re-parsing files. The registry is a plain dict and survives kernel
+snapshots like any other variable.
+"""
+
+import json
+import os
+from typing import Any, Dict
+
+# Name of the registry in the kernel's namespace
+REGISTRY_NAME = "FRAMES"
+
+# Registry key of the dataset as loaded from disk
+DATASET_FRAME = "raw"
+
+_READERS = {
+    ".csv": "pd.read_csv({path!r})",
+    ".tsv": "pd.read_csv({path!r}, sep='\\t')",
+    ".txt": "pd.read_csv({path!r}, sep=None, engine='python')",
+    ".json": "pd.read_json({path!r})",
+    ".jsonl": "pd.read_json({path!r}, lines=True)",
+    ".ndjson": "pd.read_json({path!r}, lines=True)",
+    ".xlsx": "pd.read_excel({path!r})",
+    ".xls": "pd.read_excel({path!r})",
+    ".parquet": "pd.read_parquet({path!r})",
+}
+
+
+def preload_code(dataset_path: str) -> str | None:
+    """Code loading the dataset into the registry, or None for unknown formats."""
+    reader = _READERS.get(os.path.splitext(dataset_path)[1].lower())
+    if reader is None:
+        return None
+    return f"""
+import pandas as pd
+{REGISTRY_NAME} = globals().get({REGISTRY_NAME!r}) or {{}}
+{REGISTRY_NAME}[{DATASET_FRAME!r}] = df = {reader.format(path=dataset_path)}
+"""
+
+
+def summary_code() -> str:
+    """Code printing the shape and memory footprint of every registered frame as JSON."""
+    return f"""
+def _frames_summary():
+    import json
+    summary = {{}}
+    for name, frame in globals().get({REGISTRY_NAME!r}, {{}}).items():
+        if hasattr(frame, "memory_usage") and len(getattr(frame, "shape", ())) == 2:
+            usage = frame.memory_usage(deep=True)
+            usage = usage.sum() if hasattr(usage, "sum") else usage
+            summary[str(name)] = {{
+                "shape": list(frame.shape),
+                "memory_mb": round(float(usage) / 1e6, 2),
+            }}
+    print(json.dumps(summary))
+
+_frames_summary()
+del _frames_summary
+"""
+
+
+def parse_summary(stdout: str) -> Dict[str, Dict[str, Any]]:
+    """Parse the output of `summary_code`."""
+    for line in reversed(stdout.strip().splitlines()):
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            continue
+    return {}
+
+
+def describe_frames(frames: Dict[str, Dict[str, Any]]) -> str:
+    """Tool description paragraph advertising the registered frames."""
+    if not frames:
+        return ""
+    listed = "; ".join(
+        f"{REGISTRY_NAME}[{name!r}]"
+        + (" (also `df`)" if name == DATASET_FRAME else "")
+        + f": {info['shape'][0]} rows x {info['shape'][1]} columns, "
+        f"{info['memory_mb']} MB"
+        for name, info in frames.items()
+    )
+    return (
+        f" Dataframes already loaded in the kernel: {listed}. Reuse them instead of "
+        "re-reading files, and register frames you derive for later steps with "
+        f"{REGISTRY_NAME}['<name>'] = frame."
+    )
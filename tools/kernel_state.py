@@ -0,0 +1,74 @@
+"""
+Sandbox-side code to snapshot and restore the user namespace of a kernel.
+
+Snapshots let a kernel be cloned into another sandbox (parallel branches of
+the workflow) or rehydrated later. Variables are pickled one by one so a single
+unpicklable object doesn't prevent the rest from being saved; modules and
+imported functions/classes are recorded by name and re-imported on restore.
+"""
+
+# Path of the snapshot file, relative to the sandbox working directory
+SNAPSHOT_PATH = ".kernel_state.pkl"
+
+
+def snapshot_code(path: str = SNAPSHOT_PATH) -> str:
+    """Code that writes the kernel's user namespace to `path` and prints the saved names."""
+    return f"""
+def _snapshot_kernel(path):
+    import pickle, types
+    skipped = {{"In", "Out", "exit", "quit", "get_ipython", "open"}}
+    snapshot = {{"modules": {{}}, "imports": {{}}, "state": {{}}}}
+    for name, value in list(globals().items()):
+        if name.startswith("_") or name in skipped:
+            continue
+        if isinstance(value, types.ModuleType):
+            snapshot["modules"][name] = value.__name__
+            continue
+        module = getattr(value, "__module__", None)
+        if callable(value) and module and module != "__main__":
+            snapshot["imports"][name] = (module, getattr(value, "__qualname__", name))
+            continue
+        try:
+            snapshot["state"][name] = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            continue
+    with open(path, "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(sorted(snapshot["state"]))
+
+_snapshot_kernel({path!r})
+del _snapshot_kernel
+"""
+
+
+def restore_code(path: str = SNAPSHOT_PATH) -> str:
+    """Code that loads a snapshot written by `snapshot_code` into the kernel."""
+    return f"""
+def _restore_kernel(path):
+    import importlib, os, pickle
+    with open(path, "rb") as f:
+        snapshot = pickle.load(f)
+    for name, module in snapshot["modules"].items():
+        try:
+            globals()[name] = importlib.import_module(module)
+        except Exception:
+            pass
+    for name, (module, qualname) in snapshot["imports"].items():
+        try:
+            value = importlib.import_module(module)
+            for part in qualname.split("."):
+                value = getattr(value, part)
+            globals()[name] = value
+        except Exception:
+            pass
+    for name, data in snapshot["state"].items():
+        try:
+            globals()[name] = pickle.loads(data)
+        except Exception:
+            pass
+    os.remove(path)
+    print(sorted(snapshot["state"]))
+
+_restore_kernel({path!r})
+del _restore_kernel
+"""
@@ -0,0 +1,219 @@
+import json
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from tools.execution import Execution, ExecutionError, OutputMessage, Result
+
+WORKER_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "local_kernel_worker.py"
+)
+
+# Seconds a cell gets to honour an interrupt before the kernel is killed
+INTERRUPT_GRACE = 5.0
+
+
+class LocalFilesystem:
+    """`files` API of a local kernel; relative paths resolve inside its working directory."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _resolve(self, path: str) -> str:
+        return path if os.path.isabs(path) else os.path.join(self.root, path)
+
+    def write(self, path: str, data) -> str:
+        full_path = self._resolve(path)
+        os.makedirs(os.path.dirname(full_path) or ".", exist_ok=True)
+        with open(full_path, "wb") as f:
+            if hasattr(data, "read"):
+                shutil.copyfileobj(data, f)
+            else:
+                f.write(data.encode("utf-8") if isinstance(data, str) else data)
+        return path
+
+    def read(self, path: str, format: str = "text"):
+        with open(self._resolve(path), "rb") as f:
+            data = f.read()
+        return data if format == "bytes" else data.decode("utf-8")
+
+    def exists(self, path: str) -> bool:
+        return os.path.exists(self._resolve(path))
+
+    def remove(self, path: str) -> None:
+        full_path = self._resolve(path)
+        if os.path.isdir(full_path):
+            shutil.rmtree(full_path)
+        elif os.path.exists(full_path):
+            os.remove(full_path)
+
+
+class LocalKernelSandbox:
+    """
+    Runs cells in a persistent local Python process instead of an E2B sandbox.
+
+    Meant for trusted datasets: there is no isolation beyond a private working
+    directory, but every tool call skips the network round trip and the
+    workflow can run offline (e.g. in CI). State persists across `run_code`
+    calls exactly like in a Jupyter kernel.
+    """
+
+    def __init__(self, timeout: int = 600, workdir: str | None = None):
+        """
+        Start the kernel process.
+
+        Args:
+            timeout: Lifetime hint kept for parity with E2B sandboxes
+            workdir: Working directory of the kernel (a temporary one by default)
+        """
+        self.sandbox_id = f"local-{uuid.uuid4().hex[:8]}"
+        self.timeout = timeout
+        self._owns_workdir = workdir is None
+        self.workdir = workdir or tempfile.mkdtemp(prefix="local-kernel-")
+        self.files = LocalFilesystem(self.workdir)
+        self._lock = threading.Lock()
+        self._messages: queue.Queue = queue.Queue()
+
+        env = dict(os.environ, MPLBACKEND="Agg", PYTHONUNBUFFERED="1")
+        self._process = subprocess.Popen(
+            [sys.executable, WORKER_PATH],
+            cwd=self.workdir,
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self._reader = threading.Thread(target=self._read_messages, daemon=True)
+        self._reader.start()
+
+    def _read_messages(self) -> None:
+        for line in self._process.stdout:
+            try:
+                self._messages.put(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        self._messages.put(None)
+
+    def run_code(
+        self,
+        code: str,
+        on_stdout=None,
+        on_stderr=None,
+        on_result=None,
+        on_error=None,
+        timeout: float | None = None,
+        **kwargs,
+    ) -> Execution:
+        """
+        Execute a cell in the kernel and wait for it to finish.
+
+        Args:
+            code: Python code to run
+            on_stdout: Callback receiving stdout chunks as they are produced
+            on_stderr: Callback receiving stderr chunks as they are produced
+            on_result: Callback receiving each rich result
+            on_error: Callback receiving the execution error, if any
+            timeout: Seconds after which the cell is interrupted
+
+        Returns:
+            The execution results, logs and error
+        """
+        with self._lock:
+            if not self.is_running():
+                raise RuntimeError(f"Local kernel {self.sandbox_id} is not running")
+            self._process.stdin.write(json.dumps({"code": code}) + "\n")
+            self._process.stdin.flush()
+
+            execution = Execution()
+            deadline = None if timeout is None else time.monotonic() + timeout
+            interrupted = False
+            while True:
+                wait = (
+                    None if deadline is None else max(deadline - time.monotonic(), 0.05)
+                )
+                try:
+                    message = self._messages.get(timeout=wait)
+                except queue.Empty:
+                    if not interrupted:
+                        self.interrupt()
+                        interrupted = True
+                    elif time.monotonic() > deadline + INTERRUPT_GRACE:
+                        # The cell ignores interrupts (e.g. stuck in native code)
+                        self._process.kill()
+                    continue
+                if message is None:
+                    # Reap the process so `is_running()` reflects its death
+                    self._process.wait()
+                    execution.error = ExecutionError(
+                        "KernelDied", "The local kernel process exited", ""
+                    )
+                    break
+
+                kind = message["type"]
+                if kind in ("stdout", "stderr"):
+                    getattr(execution.logs, kind).append(message["text"])
+                    callback = on_stdout if kind == "stdout" else on_stderr
+                    if callback:
+                        callback(
+                            OutputMessage(
+                                message["text"], time.time_ns(), kind == "stderr"
+                            )
+                        )
+                elif kind == "result":
+                    result = Result(
+                        is_main_result=message.get("main", False), **message["data"]
+                    )
+                    execution.results.append(result)
+                    if on_result:
+                        on_result(result)
+                elif kind == "done":
+                    execution.execution_count = message["execution_count"]
+                    if message["error"]:
+                        execution.error = ExecutionError(**message["error"])
+                        if interrupted:
+                            execution.error.name = "TimeoutError"
+                            execution.error.value = (
+                                f"Execution timed out after {timeout}s"
+                            )
+                        if on_error:
+                            on_error(execution.error)
+                    break
+            return execution
+
+    def interrupt(self) -> None:
+        """Interrupt the running cell, like Jupyter's "interrupt kernel"."""
+        if self.is_running():
+            self._process.send_signal(signal.SIGINT)
+
+    def memory_usage(self) -> int | None:
+        """Resident memory of the kernel process in bytes (Linux only, else None)."""
+        try:
+            with open(f"/proc/{self._process.pid}/statm") as f:
+                resident_pages = int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            return None
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+    def set_timeout(self, timeout: int) -> None:
+        # A local kernel lives until it is killed; kept for API parity
+        self.timeout = timeout
+
+    def is_running(self) -> bool:
+        return self._process.poll() is None
+
+    def kill(self) -> bool:
+        if self.is_running():
+            self._process.kill()
+            self._process.wait()
+        if self._owns_workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+        return True
@@ -0,0 +1,180 @@
+"""
+Worker process behind `LocalKernelSandbox`.
+
+Reads one JSON request per line from stdin and executes the code in a
+persistent namespace, streaming JSON messages back on the original stdout:
+
+    {"type": "stdout" | "stderr", "text": ...}
+    {"type": "result", "data": {"text": ..., "html": ..., "png": ...}}
+    {"type": "done", "error": null | {"name", "value", "traceback"}, "execution_count": n}
+
+This file is run as a script and must only depend on the standard library.
+"""
+
+import ast
+import base64
+import io
+import json
+import os
+import signal
+import subprocess
+import sys
+import traceback
+
+# Keep a private channel for the protocol and send anything written straight to
+# fd 1 (e.g. by subprocesses) to stderr so it can't corrupt the message stream.
+_channel = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+os.dup2(2, 1)
+
+
+def _send(message: dict) -> None:
+    _channel.write(json.dumps(message) + "\n")
+    _channel.flush()
+
+
+class _StreamForwarder(io.TextIOBase):
+    def __init__(self, name: str):
+        self.name = name
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            _send({"type": self.name, "text": text})
+        return len(text)
+
+
+def _new_namespace() -> dict:
+    return {"__name__": "__main__", "__builtins__": __builtins__}
+
+
+namespace = _new_namespace()
+_running = False
+
+
+def _interrupt(signum, frame) -> None:
+    # Only cancel a running cell; an interrupt arriving between cells is dropped
+    if _running:
+        raise KeyboardInterrupt
+
+
+signal.signal(signal.SIGINT, _interrupt)
+
+
+def _shell(command: str) -> None:
+    completed = subprocess.run(command, shell=True, capture_output=True, text=True)
+    sys.stdout.write(completed.stdout)
+    sys.stderr.write(completed.stderr)
+
+
+def _reset() -> None:
+    namespace.clear()
+    namespace.update(_new_namespace())
+
+
+def _transform_magics(code: str) -> str:
+    """Translate the few IPython magics agents use into plain Python."""
+    lines = []
+    for line in code.splitlines():
+        stripped = line.strip()
+        indent = line[: len(line) - len(line.lstrip())]
+        if stripped.startswith("!"):
+            lines.append(f"{indent}__shell__({stripped[1:]!r})")
+        elif stripped.startswith("%pip "):
+            command = f"{sys.executable} -m pip {stripped[5:]}"
+            lines.append(f"{indent}__shell__({command!r})")
+        elif stripped.startswith("%reset"):
+            lines.append(f"{indent}__reset__()")
+        elif stripped.startswith("%"):
+            lines.append(f"{indent}pass  # unsupported magic: {stripped}")
+        else:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def _display_data(value) -> dict:
+    data = {"text": repr(value)}
+    repr_html = getattr(value, "_repr_html_", None)
+    if callable(repr_html):
+        try:
+            html = repr_html()
+            if html:
+                data["html"] = html
+        except Exception:
+            pass
+    return data
+
+
+def _figures() -> list:
+    pyplot = sys.modules.get("matplotlib.pyplot")
+    if pyplot is None:
+        return []
+    images = []
+    for number in pyplot.get_fignums():
+        buffer = io.BytesIO()
+        pyplot.figure(number).savefig(buffer, format="png", bbox_inches="tight")
+        images.append({"png": base64.b64encode(buffer.getvalue()).decode("ascii")})
+    pyplot.close("all")
+    return images
+
+
+def _execute(code: str) -> None:
+    namespace["__shell__"] = _shell
+    namespace["__reset__"] = _reset
+    tree = ast.parse(_transform_magics(code), mode="exec")
+    last_expression = None
+    if tree.body and isinstance(tree.body[-1], ast.Expr):
+        last_expression = ast.Expression(tree.body.pop().value)
+    exec(compile(tree, "<cell>", "exec"), namespace)
+    if last_expression is not None:
+        value = eval(compile(last_expression, "<cell>", "eval"), namespace)
+        if value is not None:
+            _send({"type": "result", "data": _display_data(value), "main": True})
+
+
+def _user_traceback(error: BaseException):
+    # Drop the worker's own frames so tracebacks only show the cell's code
+    tb = error.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename == __file__:
+        tb = tb.tb_next
+    return tb
+
+
+def main() -> None:
+    global _running
+    execution_count = 0
+    requests = sys.stdin
+    sys.stdin = io.StringIO()
+    sys.stdout = _StreamForwarder("stdout")
+    sys.stderr = _StreamForwarder("stderr")
+    for line in requests:
+        request = json.loads(line)
+        execution_count += 1
+        error = None
+        _running = True
+        try:
+            _execute(request["code"])
+        except BaseException as e:  # KeyboardInterrupt is how cells are cancelled
+            if isinstance(e, SystemExit):
+                error = {"name": "SystemExit", "value": str(e.code), "traceback": ""}
+            else:
+                error = {
+                    "name": type(e).__name__,
+                    "value": str(e),
+                    "traceback": "".join(
+                        traceback.format_exception(type(e), e, _user_traceback(e))
+                    ),
+                }
+        finally:
+            _running = False
+        try:
+            for image in _figures():
+                _send({"type": "result", "data": image, "main": False})
+        except Exception:
+            pass
+        _send({"type": "done", "error": error, "execution_count": execution_count})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import ast
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict
+
+# Bump when the shape of cached results changes
+CACHE_VERSION = "2"
+
+# Calls that only read kernel state. A cell made only of expressions calling
+# these (e.g. `df.head()`, `df["a"].describe()`) can be answered from the cache.
+READ_ONLY_CALLS = frozenset(
+    {
+        "head",
+        "tail",
+        "describe",
+        "info",
+        "nunique",
+        "unique",
+        "value_counts",
+        "isnull",
+        "isna",
+        "notnull",
+        "notna",
+        "sum",
+        "mean",
+        "median",
+        "std",
+        "var",
+        "min",
+        "max",
+        "count",
+        "corr",
+        "cov",
+        "skew",
+        "kurt",
+        "quantile",
+        "memory_usage",
+        "duplicated",
+        "any",
+        "all",
+        "idxmin",
+        "idxmax",
+        "mode",
+        "to_string",
+        "to_dict",
+        "tolist",
+        "keys",
+        "items",
+        "nlargest",
+        "nsmallest",
+        "print",
+        "len",
+        "type",
+        "repr",
+        "str",
+        "list",
+        "sorted",
+        "round",
+        "dict",
+        "set",
+        "tuple",
+        "display",
+    }
+)
+
+
+def normalize_code(code: str) -> str:
+    """Canonical form of a cell, ignoring comments and formatting."""
+    try:
+        return ast.unparse(ast.parse(code))
+    except SyntaxError:
+        return code.strip()
+
+
+def is_side_effect_free(code: str) -> bool:
+    """
+    Whether a cell only reads kernel state.
+
+    Conservative: the cell must consist solely of expression statements whose
+    calls are all in `READ_ONLY_CALLS`; assignments, imports, definitions,
+    loops, magics and anything else count as state-mutating.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return False
+    if not tree.body or not all(isinstance(node, ast.Expr) for node in tree.body):
+        return False
+    for node in ast.walk(tree):
+        if isinstance(
+            node, (ast.Lambda, ast.NamedExpr, ast.Await, ast.Yield, ast.YieldFrom)
+        ):
+            return False
+        if isinstance(node, ast.Call):
+            func = node.func
+            name = (
+                func.attr
+                if isinstance(func, ast.Attribute)
+                else getattr(func, "id", None)
+            )
+            if name not in READ_ONLY_CALLS:
+                return False
+    return True
+
+
+def cache_key(code: str, dataset_digest: str | None, lineage: str) -> str:
+    """Key of a cell result: normalized code, dataset content and the cells run before it."""
+    material = "\0".join(
+        [CACHE_VERSION, normalize_code(code), dataset_digest or "", lineage]
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def extend_lineage(lineage: str, code: str) -> str:
+    """Fold a state-mutating cell into the lineage hash."""
+    material = f"{lineage}\0{normalize_code(code)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk LRU cache of cell results.
+
+    Each entry is a JSON file named after its key. Entries are evicted least
+    recently used first once the cache holds more than `max_entries` entries
+    or `max_bytes` bytes.
+    """
+
+    def __init__(
+        self, directory: str, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024
+    ):
+        """
+        Initialize the result cache.
+
+        Args:
+            directory: Directory holding the cache entries
+            max_entries: Maximum number of entries kept
+            max_bytes: Maximum total size of the entries in bytes
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+
+        os.makedirs(directory, exist_ok=True)
+        existing = []
+        for name in os.listdir(directory):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(directory, name))
+                existing.append((stat.st_mtime, name[: -len(".json")], stat.st_size))
+        for _, key, size in sorted(existing):
+            self._entries[key] = size
+            self._total_bytes += size
+        with self._lock:
+            self._evict()
+
+    @classmethod
+    def from_env(cls) -> "ResultCache | None":
+        """Create a cache in CODE_INTERPRETER_CACHE_DIR, or None when it is unset."""
+        directory = os.getenv("CODE_INTERPRETER_CACHE_DIR")
+        return cls(directory) if directory else None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Dict[str, Any] | None:
+        with self._lock:
+            if key not in self._entries:
+                self.stats["misses"] += 1
+                return None
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    value = json.load(f)
+                os.utime(self._path(key))
+            except (OSError, json.JSONDecodeError):
+                self._total_bytes -= self._entries.pop(key)
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        data = json.dumps(value)
+        with self._lock:
+            with open(self._path(key), "w", encoding="utf-8") as f:
+                f.write(data)
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.stats["evictions"] += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
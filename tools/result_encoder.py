@@ -0,0 +1,193 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+from tools.artifacts import ArtifactStore
+
+# Formats a rich result may carry, as exposed by e2b_code_interpreter.Result
+RESULT_FORMATS = ("text", "html", "markdown", "svg", "png", "jpeg", "latex", "json")
+
+# Binary/markup formats that are always written to the artifact store
+SPILLED_FORMATS = {"png": "png", "jpeg": "jpg", "svg": "svg", "html": "html"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a string (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def execution_record(execution: Any) -> Dict[str, Any]:
+    """
+    Convert an execution into a plain, JSON-serializable record.
+
+    Works for E2B executions as well as the local and fake sandbox ones.
+    """
+    results = []
+    for item in execution.results:
+        formats = {}
+        for name in RESULT_FORMATS:
+            value = getattr(item, name, None)
+            if value is not None:
+                formats[name] = value
+        results.append(formats)
+    error = execution.error
+    return {
+        "results": results,
+        "stdout": list(execution.logs.stdout),
+        "stderr": list(execution.logs.stderr),
+        "error": (
+            None
+            if error is None
+            else {
+                "name": error.name,
+                "value": error.value,
+                "traceback": error.traceback,
+            }
+        ),
+    }
+
+
+def truncate(text: str, limit: int) -> str:
+    """Keep the head and tail of `text`, replacing the middle with a byte count."""
+    if len(text) <= limit:
+        return text
+    head = limit * 2 // 3
+    tail = limit - head
+    omitted = len(text.encode("utf-8")) - len(text[:head].encode("utf-8"))
+    omitted -= len(text[-tail:].encode("utf-8"))
+    return f"{text[:head]}\n... [{omitted} bytes omitted] ...\n{text[-tail:]}"
+
+
+class ResultEncoder:
+    """
+    Turns execution records into compact tool output for the LLM.
+
+    Images and HTML are written to an `ArtifactStore` and replaced by their
+    path, long text results and logs are cut to a head/tail window, empty
+    fields are dropped and JSON is emitted without indentation. Token usage is
+    compared with the previous verbose encoding and accumulated in `stats`.
+    """
+
+    def __init__(
+        self,
+        artifacts: ArtifactStore | None = None,
+        max_log_chars: int = 4000,
+        max_text_chars: int = 2000,
+    ):
+        """
+        Initialize the encoder.
+
+        Args:
+            artifacts: Store for spilled images, HTML and full-length text
+            max_log_chars: Characters of stdout/stderr kept inline
+            max_text_chars: Characters of each text result kept inline
+        """
+        self.artifacts = artifacts or ArtifactStore()
+        self.max_log_chars = max_log_chars
+        self.max_text_chars = max_text_chars
+        self.stats = {"calls": 0, "verbose_tokens": 0, "compact_tokens": 0}
+
+    def encode(self, record: Dict[str, Any]) -> str:
+        """
+        Encode an execution record as compact JSON.
+
+        Args:
+            record: Record produced by `execution_record`
+
+        Returns:
+            The JSON string handed to the agent
+        """
+        return self.encode_counted(record)[0]
+
+    def encode_counted(self, record: Dict[str, Any]) -> Tuple[str, int]:
+        """
+        Like `encode`, also returning the estimated tokens of the verbose format.
+
+        Returns:
+            The JSON string handed to the agent and the tokens it replaces
+        """
+        output: Dict[str, Any] = {}
+        results = [self._encode_result(result) for result in record["results"]]
+        if results:
+            output["results"] = results
+        for stream in ("stdout", "stderr"):
+            text = "".join(record[stream])
+            if text:
+                output[stream] = self._spill_text(text, self.max_log_chars)
+        if record["error"]:
+            error = dict(record["error"])
+            error["traceback"] = truncate(error["traceback"], self.max_log_chars)
+            output["error"] = error
+
+        content = json.dumps(output, separators=(",", ":"), ensure_ascii=False)
+        verbose_tokens = estimate_tokens(verbose_encoding(record))
+        self.stats["calls"] += 1
+        self.stats["verbose_tokens"] += verbose_tokens
+        self.stats["compact_tokens"] += estimate_tokens(content)
+        return content, verbose_tokens
+
+    def _encode_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        encoded: Dict[str, Any] = {}
+        for name, value in result.items():
+            if name in ("png", "jpeg"):
+                encoded[name] = self.artifacts.put_base64(
+                    value, SPILLED_FORMATS[name], chart=True
+                )
+            elif name in SPILLED_FORMATS:
+                # HTML results are mostly tables (`_repr_html_`), not charts
+                encoded[name] = self.artifacts.put(
+                    value, SPILLED_FORMATS[name], chart=name == "svg"
+                )
+            elif name == "json":
+                encoded[name] = self._spill_text(
+                    json.dumps(value), self.max_text_chars, "json"
+                )
+            else:
+                encoded[name] = self._spill_text(value, self.max_text_chars)
+        # The text repr of a chart ("<Figure size 640x480 with 1 Axes>") adds nothing
+        if "text" in encoded and ("png" in encoded or "svg" in encoded):
+            if encoded["text"].startswith("<Figure"):
+                del encoded["text"]
+        return encoded
+
+    def _spill_text(self, text: str, limit: int, extension: str = "txt") -> str:
+        if len(text) <= limit:
+            return text
+        path = self.artifacts.put(text, extension)
+        return f"{truncate(text, limit)}\n[full output: {path}]"
+
+    def savings(self) -> str:
+        return format_savings(self.stats)
+
+
+def format_savings(stats: Dict[str, int]) -> str:
+    """Describe encoder stats, e.g. "12 call(s): ~900 tokens instead of ~4000 (78% saved)"."""
+    verbose, compact = stats["verbose_tokens"], stats["compact_tokens"]
+    saved = 1 - compact / verbose if verbose else 0.0
+    return (
+        f"{stats['calls']} call(s): ~{compact} tokens instead of "
+        f"~{verbose} ({saved:.0%} saved)"
+    )
+
+
+def verbose_encoding(record: Dict[str, Any]) -> str:
+    """The tool's previous output format, used as the baseline for savings."""
+    results: List[str] = []
+    for result in record["results"]:
+        if result.get("text"):
+            results.append(f"Result({result['text']})")
+        else:
+            results.append(f"Result(Formats: {', '.join(result)})")
+    error = record["error"]
+    return json.dumps(
+        {
+            "results": results,
+            "stdout": record["stdout"],
+            "stderr": record["stderr"],
+            "error": (
+                "None"
+                if error is None
+                else f"ExecutionError(name={error['name']!r}, value={error['value']!r}, traceback={error['traceback']!r})"
+            ),
+        },
+        indent=2,
+    )
@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+from typing import Any
+
+from tools.backends import ExecutionBackend, resolve_backend
+from tools.sandbox_pool import SandboxPool, get_sandbox_pool
+from tools.tracing import get_tracer
+from tools.upload_cache import cached_upload
+from tools.uploads import UploadStats, stream_upload
+
+
+class SandboxBoot:
+    """
+    Leases a sandbox and uploads the dataset in a background thread.
+
+    Neither step depends on the crew, so the CLI starts them right after
+    parsing its arguments and they overlap with importing CrewAI, profiling
+    the dataset and building the agents. The code interpreter tool takes the
+    sandbox over with `result()` and finds the dataset already recorded in the
+    sandbox's upload manifest, so it doesn't upload it again.
+    """
+
+    def __init__(
+        self,
+        backend: str | None = None,
+        dataset_path: str | None = None,
+        sandbox_pool: SandboxPool | None = None,
+    ):
+        """
+        Start booting a sandbox.
+
+        Args:
+            backend: Name of the execution backend (defaults to CODE_INTERPRETER_BACKEND or e2b)
+            dataset_path: Dataset to upload once the sandbox is up
+            sandbox_pool: Pool to lease from (defaults to the backend's shared pool)
+        """
+        self.backend = resolve_backend(backend)
+        self.pool = sandbox_pool or get_sandbox_pool(self.backend)
+        self.dataset_path = dataset_path
+        self.boot_seconds: float | None = None
+        self.upload_seconds: float | None = None
+        # Statistics of the dataset transfer, None if it was skipped or copied
+        self.upload_stats: UploadStats | None = None
+        self._sandbox: ExecutionBackend | None = None
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(
+            target=self._boot, name="sandbox-boot", daemon=True
+        )
+        self._thread.start()
+
+    def _boot(self) -> None:
+        started = time.perf_counter()
+        try:
+            self._sandbox = self.pool.acquire()
+            self.boot_seconds = time.perf_counter() - started
+            # Without the upload cache the tool would upload the dataset anyway
+            if self.dataset_path and os.getenv("UPLOAD_CACHE", "1") != "0":
+                started = time.perf_counter()
+                self._upload(self._sandbox, self.dataset_path)
+                self.upload_seconds = time.perf_counter() - started
+        except Exception as e:
+            self._error = e
+
+    def _upload(self, sandbox: Any, file_path: str) -> None:
+        def upload(path: str) -> str:
+            compression = os.getenv("UPLOAD_COMPRESSION") or None
+            with get_tracer().span("sandbox.write", path=path) as span:
+                with open(path, "rb") as f:
+                    self.upload_stats = stream_upload(
+                        sandbox, path, f, compression=compression
+                    )
+                span.set(
+                    bytes_read=self.upload_stats.bytes_read,
+                    bytes_sent=self.upload_stats.bytes_sent,
+                    chunks=self.upload_stats.chunks,
+                    compression=compression,
+                )
+            return path
+
+        cached_upload(sandbox, file_path, upload)
+
+    @property
+    def done(self) -> bool:
+        return not self._thread.is_alive()
+
+    def result(self, timeout: float | None = None) -> ExecutionBackend:
+        """
+        Wait for the sandbox and take it over; it must be released to `pool`.
+
+        A failed upload is not fatal (the tool uploads the dataset itself), a
+        failed boot is raised.
+        """
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            raise TimeoutError(f"Sandbox not ready within {timeout}s")
+        sandbox, self._sandbox = self._sandbox, None
+        if sandbox is None:
+            if self._error is not None:
+                raise self._error
+            raise RuntimeError("The booted sandbox was already taken")
+        if self._error is not None:
+            print(f"Background upload of {self.dataset_path} failed: {self._error}")
+        return sandbox
+
+    def cancel(self) -> None:
+        """Return the sandbox to the pool if nobody took it over."""
+        self._thread.join()
+        sandbox, self._sandbox = self._sandbox, None
+        if sandbox is not None:
+            self.pool.release(sandbox)
@@ -0,0 +1,303 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Tuple
+
+from tools.backends import create_sandbox, e2b_sandbox_factory, resolve_backend
+from tools.upload_cache import forget_manifest
+
+# Clears the kernel namespace between leases. Uploaded files are kept so later
+# runs over the same dataset don't have to upload it again.
+DEFAULT_RESET_CODE = "%reset -f"
+
+
+def default_health_check(sandbox: Any) -> bool:
+    """Consider a sandbox healthy while the provider reports it as running."""
+    is_running = getattr(sandbox, "is_running", None)
+    if is_running is None:
+        return True
+    try:
+        return bool(is_running())
+    except Exception:
+        return False
+
+
+class SandboxPool:
+    """
+    A pool of warm sandboxes that tools lease from and return to.
+
+    Booting a sandbox is the slowest step before the first agent can act, so
+    released sandboxes are reset and kept idle for `idle_ttl` seconds, ready to
+    be handed to the next lease. The pool never holds more than `max_size`
+    sandboxes (leased + idle) and `prewarm` tops it up to `min_size`.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any] = e2b_sandbox_factory,
+        min_size: int = 0,
+        max_size: int = 4,
+        idle_ttl: float = 300.0,
+        health_check: Callable[[Any], bool] = default_health_check,
+        reset_code: str | None = DEFAULT_RESET_CODE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the sandbox pool.
+
+        Args:
+            factory: Callable creating a new sandbox
+            min_size: Number of sandboxes kept warm by `prewarm`
+            max_size: Maximum number of sandboxes alive at once
+            idle_ttl: Seconds an idle sandbox is kept before it is killed
+            health_check: Callable returning False for sandboxes that must be discarded
+            reset_code: Code run in a returned sandbox to reset its state (None to skip)
+            clock: Monotonic clock, replaceable for deterministic eviction
+        """
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(
+                f"Invalid pool size: min_size={min_size}, max_size={max_size}"
+            )
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.health_check = health_check
+        self.reset_code = reset_code
+        self.clock = clock
+
+        self._idle: List[Tuple[Any, float]] = []
+        self._leased: Dict[int, Any] = {}
+        self._creating = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self.stats = {"created": 0, "reused": 0, "evicted": 0, "discarded": 0}
+
+    @property
+    def size(self) -> int:
+        """Number of sandboxes alive (idle, leased or being created)."""
+        return len(self._idle) + len(self._leased) + self._creating
+
+    def acquire(self, timeout: float | None = None) -> Any:
+        """
+        Lease a sandbox, reusing an idle one when possible.
+
+        Args:
+            timeout: Seconds to wait for a sandbox when the pool is exhausted
+
+        Returns:
+            A sandbox that must be handed back with `release`
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            candidate = None
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Sandbox pool is closed")
+                    expired = self._take_expired()
+                    if expired or self._idle or self.size < self.max_size:
+                        break
+                    remaining = None if deadline is None else deadline - self.clock()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(
+                            f"No sandbox available within {timeout}s (max_size={self.max_size})"
+                        )
+                    self._condition.wait(remaining)
+                if self._idle:
+                    # Counted as leased while its health is checked, so the
+                    # pool can't grow past max_size in the meantime
+                    candidate, _ = self._idle.pop()
+                    self._leased[id(candidate)] = candidate
+                elif not expired:
+                    self._creating += 1
+
+            # Kills and health checks are network calls, made outside the lock
+            for sandbox in expired:
+                self._kill(sandbox)
+            if candidate is not None:
+                if self.health_check(candidate):
+                    with self._condition:
+                        self.stats["reused"] += 1
+                    return candidate
+                self.discard(candidate)
+                continue
+            if not expired:
+                break
+
+        # Boot outside the lock so other leases and releases are not blocked
+        try:
+            sandbox = self.factory()
+        except Exception:
+            with self._condition:
+                self._creating -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._creating -= 1
+            self._leased[id(sandbox)] = sandbox
+            self.stats["created"] += 1
+        return sandbox
+
+    def release(self, sandbox: Any) -> None:
+        """
+        Return a leased sandbox to the pool.
+
+        The sandbox is reset and kept idle; if the reset fails or the pool is
+        closed, the sandbox is killed instead.
+        """
+        with self._condition:
+            if self._leased.pop(id(sandbox), None) is None:
+                return
+            closed = self._closed
+
+        reusable = not closed and self._reset(sandbox)
+        with self._condition:
+            if reusable:
+                self._idle.append((sandbox, self.clock()))
+            else:
+                self.stats["discarded"] += 1
+            self._condition.notify()
+        if not reusable:
+            self._kill(sandbox)
+
+    def discard(self, sandbox: Any) -> None:
+        """Kill a leased sandbox instead of returning it to the pool."""
+        with self._condition:
+            self._leased.pop(id(sandbox), None)
+            self.stats["discarded"] += 1
+            self._condition.notify()
+        self._kill(sandbox)
+
+    @contextmanager
+    def lease(self, timeout: float | None = None):
+        """Context manager that leases a sandbox and returns it on exit."""
+        sandbox = self.acquire(timeout=timeout)
+        try:
+            yield sandbox
+        finally:
+            self.release(sandbox)
+
+    def prewarm(self) -> int:
+        """
+        Boot sandboxes until `min_size` are idle.
+
+        Returns:
+            Number of sandboxes created
+        """
+        created = 0
+        while True:
+            with self._condition:
+                expired = self._take_expired()
+                full = (
+                    self._closed
+                    or len(self._idle) + self._creating >= self.min_size
+                    or self.size >= self.max_size
+                )
+                if not full:
+                    self._creating += 1
+            for sandbox in expired:
+                self._kill(sandbox)
+            if full:
+                return created
+            try:
+                sandbox = self.factory()
+            except Exception:
+                with self._condition:
+                    self._creating -= 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                self._creating -= 1
+                self._idle.append((sandbox, self.clock()))
+                self.stats["created"] += 1
+                self._condition.notify()
+            created += 1
+
+    def evict_idle(self) -> int:
+        """
+        Kill idle sandboxes whose TTL has expired.
+
+        Returns:
+            Number of sandboxes evicted
+        """
+        with self._condition:
+            expired = self._take_expired()
+        for sandbox in expired:
+            self._kill(sandbox)
+        return len(expired)
+
+    def close(self) -> None:
+        """Kill all idle sandboxes; leased ones are killed when released."""
+        with self._condition:
+            self._closed = True
+            idle = [sandbox for sandbox, _ in self._idle]
+            self._idle.clear()
+            self._condition.notify_all()
+        for sandbox in idle:
+            self._kill(sandbox)
+
+    def _take_expired(self) -> List[Any]:
+        # Must be called with the lock held; the caller kills the returned
+        # sandboxes once it has released the lock
+        now = self.clock()
+        expired = [s for s, since in self._idle if now - since >= self.idle_ttl]
+        if not expired:
+            return []
+        self._idle = [
+            (s, since) for s, since in self._idle if now - since < self.idle_ttl
+        ]
+        self.stats["evicted"] += len(expired)
+        self._condition.notify_all()
+        return expired
+
+    def _reset(self, sandbox: Any) -> bool:
+        try:
+            if self.reset_code:
+                execution = sandbox.run_code(self.reset_code)
+                if getattr(execution, "error", None):
+                    return False
+            # Keep the sandbox alive for as long as it may sit idle in the pool
+            sandbox.set_timeout(int(self.idle_ttl) + 60)
+            return self.health_check(sandbox)
+        except Exception as e:
+            print(f"Error resetting sandbox, discarding it: {e}")
+            return False
+
+    @staticmethod
+    def _kill(sandbox: Any) -> None:
+        forget_manifest(sandbox)
+        try:
+            sandbox.kill()
+        except Exception as e:
+            print(f"Error killing sandbox: {e}")
+
+
+_default_pools: Dict[str, SandboxPool] = {}
+_default_pools_lock = threading.Lock()
+
+
+def get_sandbox_pool(backend: str | None = None) -> SandboxPool:
+    """
+    Return the process-wide sandbox pool of a backend.
+
+    Sizing is read from SANDBOX_POOL_MIN_SIZE, SANDBOX_POOL_MAX_SIZE and
+    SANDBOX_POOL_IDLE_TTL the first time the pool is created.
+
+    Args:
+        backend: Name of the execution backend (defaults to CODE_INTERPRETER_BACKEND or e2b)
+    """
+    name = resolve_backend(backend)
+    with _default_pools_lock:
+        if name not in _default_pools:
+            pool = SandboxPool(
+                factory=lambda: create_sandbox(name),
+                min_size=int(os.getenv("SANDBOX_POOL_MIN_SIZE", "0")),
+                max_size=int(os.getenv("SANDBOX_POOL_MAX_SIZE", "4")),
+                idle_ttl=float(os.getenv("SANDBOX_POOL_IDLE_TTL", "300")),
+            )
+            atexit.register(pool.close)
+            _default_pools[name] = pool
+        return _default_pools[name]
@@ -0,0 +1,280 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List
+
+# Spans kept in memory before the oldest are dropped
+DEFAULT_MAX_SPANS = 100_000
+
+# Events kept per span; later ones are only counted
+MAX_EVENTS_PER_SPAN = 128
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+@dataclass
+class Span:
+    """A timed operation with its attributes (bytes, sizes, tokens, retries, ...)."""
+
+    name: str
+    trace_id: str
+    span_id: str = field(default_factory=lambda: _new_id(8))
+    parent_id: str | None = None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    dropped_events: int = 0
+    error: str | None = None
+
+    @property
+    def seconds(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e9
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        """Record a timestamped event (e.g. a chunk of streamed output)."""
+        if len(self.events) >= MAX_EVENTS_PER_SPAN:
+            self.dropped_events += 1
+            return
+        self.events.append(
+            {"name": name, "time_ns": time.time_ns(), "attributes": attributes}
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat record used for JSONL export."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start_ns / 1e9,
+            "seconds": round(self.seconds, 6),
+            "attributes": self.attributes,
+            "events": self.events,
+            "error": self.error,
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Span in the OpenTelemetry (OTLP/JSON) format."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+                if value is not None
+            ],
+            "status": (
+                {"code": 2, "message": self.error} if self.error else {"code": 1}
+            ),
+        }
+        if self.events:
+            span["events"] = [
+                {
+                    "timeUnixNano": str(event["time_ns"]),
+                    "name": event["name"],
+                    "attributes": [
+                        {"key": key, "value": _otlp_value(value)}
+                        for key, value in event["attributes"].items()
+                    ],
+                }
+                for event in self.events
+            ]
+            span["droppedEventsCount"] = self.dropped_events
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """
+    Records spans of sandbox calls, uploads, tasks and LLM calls.
+
+    Each thread keeps its own stack of active spans; a span started without an
+    explicit parent is the child of the top of that stack, or the root of a new
+    trace. `attach` puts a span from another thread on the current stack, so
+    work fanned out to thread pools stays in its trace.
+    """
+
+    def __init__(
+        self, service_name: str = "dataanalysis", max_spans: int = DEFAULT_MAX_SPANS
+    ):
+        """
+        Initialize the tracer.
+
+        Args:
+            service_name: Service name reported in OpenTelemetry exports
+            max_spans: Finished spans kept in memory before the oldest are dropped
+        """
+        self.service_name = service_name
+        self.spans: deque = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current(self) -> Span | None:
+        """The innermost active span of the calling thread."""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def start_span(self, name: str, parent: Span | None = None, **attributes) -> Span:
+        """Start a span without making it current; finish it with `end_span`."""
+        parent = parent or self.current()
+        return Span(
+            name=name,
+            trace_id=parent.trace_id if parent else _new_id(16),
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes,
+        )
+
+    def end_span(self, span: Span, error: BaseException | str | None = None) -> None:
+        span.end_ns = time.time_ns()
+        if error is not None:
+            span.error = (
+                error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+            )
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(
+        self, name: str, parent: Span | None = None, **attributes
+    ) -> Iterator[Span]:
+        """Time the enclosed block as a span, recording any exception it raises."""
+        span = self.start_span(name, parent=parent, **attributes)
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            stack.remove(span)
+            self.end_span(span)
+
+    def push(self, span: Span) -> None:
+        """Make `span` the current span of this thread until `pop`."""
+        self._stack().append(span)
+
+    def pop(self, span: Span) -> None:
+        stack = self._stack()
+        if span in stack:
+            stack.remove(span)
+
+    @contextmanager
+    def attach(self, span: Span | None) -> Iterator[None]:
+        """Make `span` the current span of this thread for the enclosed block."""
+        if span is None:
+            yield
+            return
+        self.push(span)
+        try:
+            yield
+        finally:
+            self.pop(span)
+
+    def annotate(self, **attributes: Any) -> None:
+        """Set attributes on the current span, if there is one."""
+        span = self.current()
+        if span is not None:
+            span.set(**attributes)
+
+    def finished(self, trace_id: str | None = None) -> List[Span]:
+        """Finished spans, optionally only those of one trace."""
+        with self._lock:
+            spans = list(self.spans)
+        if trace_id is not None:
+            spans = [span for span in spans if span.trace_id == trace_id]
+        return spans
+
+    def summary(self, trace_id: str | None = None) -> Dict[str, Dict[str, Any]]:
+        """Count, total time and errors per span name, slowest first."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for span in self.finished(trace_id):
+            entry = totals.setdefault(
+                span.name, {"count": 0, "seconds": 0.0, "errors": 0}
+            )
+            entry["count"] += 1
+            entry["seconds"] += span.seconds
+            entry["errors"] += span.error is not None
+        for entry in totals.values():
+            entry["seconds"] = round(entry["seconds"], 3)
+        return dict(sorted(totals.items(), key=lambda item: -item[1]["seconds"]))
+
+    def export_jsonl(self, path: str, trace_id: str | None = None) -> int:
+        """Append finished spans to `path`, one JSON object per line."""
+        spans = self.finished(trace_id)
+        with open(path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+        return len(spans)
+
+    def export_otlp(self, path: str, trace_id: str | None = None) -> int:
+        """Write finished spans as an OTLP/JSON `ExportTraceServiceRequest`."""
+        spans = self.finished(trace_id)
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "dataanalysis.tracing"},
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(request, f)
+        return len(spans)
+
+    def export(self, path: str, trace_id: str | None = None) -> int:
+        """Export to JSONL for `.jsonl` paths and to OTLP/JSON otherwise."""
+        if path.endswith(".jsonl"):
+            return self.export_jsonl(path, trace_id)
+        return self.export_otlp(path, trace_id)
+
+
+_default_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    return _default_tracer
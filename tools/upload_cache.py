@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+from tools.tracing import get_tracer
+
+# Where each sandbox keeps the record of the files it already holds
+MANIFEST_PATH = ".upload_manifest.json"
+
+_digest_cache: Dict[Tuple[str, int, int], str] = {}
+_manifests: Dict[str, "UploadManifest"] = {}
+_manifests_lock = threading.Lock()
+
+
+def file_digest(file_path: str) -> str:
+    """
+    Return the SHA-256 of a file, read in 1 MB blocks.
+
+    Digests are memoized per (path, size, mtime) so unchanged files are hashed
+    once per process.
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if key not in _digest_cache:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        _digest_cache[key] = digest.hexdigest()
+    return _digest_cache[key]
+
+
+class UploadManifest:
+    """
+    Content-addressed record of the files a sandbox already holds.
+
+    Maps sandbox paths to the SHA-256 of their content and the size and
+    modification time the file had sandbox-side once written. The manifest is
+    kept in memory and mirrored to `MANIFEST_PATH` inside the sandbox, so it
+    survives for as long as the sandbox's filesystem does (pooled sandboxes
+    keep their files between leases). A file only counts as held while its
+    sandbox-side size and mtime are unchanged, so a dataset an agent rewrote
+    in an earlier lease is uploaded again.
+    """
+
+    def __init__(self, sandbox: Any):
+        self.sandbox = sandbox
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.stats = {"uploaded": 0, "skipped": 0, "copied": 0}
+        try:
+            self.files = json.loads(sandbox.files.read(MANIFEST_PATH))
+        except Exception:
+            self.files = {}
+
+    def holds(self, path: str, digest: str) -> bool:
+        """Whether `path` in the sandbox still has content `digest`."""
+        entry = self._entry(path)
+        if entry is None or entry["digest"] != digest:
+            return False
+        return self._stat([path]).get(path) == entry["stat"]
+
+    def find(self, digest: str) -> str | None:
+        """Return a sandbox path still holding content `digest`, if any."""
+        candidates = {
+            path: entry
+            for path in self.files
+            if (entry := self._entry(path)) is not None and entry["digest"] == digest
+        }
+        if not candidates:
+            return None
+        stats = self._stat(list(candidates))
+        for path, entry in candidates.items():
+            if stats.get(path) == entry["stat"]:
+                return path
+        return None
+
+    def record(self, path: str, digest: str) -> None:
+        """Remember that `path` now holds `digest` and persist the manifest."""
+        self.files[path] = {"digest": digest, "stat": self._stat([path]).get(path)}
+        self.sandbox.files.write(MANIFEST_PATH, json.dumps(self.files))
+
+    def link(self, source: str, path: str) -> None:
+        """
+        Make `path` a copy of `source` sandbox-side, without any transfer.
+
+        The file is copied rather than hard-linked, so rewriting one of them in
+        place never changes the other.
+        """
+        execution = self.sandbox.run_code(f"""
+def _copy_upload(source, target):
+    import os, shutil
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    shutil.copyfile(source, target)
+
+_copy_upload({source!r}, {path!r})
+del _copy_upload
+""")
+        if getattr(execution, "error", None):
+            raise RuntimeError(f"Failed to copy {source} to {path}: {execution.error}")
+
+    def _entry(self, path: str) -> Dict[str, Any] | None:
+        # Entries without a sandbox-side stat can't be verified
+        entry = self.files.get(path)
+        if not isinstance(entry, dict) or entry.get("stat") is None:
+            return None
+        return entry
+
+    def _stat(self, paths: List[str]) -> Dict[str, List[int] | None]:
+        """
+        Size and mtime (ns) of sandbox files, None for missing ones.
+
+        Returns an empty mapping when the sandbox can't be queried, so nothing
+        is considered held.
+        """
+        try:
+            execution = self.sandbox.run_code(f"""
+def _stat_uploads(paths):
+    import json, os
+    stats = {{}}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stats[path] = [stat.st_size, stat.st_mtime_ns]
+        except OSError:
+            stats[path] = None
+    print(json.dumps(stats))
+
+_stat_uploads({paths!r})
+del _stat_uploads
+""")
+            if getattr(execution, "error", None):
+                return {}
+            stdout = "".join(execution.logs.stdout).strip()
+            return json.loads(stdout.splitlines()[-1]) if stdout else {}
+        except Exception:
+            return {}
+
+
+def _manifest_key(sandbox: Any) -> str:
+    return str(getattr(sandbox, "sandbox_id", id(sandbox)))
+
+
+def get_manifest(sandbox: Any) -> UploadManifest:
+    """Return the (shared) upload manifest of a sandbox."""
+    key = _manifest_key(sandbox)
+    with _manifests_lock:
+        if key not in _manifests:
+            _manifests[key] = UploadManifest(sandbox)
+        return _manifests[key]
+
+
+def forget_manifest(sandbox: Any) -> None:
+    """Drop the manifest of a sandbox that was killed, so it can be collected."""
+    with _manifests_lock:
+        _manifests.pop(_manifest_key(sandbox), None)
+
+
+def cached_upload(sandbox: Any, file_path: str, upload: Callable[[str], str]) -> str:
+    """
+    Upload a file to a sandbox unless the sandbox already holds its content.
+
+    A file the sandbox still holds unchanged is skipped, and content held under
+    another name is copied sandbox-side; otherwise `upload(file_path)` transfers
+    it and the manifest records it. Traced as a "sandbox.upload" span whose
+    `outcome` is skipped, copied or uploaded.
+
+    Args:
+        sandbox: Sandbox to upload to
+        file_path: Path of the file, locally and in the sandbox
+        upload: Transfers the file and returns its sandbox path
+
+    Returns:
+        Path to the file in the sandbox
+    """
+    tracer = get_tracer()
+    with tracer.span("sandbox.upload", path=file_path):
+        digest = file_digest(file_path)
+        manifest = get_manifest(sandbox)
+        with manifest.lock:
+            if manifest.holds(file_path, digest):
+                manifest.stats["skipped"] += 1
+                tracer.annotate(outcome="skipped")
+                print(f"Skipped upload of {file_path} (unchanged in sandbox)")
+                return file_path
+            source = manifest.find(digest)
+            if source is not None:
+                manifest.link(source, file_path)
+                manifest.record(file_path, digest)
+                manifest.stats["copied"] += 1
+                tracer.annotate(outcome="copied", source=source)
+                print(f"Copied {file_path} from identical {source} in sandbox")
+                return file_path
+
+        sandbox_path = upload(file_path)
+        with manifest.lock:
+            manifest.record(file_path, digest)
+            manifest.stats["uploaded"] += 1
+        tracer.annotate(outcome="uploaded")
+        return sandbox_path
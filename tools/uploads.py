@@ -0,0 +1,222 @@
+import gzip
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Callable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+# Size of each chunk read from the source and sent to the sandbox
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+COMPRESSIONS = ("gzip", "zstd")
+
+
+@dataclass
+class UploadStats:
+    """Progress and throughput of a single upload."""
+
+    path: str
+    total_bytes: int | None = None
+    bytes_read: int = 0
+    bytes_sent: int = 0
+    chunks: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+    seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Source bytes uploaded per second."""
+        return self.bytes_read / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def compression_ratio(self) -> float:
+        """Bytes sent over the wire per source byte."""
+        return self.bytes_sent / self.bytes_read if self.bytes_read else 1.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.path}: {self.bytes_read / 1e6:.1f} MB in {self.seconds:.2f}s "
+            f"({self.throughput / 1e6:.1f} MB/s, {self.chunks} chunk(s), "
+            f"sent {self.compression_ratio:.0%} of original size)"
+        )
+
+
+@dataclass
+class UploadBatchSummary:
+    """Aggregate throughput of a multi-file upload."""
+
+    files: int
+    total_bytes: int
+    seconds: float
+    concurrency: int
+    retries: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """Source bytes uploaded per second across all files."""
+        return self.total_bytes / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.files} file(s), {self.total_bytes / 1e6:.1f} MB in {self.seconds:.2f}s "
+            f"({self.throughput / 1e6:.1f} MB/s, concurrency={self.concurrency}, "
+            f"retries={self.retries})"
+        )
+
+
+def with_retries(
+    func: Callable[[], T],
+    retries: int = 2,
+    backoff: float = 0.5,
+    on_retry: Callable[[int, Exception], None] | None = None,
+) -> T:
+    """
+    Call `func`, retrying failures with exponential backoff.
+
+    Args:
+        func: Callable to run
+        retries: Number of retries after the first attempt
+        backoff: Seconds to wait before the first retry; doubled after each retry
+        on_retry: Callback receiving the attempt number and the error before a retry
+
+    Returns:
+        Whatever `func` returns
+    """
+    for attempt in range(retries + 1):
+        try:
+            return func()
+        except Exception as e:
+            if attempt == retries:
+                raise
+            if on_retry:
+                on_retry(attempt + 1, e)
+            time.sleep(backoff * 2**attempt)
+    raise AssertionError("unreachable")
+
+
+def _compressor(compression: str | None) -> Callable[[bytes], bytes]:
+    if compression is None:
+        return lambda chunk: chunk
+    if compression == "gzip":
+        # Each chunk becomes its own gzip member, so chunks decompress independently
+        return lambda chunk: gzip.compress(chunk, compresslevel=6)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(
+                "zstd upload compression requires the 'zstandard' package"
+            ) from e
+        compressor = zstandard.ZstdCompressor(level=3)
+        return compressor.compress
+    raise ValueError(
+        f"Unsupported compression '{compression}'. Choose one of: {', '.join(COMPRESSIONS)}"
+    )
+
+
+def iter_chunks(fileobj: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    """Yield successive chunks of a binary file-like object."""
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        yield chunk
+
+
+def _assemble_code(target: str, parts: List[str], compression: str | None) -> str:
+    """Sandbox-side code concatenating (and decompressing) uploaded chunks."""
+    return f"""
+def _assemble_upload(target, parts, compression):
+    import gzip, os, shutil
+    with open(target, "wb") as out:
+        for part in parts:
+            with open(part, "rb") as raw:
+                if compression == "gzip":
+                    source = gzip.GzipFile(fileobj=raw)
+                elif compression == "zstd":
+                    import zstandard
+                    source = zstandard.ZstdDecompressor().stream_reader(raw)
+                else:
+                    source = raw
+                shutil.copyfileobj(source, out, 1024 * 1024)
+            os.remove(part)
+
+_assemble_upload({target!r}, {parts!r}, {compression!r})
+del _assemble_upload
+"""
+
+
+def stream_upload(
+    sandbox: Any,
+    filename: str,
+    fileobj: BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compression: str | None = None,
+    progress: Callable[[UploadStats], None] | None = None,
+) -> UploadStats:
+    """
+    Upload a file-like object to the sandbox in fixed-size chunks.
+
+    At most two chunks are held in memory at a time. Chunks are optionally
+    compressed locally and decompressed sandbox-side while being reassembled
+    into `filename`. Small uncompressed files are written in a single call.
+
+    Args:
+        sandbox: Sandbox to upload to
+        filename: Destination path in the sandbox
+        fileobj: Binary file-like object to read from
+        chunk_size: Number of source bytes per chunk
+        compression: None, "gzip" or "zstd"
+        progress: Callback receiving the running `UploadStats` after each chunk
+
+    Returns:
+        Statistics of the finished upload
+    """
+    compress = _compressor(compression)
+    stats = UploadStats(path=filename)
+    try:
+        stats.total_bytes = os.fstat(fileobj.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        pass
+
+    chunks = iter_chunks(fileobj, chunk_size)
+    first = next(chunks, b"")
+    second = next(chunks, None)
+    if second is None and compression is None:
+        sandbox.files.write(filename, first)
+        stats.bytes_read = stats.bytes_sent = len(first)
+        stats.chunks = 1
+    else:
+        parts = []
+        pending = [first] + ([second] if second is not None else [])
+        for chunk in _chain(pending, chunks):
+            payload = compress(chunk)
+            part = f"{filename}.part{len(parts):05d}"
+            sandbox.files.write(part, payload)
+            parts.append(part)
+            stats.bytes_read += len(chunk)
+            stats.bytes_sent += len(payload)
+            stats.chunks += 1
+            stats.seconds = time.perf_counter() - stats.started_at
+            if progress:
+                progress(stats)
+        execution = sandbox.run_code(_assemble_code(filename, parts, compression))
+        if getattr(execution, "error", None):
+            raise RuntimeError(
+                f"Failed to assemble {filename} in the sandbox: {execution.error}"
+            )
+
+    stats.seconds = time.perf_counter() - stats.started_at
+    if progress:
+        progress(stats)
+    return stats
+
+
+def _chain(pending: List[bytes], rest: Iterator[bytes]) -> Iterator[bytes]:
+    # Hand out the chunks already read, dropping references as we go
+    while pending:
+        yield pending.pop(0)
+    yield from rest
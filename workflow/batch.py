@@ -0,0 +1,223 @@
+import glob
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, List
+
+from tools.backends import create_sandbox, resolve_backend
+from tools.sandbox_pool import SandboxPool
+from tools.tracing import get_tracer
+from workflow.config import WorkflowConfig
+
+# Dataset formats picked up when a directory is given
+DATASET_EXTENSIONS = (
+    ".csv",
+    ".tsv",
+    ".txt",
+    ".json",
+    ".jsonl",
+    ".ndjson",
+    ".xlsx",
+    ".xls",
+    ".parquet",
+)
+
+# Sandboxes leased by one workflow: the shared one plus one per parallel branch
+SANDBOXES_PER_WORKFLOW = 3
+
+# Files written per dataset, keyed by the agent whose output they hold
+RESULT_FILES = {
+    "Time Series Model Predictor": "time_series_results",
+    "Report Creator": "report_results",
+    "Insight Generator": "insight_results",
+}
+
+SUMMARY_FILE = "batch_summary.json"
+
+
+@dataclass
+class BatchResult:
+    """Outcome of the analysis of one dataset in a batch."""
+
+    dataset: str
+    output_dir: str
+    status: str = "pending"
+    seconds: float = 0.0
+    error: str | None = None
+
+
+def resolve_datasets(source: str) -> List[str]:
+    """
+    Expand a batch source into a sorted list of dataset paths.
+
+    Args:
+        source: A glob pattern, a directory (its dataset files are used) or a
+            manifest file (`.manifest` or `.lst`) listing one path per line.
+            Manifest paths are relative to the manifest; `#` starts a comment.
+
+    Returns:
+        Dataset paths, without duplicates
+    """
+    if os.path.isdir(source):
+        paths = [
+            os.path.join(source, name)
+            for name in os.listdir(source)
+            if name.lower().endswith(DATASET_EXTENSIONS)
+        ]
+    elif os.path.isfile(source) and source.endswith((".manifest", ".lst")):
+        base = os.path.dirname(source)
+        with open(source, encoding="utf-8") as f:
+            lines = [line.split("#", 1)[0].strip() for line in f]
+        paths = [os.path.join(base, line) for line in lines if line]
+        missing = [path for path in paths if not os.path.isfile(path)]
+        if missing:
+            raise ValueError(f"Datasets listed in {source} not found: {missing}")
+    else:
+        paths = [
+            path for path in glob.glob(source, recursive=True) if os.path.isfile(path)
+        ]
+
+    if not paths:
+        raise ValueError(f"No datasets found for {source}")
+    return sorted(set(os.path.normpath(path) for path in paths))
+
+
+def _output_dirs(datasets: List[str], output_dir: str) -> Dict[str, str]:
+    """One output directory per dataset, named after the file (deduplicated)."""
+    dirs: Dict[str, str] = {}
+    used: Dict[str, int] = {}
+    for dataset in datasets:
+        name = os.path.splitext(os.path.basename(dataset))[0]
+        used[name] = used.get(name, 0) + 1
+        if used[name] > 1:
+            name = f"{name}_{used[name]}"
+        dirs[dataset] = os.path.join(output_dir, name)
+    return dirs
+
+
+def write_results(results: Any, output_dir: str) -> None:
+    """Write the outputs of the report, insight and time series tasks."""
+    os.makedirs(output_dir, exist_ok=True)
+    for result in results.tasks_output:
+        filename = RESULT_FILES.get(result.agent)
+        if filename:
+            with open(os.path.join(output_dir, filename), "w") as f:
+                f.write(result.raw)
+
+
+def run_batch(
+    datasets: List[str],
+    output_dir: str = "batch_results",
+    concurrency: int = 2,
+    config: WorkflowConfig | None = None,
+    sandbox_pool: SandboxPool | None = None,
+    trace_path: str | None = None,
+) -> Dict[str, Any]:
+    """
+    Analyze many datasets in one process with at most `concurrency` workflows at once.
+
+    Workflows share a sandbox pool (warmed with one sandbox per worker) and the
+    modules already imported, so only the first dataset pays the cold start.
+    A failing dataset is recorded in the summary and does not stop the batch.
+
+    Args:
+        datasets: Paths of the datasets to analyze
+        output_dir: Directory receiving one subdirectory per dataset and the summary
+        concurrency: Maximum number of workflows running at once
+        config: Options of every workflow; each dataset's report is rendered to
+            its output directory in `config.output_format`, and with a
+            `config.run_dir` its checkpoints go to a subdirectory of it named
+            like the output directory
+        sandbox_pool: Pool to lease sandboxes from (defaults to one sized for `concurrency`)
+        trace_path: Export the traces of all workflows here, as JSONL (.jsonl) or OTLP/JSON
+
+    Returns:
+        The batch summary, also written to `SUMMARY_FILE` in `output_dir`
+    """
+    # Imported here so resolving datasets doesn't pull in CrewAI
+    from workflow.data_analysis_workflow import DataAnalysisWorkflow
+    from workflow.report import REPORT_EXTENSIONS
+
+    config = config or WorkflowConfig()
+    concurrency = max(1, concurrency)
+    backend = resolve_backend(config.backend)
+    if sandbox_pool is None:
+        sandbox_pool = SandboxPool(
+            factory=lambda: create_sandbox(backend),
+            min_size=concurrency,
+            max_size=concurrency * (SANDBOXES_PER_WORKFLOW if config.parallel else 1),
+            idle_ttl=float(os.getenv("SANDBOX_POOL_IDLE_TTL", "300")),
+        )
+        owns_pool = True
+    else:
+        owns_pool = False
+
+    dirs = _output_dirs(datasets, output_dir)
+    results = [BatchResult(dataset, dirs[dataset]) for dataset in datasets]
+    print_lock = threading.Lock()
+
+    def analyze(result: BatchResult) -> BatchResult:
+        started = time.perf_counter()
+        try:
+            workflow = DataAnalysisWorkflow(
+                dataset_path=result.dataset,
+                config=replace(
+                    config,
+                    output_path=os.path.join(
+                        result.output_dir,
+                        "report" + REPORT_EXTENSIONS[config.output_format],
+                    ),
+                    backend=backend,
+                    run_dir=(
+                        os.path.join(
+                            config.run_dir, os.path.basename(result.output_dir)
+                        )
+                        if config.run_dir
+                        else None
+                    ),
+                    # Traces are exported together once the batch is done
+                    trace_path="",
+                ),
+                sandbox_pool=sandbox_pool,
+            )
+            write_results(workflow.run(), result.output_dir)
+            result.status = "succeeded"
+        except Exception as e:
+            result.status = "failed"
+            result.error = f"{type(e).__name__}: {e}"
+        result.seconds = time.perf_counter() - started
+        with print_lock:
+            print(f"[{result.status}] {result.dataset} in {result.seconds:.1f}s")
+        return result
+
+    started = time.perf_counter()
+    try:
+        if owns_pool:
+            sandbox_pool.prewarm()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(analyze, results))
+    finally:
+        if owns_pool:
+            sandbox_pool.close()
+    seconds = time.perf_counter() - started
+
+    succeeded = sum(result.status == "succeeded" for result in results)
+    summary = {
+        "datasets": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "concurrency": concurrency,
+        "seconds": round(seconds, 2),
+        "datasets_per_hour": round(succeeded * 3600 / seconds, 2) if seconds else 0.0,
+        "sandbox_pool": dict(sandbox_pool.stats),
+        "results": [asdict(result) for result in results],
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, SUMMARY_FILE), "w") as f:
+        json.dump(summary, f, indent=2)
+    if trace_path:
+        get_tracer().export(trace_path)
+    return summary
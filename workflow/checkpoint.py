@@ -0,0 +1,142 @@
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict
+
+from tools.upload_cache import file_digest
+
+# Directory holding one run directory per dataset
+DEFAULT_RUNS_DIR = "runs"
+
+MANIFEST_FILE = "checkpoint.json"
+
+
+def default_run_dir(dataset_path: str, runs_dir: str | None = None) -> str:
+    """Run directory of a dataset, named after the file and its content hash."""
+    runs_dir = runs_dir or os.getenv("RUNS_DIR", DEFAULT_RUNS_DIR)
+    name = os.path.splitext(os.path.basename(dataset_path))[0]
+    return os.path.join(runs_dir, f"{name}-{file_digest(dataset_path)[:12]}")
+
+
+class RunCheckpoint:
+    """
+    Per-stage checkpoints of a workflow run.
+
+    After every task the full output is written to `outputs/<task>.md` and,
+    for tasks that ran in the shared kernel, a pickle snapshot of the kernel's
+    user namespace (cleaned dataframe, engineered features, ...) to
+    `kernel/<task>.pkl`. `checkpoint.json` lists the completed tasks, so a
+    resumed run can skip them and rehydrate the kernel.
+    """
+
+    def __init__(self, directory: str, dataset_path: str):
+        """
+        Open (or create) the checkpoints of a run.
+
+        Args:
+            directory: Run directory
+            dataset_path: Dataset of the run; checkpoints of other content are ignored
+        """
+        self.directory = directory
+        self.dataset_digest = file_digest(dataset_path)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "outputs"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "kernel"), exist_ok=True)
+
+        self.manifest: Dict[str, Any] = {
+            "dataset": dataset_path,
+            "dataset_digest": self.dataset_digest,
+            "completed": {},
+        }
+        try:
+            with open(self._path(MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+            if manifest.get("dataset_digest") == self.dataset_digest:
+                self.manifest = manifest
+            else:
+                print(f"Ignoring checkpoints in {directory}: the dataset has changed")
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.directory, *parts)
+
+    @property
+    def completed(self) -> Dict[str, Dict[str, Any]]:
+        """Completed tasks with their checkpoint details, in completion order."""
+        return dict(self.manifest["completed"])
+
+    @property
+    def artifact_dir(self) -> str:
+        """Directory of the run's charts and downloaded files."""
+        return self._path("artifacts")
+
+    def reset(self) -> None:
+        """Forget the checkpoints and artifacts of earlier runs, to start over."""
+        with self._lock:
+            self.manifest["completed"] = {}
+            self._write_manifest()
+            shutil.rmtree(self.artifact_dir, ignore_errors=True)
+
+    def _write_manifest(self) -> None:
+        # Write to a temporary file first so a crash never leaves a torn manifest
+        with open(self._path(MANIFEST_FILE + ".tmp"), "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(self._path(MANIFEST_FILE + ".tmp"), self._path(MANIFEST_FILE))
+
+    def save(
+        self,
+        name: str,
+        output: str,
+        snapshot: bytes | None = None,
+        lineage: str | None = None,
+    ) -> None:
+        """
+        Persist the outcome of a task.
+
+        Args:
+            name: Task name
+            output: Full raw output of the task
+            snapshot: Kernel snapshot taken after the task, if any
+            lineage: Cell lineage of the snapshot
+        """
+        entry: Dict[str, Any] = {
+            "output": os.path.join("outputs", f"{name}.md"),
+            "completed_at": time.time(),
+        }
+        with open(self._path(entry["output"]), "w", encoding="utf-8") as f:
+            f.write(output)
+        if snapshot is not None:
+            entry["snapshot"] = os.path.join("kernel", f"{name}.pkl")
+            entry["lineage"] = lineage
+            with open(self._path(entry["snapshot"]), "wb") as f:
+                f.write(snapshot)
+
+        with self._lock:
+            self.manifest["completed"][name] = entry
+            self._write_manifest()
+
+    def output(self, name: str) -> str:
+        """Saved output of a completed task."""
+        entry = self.manifest["completed"][name]
+        with open(self._path(entry["output"]), encoding="utf-8") as f:
+            return f.read()
+
+    def latest_snapshot(self, order) -> tuple | None:
+        """
+        Most recent kernel snapshot among the completed tasks.
+
+        Args:
+            order: Task names in execution order
+
+        Returns:
+            (task name, snapshot bytes, lineage), or None without any snapshot
+        """
+        for name in reversed(list(order)):
+            entry = self.manifest["completed"].get(name)
+            if entry and entry.get("snapshot"):
+                with open(self._path(entry["snapshot"]), "rb") as f:
+                    return name, f.read(), entry.get("lineage")
+        return None
@@ -0,0 +1,212 @@
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+import pandas as pd
+
+from tools.upload_cache import file_digest
+from workflow.dataset_profiler import (
+    DEFAULT_CHUNKSIZE,
+    infer_kind,
+    read_chunks,
+    to_numeric,
+)
+
+# Local directory holding the converted datasets, reused across runs
+DEFAULT_COLUMNAR_DIR = ".columnar"
+
+# Formats worth converting; Parquet inputs are uploaded as they are
+COLUMNAR_EXTENSIONS = (
+    ".csv",
+    ".tsv",
+    ".txt",
+    ".json",
+    ".jsonl",
+    ".ndjson",
+    ".xlsx",
+    ".xls",
+)
+
+# Kinds whose text values are parsed into numbers or datetimes
+_PARSED = ("currency", "percent", "numeric_text", "datetime")
+
+# Parquet schema metadata key recording the column kinds
+_KINDS_KEY = b"columnar.kinds"
+
+
+@dataclass
+class ColumnarDataset:
+    """A dataset converted to Parquet, with what the conversion did."""
+
+    source: str
+    path: str
+    kinds: Dict[str, str]
+    source_bytes: int
+    parquet_bytes: int
+    seconds: float
+    cached: bool = False
+    # Non-null source values per column that could not be parsed (now null)
+    coerced: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        ratio = self.parquet_bytes / self.source_bytes if self.source_bytes else 1.0
+        parsed = {name: kind for name, kind in self.kinds.items() if kind in _PARSED}
+        return (
+            f"{self.source} -> {self.path}: {self.source_bytes / 1e6:.2f} MB -> "
+            f"{self.parquet_bytes / 1e6:.2f} MB ({ratio:.0%}), "
+            f"{len(parsed)} column(s) parsed"
+            + (" (cached)" if self.cached else f" in {self.seconds:.2f}s")
+        )
+
+    def description(self) -> str:
+        """Task description paragraph telling agents how to load the dataset."""
+        parsed = ", ".join(
+            f"{name} ({kind})" for name, kind in self.kinds.items() if kind in _PARSED
+        )
+        lines = [
+            f"The dataset was converted locally to typed Parquet at {self.path}; "
+            f"load it with pandas.read_parquet('{self.path}').",
+        ]
+        if parsed:
+            lines.append(
+                f"These text columns are already parsed: {parsed}. Currency values "
+                "are plain numbers, percentages are numbers in percent (1.96% is "
+                "1.96) and dates are datetimes."
+            )
+        lines.append(
+            f"The original file {self.source} is available as well if you need "
+            "the raw text; referencing its path uploads it."
+        )
+        return "\n        ".join(lines)
+
+
+def _require_pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Columnar conversion requires the 'pyarrow' package") from e
+    return pyarrow
+
+
+def _typed(chunk: pd.DataFrame, kinds: Dict[str, str], coerced: Dict[str, int]):
+    """Parse a chunk's columns according to their kinds."""
+    typed = {}
+    for name in chunk.columns:
+        series, kind = chunk[name], kinds[str(name)]
+        if kind in ("currency", "percent", "numeric_text"):
+            values = to_numeric(series, kind).astype("float64")
+        elif kind == "datetime" and not pd.api.types.is_datetime64_any_dtype(series):
+            values = pd.to_datetime(series, errors="coerce", format="mixed")
+        elif kind in ("numeric", "boolean"):
+            values = series
+        else:
+            # A fixed string type, so chunks agree even when one is all null
+            values = series.astype("string")
+        lost = int((values.isna() & series.notna()).sum())
+        if lost:
+            coerced[str(name)] = coerced.get(str(name), 0) + lost
+        typed[str(name)] = values
+    return pd.DataFrame(typed)
+
+
+def convert_to_parquet(
+    path: str,
+    output_dir: str | None = None,
+    profile: Dict[str, Any] | None = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    compression: str = "zstd",
+) -> ColumnarDataset:
+    """
+    Convert a CSV, JSON or Excel dataset into compressed, typed Parquet.
+
+    Columns are parsed with the profiler's rules: currency, percentages and
+    numbers stored as text become float64, date-like text becomes datetimes
+    and other text becomes strings. The dataset is converted chunk by chunk,
+    and the result is kept under `output_dir` keyed by the source's content
+    hash, so an unchanged dataset is converted once.
+
+    Args:
+        path: Path to the dataset file
+        output_dir: Directory of converted datasets (defaults to $COLUMNAR_DIR or .columnar)
+        profile: Profile of the dataset from `profile_dataset`, reused for column kinds
+        chunksize: Rows converted per chunk
+        compression: Parquet compression codec
+
+    Returns:
+        The converted dataset
+    """
+    pa = _require_pyarrow()
+    started = time.perf_counter()
+    output_dir = output_dir or os.getenv("COLUMNAR_DIR", DEFAULT_COLUMNAR_DIR)
+    name = os.path.splitext(os.path.basename(path))[0]
+    target = os.path.join(output_dir, f"{name}-{file_digest(path)[:12]}.parquet")
+    kinds = {
+        column["name"]: column["kind"] for column in (profile or {}).get("columns", [])
+    }
+
+    if os.path.exists(target):
+        if not kinds:
+            metadata = pa.parquet.read_schema(target).metadata or {}
+            kinds = json.loads(metadata.get(_KINDS_KEY, b"{}"))
+        return ColumnarDataset(
+            source=path,
+            path=target,
+            kinds=kinds,
+            source_bytes=os.path.getsize(path),
+            parquet_bytes=os.path.getsize(target),
+            seconds=time.perf_counter() - started,
+            cached=True,
+        )
+
+    os.makedirs(output_dir, exist_ok=True)
+    coerced: Dict[str, int] = {}
+    writer = None
+    try:
+        for chunk in read_chunks(path, chunksize):
+            if writer is None:
+                for column in chunk.columns:
+                    if str(column) not in kinds:
+                        sample = chunk[column].dropna().head(1_000)
+                        kinds[str(column)] = infer_kind(sample)
+            frame = _typed(chunk, kinds, coerced)
+            if writer is None:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                table = table.replace_schema_metadata(
+                    {**(table.schema.metadata or {}), _KINDS_KEY: json.dumps(kinds)}
+                )
+                writer = pa.parquet.ParquetWriter(
+                    target + ".tmp", table.schema, compression=compression
+                )
+            else:
+                try:
+                    table = pa.Table.from_pandas(
+                        frame, schema=writer.schema, preserve_index=False
+                    )
+                except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                    raise ValueError(
+                        f"Column types of {path} change between chunks: {e}"
+                    ) from e
+            writer.write_table(table)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(target + ".tmp"):
+            os.remove(target + ".tmp")
+        raise
+    if writer is None:
+        raise ValueError(f"Dataset {path} is empty")
+    writer.close()
+    os.replace(target + ".tmp", target)
+
+    return ColumnarDataset(
+        source=path,
+        path=target,
+        kinds=kinds,
+        source_bytes=os.path.getsize(path),
+        parquet_bytes=os.path.getsize(target),
+        seconds=time.perf_counter() - started,
+        coerced=coerced,
+    )
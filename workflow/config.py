@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass
+class WorkflowConfig:
+    """
+    Options of a `DataAnalysisWorkflow` run.
+
+    Kept free of CrewAI imports, so the CLI can build it before the crew is
+    imported.
+    """
+
+    # Format of the report rendered to `output_path` (markdown, json, html)
+    output_format: str = "markdown"
+    # Render the report here from the tasks' outputs and the charts, section
+    # by section as the tasks finish (None to skip)
+    output_path: str | None = None
+    # Run the Report Creator agent; without it the rendered report is the only
+    # report and the run ends after the last analysis
+    report_llm: bool = True
+    # Code execution backend (e2b or local, defaults to CODE_INTERPRETER_BACKEND)
+    backend: str | None = None
+    # Profile the dataset locally and hand the profile to the first tasks
+    profile: bool = True
+    # Screen the dataset's time series locally for the time series task
+    time_series: bool = True
+    # Upload a typed Parquet copy of the dataset instead of the original, which
+    # is uploaded only if a cell refers to it
+    columnar: bool = False
+    # Run independent tasks concurrently, each branch in its own kernel (leases
+    # up to batch.SANDBOXES_PER_WORKFLOW sandboxes)
+    parallel: bool = False
+    # Memory mode of the crew: off, bounded, local or crewai (True selects
+    # MEMORY_MODE, defaulting to crewai; False is off)
+    memory: bool | str = True
+    # Tokens each task's output may take up in the context of later tasks,
+    # overall or per task name, e.g. context_compaction.DEFAULT_CONTEXT_BUDGET
+    # (None passes outputs verbatim)
+    context_budget: int | Dict[str, int] | None = None
+    # Save each task's output and the kernel state after every stage, so the
+    # run can be resumed
+    checkpoint: bool = False
+    # Directory of the checkpoints (defaults to runs/<dataset>-<hash>)
+    run_dir: str | None = None
+    # Skip the tasks completed in `run_dir` and restore the kernel
+    resume: bool = False
+    # Download the files the agents generate in their sandboxes once the crew
+    # is done
+    download_artifacts: bool = True
+    # Directory of the run's charts and downloaded files (defaults to the
+    # checkpoints' directory, else a new directory under ARTIFACT_DIR or
+    # ./artifacts); used as is, without clearing earlier artifacts
+    artifact_dir: str | None = None
+    # Export the run's trace here, as JSONL (.jsonl) or OTLP/JSON (defaults to
+    # TRACE_PATH)
+    trace_path: str | None = None
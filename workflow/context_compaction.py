@@ -0,0 +1,161 @@
+import ast
+import json
+import re
+import threading
+from typing import Any, Callable, Dict
+
+from tools.result_encoder import estimate_tokens, truncate
+
+# Tokens a task's output may take up in the context of the tasks after it
+DEFAULT_CONTEXT_BUDGET = 1500
+
+# (items kept per list/dict, characters kept per string), tried in order until
+# the digest fits its budget
+_SHRINK_LEVELS = [(20, 800), (10, 400), (6, 200), (4, 120), (2, 80), (1, 40)]
+
+_FENCED_JSON = re.compile(r"```(?:json|python)?\s*(\{.*\})\s*```", re.DOTALL)
+
+
+def parse_structured(raw: str) -> Any:
+    """
+    Extract the dictionary a task was asked to return from its raw output.
+
+    Accepts plain JSON, JSON in a code fence and Python dict literals, with
+    surrounding prose. Returns None when the output isn't structured.
+    """
+    match = _FENCED_JSON.search(raw)
+    if match:
+        candidate = match.group(1)
+    else:
+        start, end = raw.find("{"), raw.rfind("}")
+        if start == -1 or end <= start:
+            return None
+        candidate = raw[start : end + 1]
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            value = parse(candidate)
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            continue
+        if isinstance(value, dict):
+            return value
+    return None
+
+
+def _shrink(value: Any, max_items: int, max_chars: int) -> Any:
+    if isinstance(value, dict):
+        items = list(value.items())
+        shrunk = {
+            str(k): _shrink(v, max_items, max_chars) for k, v in items[:max_items]
+        }
+        if len(items) > max_items:
+            shrunk["..."] = f"{len(items) - max_items} more keys"
+        return shrunk
+    if isinstance(value, (list, tuple)):
+        shrunk = [_shrink(v, max_items, max_chars) for v in value[:max_items]]
+        if len(value) > max_items:
+            shrunk.append(f"... {len(value) - max_items} more items")
+        return shrunk
+    if isinstance(value, str):
+        return value[:max_chars] + "..." if len(value) > max_chars else value
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    return _shrink(str(value), max_items, max_chars)
+
+
+def digest(raw: str, budget: int) -> str:
+    """
+    Distill a task output into at most about `budget` tokens.
+
+    Structured outputs (the dictionaries described in each task's
+    `expected_output`) keep all their top-level keys, with lists, nested
+    dictionaries and strings cut down level by level until the digest fits.
+    Free text keeps its head and tail.
+    """
+    if estimate_tokens(raw) <= budget:
+        return raw
+    structured = parse_structured(raw)
+    if structured is not None:
+        for max_items, max_chars in _SHRINK_LEVELS:
+            # Top-level keys are always kept; only their contents shrink
+            shrunk = {
+                str(key): _shrink(value, max_items, max_chars)
+                for key, value in structured.items()
+            }
+            text = json.dumps(shrunk, separators=(",", ":"), default=str)
+            if estimate_tokens(text) <= budget:
+                return text
+        raw = text
+    return truncate(raw, budget * 4)
+
+
+class ContextCompactor:
+    """
+    Replaces task outputs with bounded digests before downstream tasks read them.
+
+    CrewAI builds a task's context from the `raw` output of its context tasks.
+    The callback installed on each upstream task swaps that output for its
+    digest as soon as the task finishes, keeping the full text aside; `restore`
+    puts the full outputs back once the crew is done, so results and reports
+    still see everything.
+    """
+
+    def __init__(self, budget: int | Dict[str, int] = DEFAULT_CONTEXT_BUDGET):
+        """
+        Initialize the compactor.
+
+        Args:
+            budget: Token budget of every digest, or per task name (tasks missing
+                from the mapping get `DEFAULT_CONTEXT_BUDGET`)
+        """
+        self.budget = budget
+        self.full_outputs: Dict[str, str] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def budget_for(self, name: str) -> int:
+        if isinstance(self.budget, dict):
+            return self.budget.get(name, DEFAULT_CONTEXT_BUDGET)
+        return self.budget
+
+    def callback(
+        self, name: str, chained: Callable[[Any], Any] | None = None
+    ) -> Callable[[Any], None]:
+        """Task callback compacting the output of task `name`."""
+
+        def compact(output: Any) -> None:
+            if chained is not None:
+                chained(output)
+            raw = output.raw or ""
+            compacted = digest(raw, self.budget_for(name))
+            with self._lock:
+                self.full_outputs[name] = raw
+                self.stats[name] = {
+                    "raw_tokens": estimate_tokens(raw),
+                    "digest_tokens": estimate_tokens(compacted),
+                }
+            output.raw = compacted
+
+        return compact
+
+    def install(self, tasks: Dict[str, Any], names) -> None:
+        """Compact the outputs of the tasks in `names`."""
+        for name in names:
+            task = tasks[name]
+            task.callback = self.callback(name, task.callback)
+
+    def restore(self, tasks: Dict[str, Any]) -> None:
+        """Put the full outputs back on the tasks."""
+        with self._lock:
+            for name, raw in self.full_outputs.items():
+                output = getattr(tasks.get(name), "output", None)
+                if output is not None:
+                    output.raw = raw
+
+    def summary(self) -> str:
+        raw = sum(entry["raw_tokens"] for entry in self.stats.values())
+        digested = sum(entry["digest_tokens"] for entry in self.stats.values())
+        saved = 1 - digested / raw if raw else 0.0
+        return (
+            f"context digests of {len(self.stats)} task(s): ~{digested} tokens "
+            f"instead of ~{raw} ({saved:.0%} smaller per downstream task)"
+        )
@@ -0,0 +1,140 @@
+import threading
+from typing import Any, Dict, Tuple
+
+from tools.result_encoder import estimate_tokens
+from tools.tracing import Span, Tracer
+
+# Tasks being traced, by id: (tracer, task name, span of the workflow run)
+_tasks: Dict[int, Tuple[Tracer, str, Span]] = {}
+# Open task and LLM call spans, by id of the task and by (thread, LLM)
+_task_spans: Dict[int, Span] = {}
+_llm_spans: Dict[Tuple[int, int], Tuple[Tracer, Span]] = {}
+_lock = threading.Lock()
+_installed = False
+
+
+def trace_tasks(tracer: Tracer, tasks: Dict[str, Any], parent: Span) -> None:
+    """
+    Record a span for each task, and for the LLM calls made while it runs.
+
+    CrewAI runs tasks (and async tasks in their own threads) internally, so
+    spans are opened and closed from its event bus. Tool spans started while a
+    task runs become children of the task span.
+
+    Args:
+        tracer: Tracer receiving the spans
+        tasks: Mapping of task name to task
+        parent: Span of the workflow run the tasks belong to
+    """
+    _install()
+    with _lock:
+        for name, task in tasks.items():
+            _tasks[id(task)] = (tracer, name, parent)
+
+
+def untrace_tasks(tasks: Dict[str, Any]) -> None:
+    """Stop tracing tasks once their crew has finished."""
+    with _lock:
+        for task in tasks.values():
+            _tasks.pop(id(task), None)
+            _task_spans.pop(id(task), None)
+
+
+def _install() -> None:
+    """Register the event bus handlers, once per process."""
+    global _installed
+    with _lock:
+        if _installed:
+            return
+        _installed = True
+
+    try:
+        from crewai.utilities.events import (
+            LLMCallCompletedEvent,
+            LLMCallFailedEvent,
+            LLMCallStartedEvent,
+            TaskCompletedEvent,
+            TaskFailedEvent,
+            TaskStartedEvent,
+            crewai_event_bus,
+        )
+    except ImportError:
+        print("Task and LLM tracing needs a CrewAI version with the event bus")
+        return
+
+    @crewai_event_bus.on(TaskStartedEvent)
+    def on_task_started(source, event):
+        task = getattr(event, "task", None) or source
+        with _lock:
+            traced = _tasks.get(id(task))
+        if traced is None:
+            return
+        tracer, name, parent = traced
+        span = tracer.start_span(f"task.{name}", parent=parent, task=name)
+        span.set(agent=getattr(getattr(task, "agent", None), "role", None))
+        with _lock:
+            _task_spans[id(task)] = span
+        # The task runs in the thread that emitted the event
+        tracer.push(span)
+
+    def finish_task(source, event, error=None):
+        task = getattr(event, "task", None) or source
+        with _lock:
+            traced = _tasks.get(id(task))
+            span = _task_spans.pop(id(task), None)
+        if traced is None or span is None:
+            return
+        tracer = traced[0]
+        output = getattr(event, "output", None)
+        raw = getattr(output, "raw", None) or ""
+        span.set(
+            output_bytes=len(raw.encode("utf-8")), output_tokens=estimate_tokens(raw)
+        )
+        tracer.pop(span)
+        tracer.end_span(span, error)
+
+    @crewai_event_bus.on(TaskCompletedEvent)
+    def on_task_completed(source, event):
+        finish_task(source, event)
+
+    @crewai_event_bus.on(TaskFailedEvent)
+    def on_task_failed(source, event):
+        finish_task(source, event, str(getattr(event, "error", "failed")))
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def on_llm_started(source, event):
+        # LLM calls belong to whichever traced task runs in this thread
+        with _lock:
+            candidates = [_tasks[key][0] for key in _task_spans if key in _tasks]
+        for tracer in set(candidates):
+            parent = tracer.current()
+            if parent is None:
+                continue
+            messages = getattr(event, "messages", None) or ""
+            span = tracer.start_span(
+                "llm.call",
+                parent=parent,
+                model=getattr(source, "model", None),
+                prompt_tokens=estimate_tokens(str(messages)),
+            )
+            with _lock:
+                _llm_spans[(threading.get_ident(), id(source))] = (tracer, span)
+            return
+
+    def finish_llm(source, error=None, response=None):
+        with _lock:
+            traced = _llm_spans.pop((threading.get_ident(), id(source)), None)
+        if traced is None:
+            return
+        tracer, span = traced
+        if response is not None:
+            span.set(completion_tokens=estimate_tokens(str(response)))
+        tracer.end_span(span, error)
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def on_llm_completed(source, event):
+        finish_llm(source, response=getattr(event, "response", None))
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def on_llm_failed(source, event):
+        finish_llm(source, error=str(getattr(event, "error", "failed")))
@@ -1,6 +1,11 @@
-from typing import Any, Dict
+import asyncio
+import os
+from typing import Any, Dict, List
 
 from crewai import Crew, Process
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from crewai.types.usage_metrics import UsageMetrics
 from crewai_tools import FileReadTool, FileWriterTool
 
 from agents.data_analyzer import create_data_analyzer_agent, create_data_cleanup_agent
@@ -10,6 +15,7 @@ from agents.data_reader import create_data_reader_agent
 from agents.insight_generator import create_insight_generator_agent
 from agents.model_predictor import create_time_series_model_predictor_agent
 from agents.report_creator import create_report_creator_agent
+from agents.routing import ModelRouter
 from tasks.data_tasks import (
     create_data_analysis_task,
     create_data_cleanup_task,
@@ -18,7 +24,46 @@ from tasks.data_tasks import (
     create_report_creation_task,
     create_time_series_prediction_task,
 )
+from tools.artifacts import ArtifactStore, run_artifact_dir
 from tools.code_interpreter_tool import E2BCodeInterpreterTool
+from tools.result_encoder import format_savings
+from tools.sandbox_boot import SandboxBoot
+from tools.sandbox_pool import SandboxPool
+from tools.tracing import get_tracer
+from workflow.checkpoint import RunCheckpoint, default_run_dir
+from workflow.columnar import COLUMNAR_EXTENSIONS, convert_to_parquet
+from workflow.config import WorkflowConfig
+from workflow.context_compaction import ContextCompactor
+from workflow.crew_tracing import trace_tasks, untrace_tasks
+from workflow.dataset_profiler import format_profile, profile_dataset
+from workflow.memory import CrewMemory
+from workflow.report import (
+    REPORT_SECTIONS,
+    ReportRenderer,
+    charts_section,
+    overview_section,
+    task_section,
+    time_series_section,
+)
+from workflow.scheduler import concurrent_tasks, plan_stages
+from workflow.time_series import detect_time_series, format_time_series
+
+# Upstream tasks each task reads from. Insight generation and time series
+# prediction only need the cleaned and analyzed data, so they run in parallel.
+TASK_DEPENDENCIES: Dict[str, List[str]] = {
+    "data_reading": [],
+    "data_cleanup": ["data_reading"],
+    "data_analysis": ["data_reading", "data_cleanup"],
+    "insight_generation": ["data_reading", "data_cleanup", "data_analysis"],
+    "time_series_prediction": ["data_reading", "data_cleanup", "data_analysis"],
+    "report_creation": [
+        "data_reading",
+        "data_cleanup",
+        "data_analysis",
+        "insight_generation",
+        "time_series_prediction",
+    ],
+}
 
 
 class DataAnalysisWorkflow:
@@ -27,42 +72,196 @@ class DataAnalysisWorkflow:
     using a crew of specialized AI agents.
     """
 
-    def __init__(self, dataset_path: str, output_format: str = "markdown"):
+    def __init__(
+        self,
+        dataset_path: str,
+        config: WorkflowConfig | None = None,
+        sandbox_pool: SandboxPool | None = None,
+        sandbox_boot: SandboxBoot | None = None,
+        llm: Any = None,
+    ):
         """
         Initialize the data analysis workflow.
 
         Args:
             dataset_path: Path to the dataset file to analyze
-            output_format: Format for the final report (markdown, json, html)
+            config: Options of the run (defaults to `WorkflowConfig()`)
+            sandbox_pool: Pool to lease sandboxes from (defaults to the backend's shared pool)
+            sandbox_boot: Sandbox booted in the background for this run, used
+                instead of leasing one from `sandbox_pool`
+            llm: LLM used by every agent, or a `ModelRouter` picking one per agent
+                (defaults to the LLM_ROUTES routing, else LLM_MODEL)
         """
+        config = config or WorkflowConfig()
+        self.config = config
         self.dataset_path = dataset_path
-        self.output_format = output_format
+        self.output_format = config.output_format
+        self.output_path = config.output_path
+        self.report_llm = config.report_llm
+        # Without the Report Creator the crew ends after the last analysis, so
+        # the report task is left out before the stages are planned
+        self.dependencies = {
+            name: deps
+            for name, deps in TASK_DEPENDENCIES.items()
+            if self.report_llm or name != "report_creation"
+        }
+        self.report: ReportRenderer | None = None
+        self.compactor = (
+            ContextCompactor(config.context_budget)
+            if config.context_budget is not None
+            else None
+        )
+        self.resume = config.resume
+        self.skipped: set = set()
+        self.run_checkpoint = None
+        if config.checkpoint or config.resume:
+            try:
+                self.run_checkpoint = RunCheckpoint(
+                    config.run_dir or default_run_dir(dataset_path), dataset_path
+                )
+                if not config.resume:
+                    self.run_checkpoint.reset()
+            except OSError as e:
+                print(f"Skipping checkpoints: {e}")
+        self.tasks: Dict[str, Any] = {}
+        self.download_artifacts = config.download_artifacts
+        self.downloaded: Dict[str, str] = {}
 
-        # Initialize the code interpreter tool
-        self.code_interpreter = E2BCodeInterpreterTool(
-            result_as_answer=False, dataset_path=self.dataset_path
+        # Everything the workflow does is recorded under one trace
+        self.tracer = get_tracer()
+        self.trace_path = (
+            config.trace_path
+            if config.trace_path is not None
+            else os.getenv("TRACE_PATH")
         )
-        self.file_read_tool = FileReadTool()
-        self.file_write_tool = FileWriterTool()
+        self.span = self.tracer.start_span("workflow", dataset=dataset_path)
+
+        # The local index lives with the checkpoints, so a resumed run keeps it
+        memory_dir = (
+            os.path.join(self.run_checkpoint.directory, "memory")
+            if self.run_checkpoint is not None
+            else None
+        )
+        try:
+            self.memory = CrewMemory(
+                config.memory,
+                self.tracer,
+                directory=memory_dir,
+                reset=not config.resume,
+            )
+        except ImportError as e:
+            print(f"Using bounded memory instead: {e}")
+            self.memory = CrewMemory("bounded", self.tracer)
+
+        with self.tracer.attach(self.span):
+            # Profile the dataset up front so agents don't spend turns discovering it
+            self.profile = None
+            if config.profile:
+                try:
+                    with self.tracer.span("dataset.profile"):
+                        self.profile = profile_dataset(self.dataset_path)
+                except Exception as e:
+                    print(f"Skipping dataset profiling: {e}")
+
+            # Screen the time series up front so the time series agent doesn't
+            # hunt for date columns and recompute the tests cell by cell
+            self.time_series = None
+            if config.time_series:
+                try:
+                    with self.tracer.span("dataset.time_series") as span:
+                        self.time_series = detect_time_series(
+                            self.dataset_path, profile=self.profile
+                        )
+                        span.set(series=self.time_series["series_screened"])
+                except Exception as e:
+                    print(f"Skipping time series screening: {e}")
+
+            # Convert the dataset to typed Parquet so the sandbox loads it faster
+            # and agents don't re-parse currency, percentages and dates
+            self.columnar = None
+            extension = os.path.splitext(self.dataset_path)[1].lower()
+            if config.columnar and extension in COLUMNAR_EXTENSIONS:
+                try:
+                    with self.tracer.span("dataset.columnar") as span:
+                        self.columnar = convert_to_parquet(
+                            self.dataset_path, profile=self.profile
+                        )
+                        span.set(
+                            source_bytes=self.columnar.source_bytes,
+                            parquet_bytes=self.columnar.parquet_bytes,
+                            cached=self.columnar.cached,
+                        )
+                    print(f"Converted {self.columnar.summary()}")
+                except Exception as e:
+                    print(f"Uploading the original dataset, conversion failed: {e}")
+
+            # Initialize the code interpreter tool
+            sandbox = None
+            backend = config.backend
+            if sandbox_boot is not None:
+                with self.tracer.span("sandbox.boot_wait", ready=sandbox_boot.done):
+                    sandbox = sandbox_boot.result()
+                sandbox_pool = sandbox_boot.pool
+                backend = sandbox_boot.backend
+            self.code_interpreter = E2BCodeInterpreterTool(
+                result_as_answer=False,
+                dataset_path=(
+                    self.columnar.path if self.columnar else self.dataset_path
+                ),
+                sandbox_pool=sandbox_pool,
+                backend=backend,
+                sandbox=sandbox,
+                # Charts and downloaded files are kept with the run's checkpoints,
+                # else in a directory of their own
+                artifact_dir=config.artifact_dir
+                or (
+                    self.run_checkpoint.artifact_dir
+                    if self.run_checkpoint is not None
+                    else run_artifact_dir(
+                        os.path.splitext(os.path.basename(self.dataset_path))[0]
+                    )
+                ),
+                on_demand_files=[self.dataset_path] if self.columnar else None,
+            )
+            self.file_read_tool = FileReadTool()
+            self.file_write_tool = FileWriterTool()
+
+            # Tasks share one kernel until the crew is created; those that end
+            # up running concurrently then get a fork of it
+            self.stages = plan_stages(self.dependencies)
+            self.concurrent = (
+                concurrent_tasks(self.stages) if config.parallel else set()
+            )
+            self.interpreters = {
+                name: self.code_interpreter for name in self.dependencies
+            }
+
+        # Route each agent to its own model when a routing is configured
+        if llm is None:
+            try:
+                llm = ModelRouter.from_env()
+            except (OSError, ValueError) as e:
+                print(f"Ignoring the model routing: {e}")
+        self.router = llm if isinstance(llm, ModelRouter) else None
 
         # Create specialized agents
         self.data_reader = create_data_reader_agent(
-            self.file_read_tool, self.code_interpreter
+            self.file_read_tool, self.code_interpreter, llm=llm
         )
         self.data_cleanup = create_data_cleanup_agent(
-            self.file_read_tool, self.code_interpreter
+            self.file_read_tool, self.code_interpreter, llm=llm
         )
         self.data_analyzer = create_data_analyzer_agent(
-            self.file_read_tool, self.code_interpreter
+            self.file_read_tool, self.code_interpreter, llm=llm
         )
         self.insight_generator = create_insight_generator_agent(
-            self.file_read_tool, self.code_interpreter
+            self.file_read_tool, self.code_interpreter, llm=llm
         )
         self.model_predictor = create_time_series_model_predictor_agent(
-            self.file_read_tool, self.code_interpreter
+            self.file_read_tool, self.code_interpreter, llm=llm
         )
         self.report_creator = create_report_creator_agent(
-            self.file_read_tool, self.file_write_tool, self.code_interpreter
+            self.file_read_tool, self.file_write_tool, self.code_interpreter, llm=llm
         )
 
     def run(self) -> Dict[str, Any]:
@@ -73,63 +272,455 @@ class DataAnalysisWorkflow:
             The final report and analysis results
         """
         try:
-            data_reading_task = create_data_reading_task(
-                agent=self.data_reader, dataset_path=self.dataset_path
+            crew = self._create_crew()
+            if crew is None:
+                return self._resumed_result(None)
+            with self.tracer.attach(self.span):
+                result = crew.kickoff()
+            self._trace_usage(crew)
+            return self._resumed_result(result)
+
+        finally:
+            self._restore_outputs()
+            self._report_tool_output()
+            self._report_memory()
+            self._report_models()
+            self._download_artifacts()
+            self._finish_report()
+            # Return the sandboxes to the pool for the next run
+            for interpreter in self._unique_interpreters():
+                interpreter.close()
+            self._finish_trace()
+
+    @classmethod
+    async def acreate(cls, *args, **kwargs) -> "DataAnalysisWorkflow":
+        """
+        Create a workflow from an event loop.
+
+        Profiling, leasing the sandbox and uploading the dataset block, so they
+        run in a worker thread. Takes the same arguments as the constructor.
+        """
+        return await asyncio.to_thread(cls, *args, **kwargs)
+
+    async def arun(self) -> Dict[str, Any]:
+        """
+        Execute the full data analysis workflow from an event loop.
+
+        Several workflows can be awaited together (e.g. with `asyncio.gather`)
+        to analyze many datasets in one process.
+
+        Returns:
+            The final report and analysis results
+        """
+        try:
+            crew = self._create_crew()
+            if crew is None:
+                return self._resumed_result(None)
+            result = await crew.kickoff_async()
+            self._trace_usage(crew)
+            return self._resumed_result(result)
+
+        finally:
+            self._restore_outputs()
+            self._report_tool_output()
+            self._report_memory()
+            self._report_models()
+            await asyncio.to_thread(self._download_artifacts)
+            self._finish_report()
+            await asyncio.gather(
+                *(interpreter.aclose() for interpreter in self._unique_interpreters())
             )
-            data_cleanup_task = create_data_cleanup_task(
-                agent=self.data_cleanup, context=[data_reading_task]
+            self._finish_trace()
+
+    @property
+    def artifacts(self) -> ArtifactStore:
+        """Local store of the run's charts, HTML and downloaded files."""
+        return self.code_interpreter.result_encoder.artifacts
+
+    def _download_artifacts(self) -> None:
+        """Fetch the files generated in every sandbox, one archive per sandbox."""
+        if not self.download_artifacts:
+            return
+        for interpreter in self._unique_interpreters():
+            try:
+                self.downloaded.update(interpreter.download_files())
+            except Exception as e:
+                print(f"Error downloading sandbox files: {e}")
+        if self.downloaded:
+            print(
+                f"Downloaded {len(self.downloaded)} generated file(s) to "
+                f"{self.artifacts.directory}"
             )
-            data_analysis_task = create_data_analysis_task(
-                agent=self.data_analyzer, context=[data_reading_task, data_cleanup_task]
+
+    def _unique_interpreters(self) -> List[E2BCodeInterpreterTool]:
+        return list({id(i): i for i in self.interpreters.values()}.values())
+
+    def _restore_outputs(self) -> None:
+        """Swap the context digests back for the full task outputs."""
+        if self.compactor is not None and self.compactor.stats:
+            self.compactor.restore(self.tasks)
+            print(f"Context compaction: {self.compactor.summary()}")
+
+    def _start_report(self) -> None:
+        """Open the rendered report and write the sections known up front."""
+        try:
+            self.report = ReportRenderer(self.output_path, self.output_format)
+        except (OSError, ValueError) as e:
+            print(f"Skipping the rendered report: {e}")
+            return
+        self.report.add("overview", overview_section(self.profile, self.dataset_path))
+        if not self.report_llm:
+            self.report.add("report_creation", None)
+
+    def _report_section(self, name: str, raw: str):
+        if name == "time_series_prediction":
+            return time_series_section(self.time_series, raw)
+        return task_section(raw)
+
+    def _report_callback(self, name: str, chained=None):
+        """Task callback rendering the task's section of the report."""
+
+        def render(output: TaskOutput) -> None:
+            if chained is not None:
+                chained(output)
+            try:
+                self.report.add(name, self._report_section(name, output.raw))
+            except Exception as e:
+                print(f"Failed to render the report section of task {name}: {e}")
+
+        return render
+
+    def _finish_report(self) -> None:
+        """Add the charts and complete the rendered report."""
+        if self.report is None or self.report.closed:
+            return
+        try:
+            self.report.add("charts", charts_section(self.artifacts.charts()))
+        except Exception as e:
+            print(f"Leaving the charts out of the report: {e}")
+        self.report.close()
+        print(
+            f"Report rendered to {self.report.path} ({self.output_format}, "
+            f"{len(self.report.written)} section(s))"
+        )
+
+    def _report_tool_output(self) -> None:
+        """Print the tokens the compact tool output saved over the run."""
+        stats = {"calls": 0, "verbose_tokens": 0, "compact_tokens": 0}
+        for interpreter in self._unique_interpreters():
+            for name, value in interpreter.result_encoder.stats.items():
+                stats[name] += value
+        if not stats["calls"]:
+            return
+        self.span.set(
+            tool_calls=stats["calls"],
+            tool_output_tokens=stats["compact_tokens"],
+            tool_output_verbose_tokens=stats["verbose_tokens"],
+        )
+        print(f"Tool output: {format_savings(stats)}")
+
+    def _report_memory(self) -> None:
+        """Print the time and storage each task spent on the crew's memory."""
+        if not self.memory.enabled:
+            return
+        totals = self.memory.stats.totals()
+        nbytes = self.memory.nbytes
+        self.span.set(
+            memory_mode=self.memory.mode,
+            memory_seconds=round(totals["seconds"], 3),
+            memory_bytes=nbytes if nbytes is not None else totals["bytes"],
+        )
+        print(
+            f"Memory ({self.memory.mode}): {totals['seconds']:.2f}s, "
+            f"{totals['saves']} save(s), {totals['searches']} search(es)"
+            + (f", {nbytes / 1e3:.1f} KB held" if nbytes is not None else "")
+        )
+        for line in self.memory.summary():
+            print(f"  {line}")
+
+    def _report_models(self) -> None:
+        """Print the models each stage's agent used under the routing."""
+        if self.router is None or not self.tasks:
+            return
+        print("Model usage per stage:")
+        for line in self.router.report(
+            {name: task.agent.role for name, task in self.tasks.items()}
+        ):
+            print(f"  {line}")
+
+    def _trace_usage(self, crew: Crew) -> None:
+        usage = getattr(crew, "usage_metrics", None)
+        if usage is not None:
+            self.span.set(
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                total_tokens=usage.total_tokens,
+                llm_requests=usage.successful_requests,
             )
-            insight_generation_task = create_insight_generation_task(
-                agent=self.insight_generator,
-                context=[data_reading_task, data_cleanup_task, data_analysis_task],
+
+    def _finish_trace(self) -> None:
+        """End the workflow span, print where the time went and export the trace."""
+        untrace_tasks(self.tasks)
+        if self.span.end_ns is not None:
+            return
+        self.tracer.end_span(self.span)
+        summary = self.tracer.summary(self.span.trace_id)
+        print(f"Trace summary ({self.span.seconds:.1f}s total):")
+        for name, entry in summary.items():
+            print(
+                f"  {name}: {entry['seconds']}s over {entry['count']} call(s)"
+                + (f", {entry['errors']} error(s)" if entry["errors"] else "")
             )
-            time_series_prediction_task = create_time_series_prediction_task(
-                agent=self.model_predictor,
-                context=[
-                    data_reading_task,
-                    data_cleanup_task,
-                    data_analysis_task,
-                    insight_generation_task,
-                ],
+        if self.trace_path:
+            self.tracer.export(self.trace_path, self.span.trace_id)
+            print(f"Trace saved to {self.trace_path}")
+
+    def _create_crew(self) -> Crew | None:
+        """Create the crew of the tasks left to run (None when all are done)."""
+        completed = set()
+        if self.resume and self.run_checkpoint is not None:
+            completed = set(self.run_checkpoint.completed) & set(self.dependencies)
+        concurrent = self._concurrent_tasks(completed)
+        tasks = self._create_tasks(concurrent)
+        self._fork_interpreters(tasks, concurrent)
+        self.tasks = tasks
+        self.skipped = completed
+        pending = [name for name in tasks if name not in completed]
+        upstream = {dep for deps in self.dependencies.values() for dep in deps}
+        trace_tasks(self.tracer, tasks, self.span)
+
+        # The rendered report is written section by section as tasks finish;
+        # installed first, its callback sees the full outputs
+        if self.output_path:
+            self._start_report()
+        if self.report is not None:
+            sections = {key for key, _ in REPORT_SECTIONS}
+            for name in pending:
+                if name in sections:
+                    tasks[name].callback = self._report_callback(
+                        name, tasks[name].callback
+                    )
+            for name in completed:
+                if name in sections:
+                    self.report.add(
+                        name,
+                        self._report_section(name, self.run_checkpoint.output(name)),
+                    )
+
+        # Later tasks are told about the frames registered in the kernel
+        for name in pending:
+            if name in upstream:
+                tasks[name].callback = self._frames_callback(name, tasks[name].callback)
+
+        if self.run_checkpoint is not None:
+            for name in pending:
+                tasks[name].callback = self._checkpoint_callback(
+                    name, name in upstream, tasks[name].callback
+                )
+
+        # Downstream tasks read bounded digests of their upstream outputs
+        if self.compactor is not None:
+            self.compactor.install(
+                tasks, [name for name in pending if name in upstream]
             )
-            report_creation_task = create_report_creation_task(
-                agent=self.report_creator,
-                context=[
-                    data_reading_task,
-                    data_cleanup_task,
-                    data_analysis_task,
-                    insight_generation_task,
-                    time_series_prediction_task,
-                ],
+
+        if completed:
+            self._restore_checkpoint(tasks, completed, upstream)
+        if not pending:
+            return None
+
+        # Create the crew. The sequential process still starts consecutive
+        # async tasks together and joins them at the next synchronous task.
+        crew = Crew(
+            agents=[
+                self.data_reader,
+                self.data_cleanup,
+                self.data_analyzer,
+                self.insight_generator,
+                self.model_predictor,
+                self.report_creator,
+            ],
+            tasks=[tasks[name] for name in pending],
+            verbose=True,
+            process=Process.sequential,
+            **self.memory.crew_kwargs(),
+        )
+        self.memory.install(crew)
+        return crew
+
+    def _frames_callback(self, name: str, chained=None):
+        """Task callback advertising the frames the task left in its kernel."""
+        interpreter = self.interpreters[name]
+
+        def refresh(output: TaskOutput) -> None:
+            if chained is not None:
+                chained(output)
+            self._advertise_frames(interpreter)
+
+        return refresh
+
+    def _advertise_frames(self, interpreter: E2BCodeInterpreterTool) -> None:
+        frames = interpreter.refresh_frames()
+        # Forks start from the shared kernel's state, frames included
+        if interpreter is self.code_interpreter:
+            for other in self._unique_interpreters():
+                if other is not interpreter:
+                    other.advertise_frames(frames)
+
+    def _checkpoint_callback(self, name: str, snapshot_kernel: bool, chained=None):
+        """
+        Task callback saving the task's output, and the state of the shared
+        kernel when later tasks build on it, to the run directory.
+        """
+        interpreter = self.interpreters[name]
+        snapshot_kernel = snapshot_kernel and interpreter is self.code_interpreter
+
+        def save(output: TaskOutput) -> None:
+            if chained is not None:
+                chained(output)
+            try:
+                snapshot = lineage = None
+                if snapshot_kernel:
+                    snapshot = interpreter.snapshot_state()
+                    lineage = interpreter.lineage
+                self.run_checkpoint.save(name, output.raw or "", snapshot, lineage)
+            except Exception as e:
+                print(f"Failed to checkpoint task {name}: {e}")
+
+        return save
+
+    def _restore_checkpoint(
+        self, tasks: Dict[str, Any], completed: set, upstream: set
+    ) -> None:
+        """Hand the saved outputs to the completed tasks and rehydrate the kernel."""
+        for name in completed:
+            task = tasks[name]
+            task.output = TaskOutput(
+                description=task.description,
+                expected_output=task.expected_output,
+                agent=task.agent.role,
+                raw=self.run_checkpoint.output(name),
             )
+            if self.compactor is not None and name in upstream:
+                self.compactor.callback(name)(task.output)
 
-            # Create the crew
-            crew = Crew(
-                agents=[
-                    self.data_reader,
-                    self.data_cleanup,
-                    self.data_analyzer,
-                    self.insight_generator,
-                    self.model_predictor,
-                    self.report_creator,
-                ],
-                tasks=[
-                    data_reading_task,
-                    data_cleanup_task,
-                    data_analysis_task,
-                    insight_generation_task,
-                    time_series_prediction_task,
-                    report_creation_task,
-                ],
-                verbose=True,
-                memory=True,
-                process=Process.sequential,  # Tasks must be executed in sequence
+        latest = self.run_checkpoint.latest_snapshot(tasks)
+        if latest is not None:
+            name, snapshot, lineage = latest
+            self.code_interpreter.restore_state(snapshot, lineage)
+            self._advertise_frames(self.code_interpreter)
+            print(f"Restored the kernel state saved after task {name}")
+        print(
+            f"Resuming from {self.run_checkpoint.directory}: "
+            f"skipping {', '.join(name for name in tasks if name in completed)}"
+        )
+
+    def _resumed_result(self, result: CrewOutput | None) -> CrewOutput:
+        """
+        Add the outputs of the tasks skipped on resume to the crew's result, or
+        build the result when every task had completed already.
+        """
+        if not self.skipped:
+            return result
+        outputs = [task.output for task in self.tasks.values() if task.output]
+        if result is None:
+            return CrewOutput(
+                raw=outputs[-1].raw, tasks_output=outputs, token_usage=UsageMetrics()
             )
-            return crew.kickoff()
+        result.tasks_output = outputs
+        return result
 
-        finally:
-            # Make sure to clean up resources
-            self.code_interpreter.close()
+    def _concurrent_tasks(self, completed: set = frozenset()) -> set:
+        """
+        Tasks of this run to mark as async, each getting its own kernel.
+
+        Args:
+            completed: Tasks already completed in a resumed run; only the others
+                are considered when deciding which tasks run concurrently
+        """
+        pending = {
+            name: [dep for dep in deps if dep not in completed]
+            for name, deps in self.dependencies.items()
+            if name not in completed
+        }
+        if not pending:
+            return set()
+        return concurrent_tasks(plan_stages(pending)) & self.concurrent
+
+    def _fork_interpreters(self, tasks: Dict[str, Any], concurrent: set) -> None:
+        """
+        Give each concurrent task a fork of the shared kernel.
+
+        Forks lease a sandbox and upload the dataset, so they are only created
+        for tasks that actually run concurrently in this run.
+        """
+        for name in concurrent:
+            if self.interpreters[name] is not self.code_interpreter:
+                continue
+            with self.tracer.attach(self.span):
+                fork = self.code_interpreter.fork()
+            self.interpreters[name] = fork
+            task = tasks[name]
+            for owner in (task.agent, task):
+                if owner.tools:
+                    owner.tools = [
+                        fork if tool is self.code_interpreter else tool
+                        for tool in owner.tools
+                    ]
+
+    def _create_tasks(self, concurrent: set = frozenset()) -> Dict[str, Any]:
+        """
+        Create the tasks in stage order, wiring each task's context from
+        `dependencies` and marking the `concurrent` tasks as async.
+
+        Args:
+            concurrent: Tasks to run with `async_execution=True`
+
+        Returns:
+            Mapping of task name to task, in execution order
+        """
+        profile = format_profile(self.profile) if self.profile else None
+        factories = {
+            "data_reading": lambda context, async_execution: create_data_reading_task(
+                agent=self.data_reader,
+                dataset_path=self.columnar.path if self.columnar else self.dataset_path,
+                profile=profile,
+                columnar=self.columnar.description() if self.columnar else None,
+            ),
+            "data_cleanup": lambda context, async_execution: create_data_cleanup_task(
+                agent=self.data_cleanup,
+                context=context,
+                profile=profile,
+                async_execution=async_execution,
+            ),
+            "data_analysis": lambda context, async_execution: create_data_analysis_task(
+                agent=self.data_analyzer,
+                context=context,
+                async_execution=async_execution,
+            ),
+            "insight_generation": lambda context, async_execution: create_insight_generation_task(
+                agent=self.insight_generator,
+                context=context,
+                async_execution=async_execution,
+            ),
+            "time_series_prediction": lambda context, async_execution: create_time_series_prediction_task(
+                agent=self.model_predictor,
+                context=context,
+                async_execution=async_execution,
+                time_series=(
+                    format_time_series(self.time_series) if self.time_series else None
+                ),
+            ),
+            "report_creation": lambda context, async_execution: create_report_creation_task(
+                agent=self.report_creator,
+                context=context,
+                output_format=self.output_format,
+            ),
+        }
+
+        tasks: Dict[str, Any] = {}
+        for stage in self.stages:
+            for name in stage:
+                context = [tasks[dep] for dep in self.dependencies[name]] or None
+                tasks[name] = factories[name](context, name in concurrent)
+        return tasks
@@ -0,0 +1,250 @@
+import json
+import os
+from typing import Any, Dict, Iterator
+
+import numpy as np
+import pandas as pd
+
+# Rows read per chunk, so memory use doesn't grow with the dataset
+DEFAULT_CHUNKSIZE = 100_000
+
+# Distinct values tracked per column before it is considered high-cardinality
+MAX_TRACKED_VALUES = 1_000
+
+# Row hashes held for duplicate detection; past this, rows are sampled by hash
+MAX_TRACKED_ROWS = 1_000_000
+
+# Share of non-null values that must parse for a text column to be reinterpreted
+PARSE_THRESHOLD = 0.95
+
+_NUMERIC_STRING = r"^\s*[-+]?[$€£]?\s*[-+]?[\d,]*\.?\d+\s*%?\s*$"
+
+
+def read_chunks(path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Yield the dataset in chunks, whatever its format."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".csv", ".tsv"):
+        sep = "\t" if extension == ".tsv" else ","
+        yield from pd.read_csv(path, sep=sep, chunksize=chunksize)
+    elif extension == ".txt":
+        # Unknown delimiter: let the python engine sniff it
+        yield from pd.read_csv(path, sep=None, engine="python", chunksize=chunksize)
+    elif extension in (".jsonl", ".ndjson"):
+        yield from pd.read_json(path, lines=True, chunksize=chunksize)
+    elif extension == ".json":
+        yield pd.read_json(path)
+    elif extension in (".xlsx", ".xls"):
+        yield pd.read_excel(path)
+    elif extension == ".parquet":
+        yield pd.read_parquet(path)
+    else:
+        raise ValueError(f"Unsupported dataset format for profiling: {extension}")
+
+
+def infer_kind(sample: pd.Series) -> str:
+    """Classify a column from a sample of its non-null values."""
+    if pd.api.types.is_bool_dtype(sample):
+        return "boolean"
+    if pd.api.types.is_numeric_dtype(sample):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(sample):
+        return "datetime"
+    values = sample.dropna().astype(str)
+    if values.empty:
+        return "text"
+    if values.str.match(_NUMERIC_STRING).mean() >= PARSE_THRESHOLD:
+        if values.str.contains("%", regex=False).mean() >= PARSE_THRESHOLD:
+            return "percent"
+        if values.str.contains(r"[$€£]").mean() >= PARSE_THRESHOLD:
+            return "currency"
+        return "numeric_text"
+    parsed = pd.to_datetime(values, errors="coerce", format="mixed")
+    if parsed.notna().mean() >= PARSE_THRESHOLD:
+        return "datetime"
+    return "categorical"
+
+
+def to_numeric(series: pd.Series, kind: str) -> pd.Series:
+    """Vectorized conversion of a column to numbers according to its kind."""
+    if kind in ("numeric", "boolean"):
+        return pd.to_numeric(series, errors="coerce")
+    if kind in ("percent", "currency", "numeric_text"):
+        cleaned = series.astype(str).str.replace(r"[\s$€£,%]", "", regex=True)
+        return pd.to_numeric(cleaned, errors="coerce")
+    return pd.Series(np.nan, index=series.index)
+
+
+class _DuplicateCounter:
+    """
+    Counts duplicate rows from their hashes in bounded memory.
+
+    Every distinct row hash is held (with its number of occurrences) until
+    there are more than `max_rows`; from then on only hashes whose low `level`
+    bits are zero are kept, halving the sample each time it fills up again.
+    Identical rows share a hash, so they are sampled together and the
+    duplicates within the sample, scaled by 2**level, estimate the total.
+    """
+
+    def __init__(self, max_rows: int = MAX_TRACKED_ROWS):
+        self.max_rows = max_rows
+        self.level = 0
+        self.hashes = np.empty(0, dtype="uint64")
+        self.counts = np.empty(0, dtype="int64")
+
+    def update(self, hashes: np.ndarray) -> None:
+        hashes = hashes[self._sampled(hashes)]
+        merged, inverse = np.unique(
+            np.concatenate([self.hashes, hashes]), return_inverse=True
+        )
+        weights = np.concatenate([self.counts, np.ones(len(hashes), dtype="int64")])
+        self.hashes = merged
+        self.counts = np.bincount(inverse, weights=weights).astype("int64")
+        while len(self.hashes) > self.max_rows:
+            self.level += 1
+            keep = self._sampled(self.hashes)
+            self.hashes, self.counts = self.hashes[keep], self.counts[keep]
+
+    def _sampled(self, hashes: np.ndarray) -> np.ndarray:
+        return hashes & np.uint64((1 << self.level) - 1) == 0
+
+    @property
+    def estimated(self) -> bool:
+        return self.level > 0
+
+    @property
+    def duplicates(self) -> int:
+        return int((self.counts - 1).sum()) << self.level
+
+
+class _ColumnAccumulator:
+    """Running statistics of one column, merged chunk by chunk."""
+
+    def __init__(self, name: str, dtype: str, kind: str):
+        self.name = name
+        self.dtype = dtype
+        self.kind = kind
+        self.missing = 0
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.minimum: Any = None
+        self.maximum: Any = None
+        self.values: Dict[Any, int] | None = {}
+
+    def update(self, series: pd.Series) -> None:
+        self.missing += int(series.isna().sum())
+        if self.kind == "datetime":
+            parsed = pd.to_datetime(series, errors="coerce", format="mixed").dropna()
+            if not parsed.empty:
+                low, high = parsed.min(), parsed.max()
+                self.minimum = low if self.minimum is None else min(self.minimum, low)
+                self.maximum = high if self.maximum is None else max(self.maximum, high)
+        numbers = to_numeric(series, self.kind).dropna()
+        if not numbers.empty:
+            values = numbers.to_numpy(dtype="float64")
+            self.count += values.size
+            self.total += float(values.sum())
+            self.total_sq += float(np.square(values).sum())
+            low, high = float(values.min()), float(values.max())
+            self.minimum = low if self.minimum is None else min(self.minimum, low)
+            self.maximum = high if self.maximum is None else max(self.maximum, high)
+        if self.values is not None:
+            counts = series.value_counts(dropna=True)
+            if len(counts) > MAX_TRACKED_VALUES:
+                self.values = None
+                return
+            for value, count in counts.items():
+                self.values[value] = self.values.get(value, 0) + int(count)
+            if len(self.values) > MAX_TRACKED_VALUES:
+                self.values = None
+
+    def summary(self, max_categories: int) -> Dict[str, Any]:
+        column: Dict[str, Any] = {
+            "name": self.name,
+            "dtype": self.dtype,
+            "kind": self.kind,
+            "missing": self.missing,
+            "unique": (
+                len(self.values)
+                if self.values is not None
+                else f">{MAX_TRACKED_VALUES}"
+            ),
+        }
+        if self.count:
+            mean = self.total / self.count
+            variance = max(self.total_sq / self.count - mean**2, 0.0)
+            column.update(
+                {
+                    "mean": round(mean, 4),
+                    "std": round(float(np.sqrt(variance)), 4),
+                    "min": self.minimum,
+                    "max": self.maximum,
+                }
+            )
+        elif self.kind == "datetime" and self.minimum is not None:
+            column.update({"min": str(self.minimum), "max": str(self.maximum)})
+        if self.kind in ("categorical", "boolean") and self.values:
+            top = sorted(self.values.items(), key=lambda item: -item[1])
+            # Identifier-like columns (every value distinct) have no useful top values
+            if top[0][1] > 1:
+                column["top_values"] = {str(k): v for k, v in top[:max_categories]}
+        return column
+
+
+def profile_dataset(
+    path: str,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    max_categories: int = 5,
+) -> Dict[str, Any]:
+    """
+    Compute a deterministic profile of a dataset in a single chunked pass.
+
+    The profile covers shape, dtypes, an inferred semantic kind per column
+    (numeric, currency, percent, datetime, categorical, ...), missing values,
+    distinct counts, summary statistics and duplicate rows. All statistics are
+    computed with vectorized pandas operations and merged across chunks.
+    Duplicate rows are exact up to `MAX_TRACKED_ROWS` distinct rows and
+    estimated from a hash sample of the rows beyond that.
+
+    Args:
+        path: Path to the dataset file
+        chunksize: Rows read per chunk for formats that support chunking
+        max_categories: Most frequent values reported per categorical column
+
+    Returns:
+        The dataset profile as a JSON-serializable dictionary
+    """
+    columns: Dict[str, _ColumnAccumulator] = {}
+    duplicates = _DuplicateCounter()
+    rows = 0
+    for chunk in read_chunks(path, chunksize):
+        if not columns:
+            for name in chunk.columns:
+                sample = chunk[name].dropna().head(1_000)
+                columns[name] = _ColumnAccumulator(
+                    str(name), str(chunk[name].dtype), infer_kind(sample)
+                )
+        rows += len(chunk)
+        for name, accumulator in columns.items():
+            accumulator.update(chunk[name])
+        duplicates.update(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+
+    return {
+        "path": path,
+        "format": os.path.splitext(path)[1].lstrip(".").lower(),
+        "shape": [rows, len(columns)],
+        # "~N" when estimated from a sample of the rows
+        "duplicate_rows": (
+            f"~{duplicates.duplicates}"
+            if duplicates.estimated
+            else duplicates.duplicates
+        ),
+        "columns": [
+            accumulator.summary(max_categories) for accumulator in columns.values()
+        ],
+    }
+
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    """Compact JSON rendering of a profile for task descriptions."""
+    return json.dumps(profile, separators=(",", ":"), default=str)
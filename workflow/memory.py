@@ -0,0 +1,461 @@
+"""
+Memory backends of the crew.
+
+CrewAI's built-in memory (`Crew(memory=True)`) embeds every task output with
+the provider's embedding API, writes it to a Chroma store and, after every
+task, asks the LLM to evaluate the output for its long-term memory. On a
+fixed six-stage pipeline that is mostly overhead, so the workflow can use a
+lighter mode instead:
+
+- "off": no memory at all
+- "bounded": an in-process store of the latest task outputs, searched by
+  word overlap; no embeddings, nothing on disk
+- "local": an embedded index on disk (next to the run's checkpoints) with a
+  local embedding model, so no embedding API calls
+- "crewai": CrewAI's built-in memory, as before
+
+The light modes keep short-term and entity memory but drop long-term memory,
+and with it the per-task evaluation LLM call. Every mode records the time
+and storage each task spends on memory, so modes can be compared run to run.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Dict, List
+
+import numpy as np
+
+from tools.tracing import Tracer
+
+MEMORY_MODES = ("off", "bounded", "local", "crewai")
+
+# Entries each store keeps before the oldest are dropped
+DEFAULT_MEMORY_ENTRIES = 256
+
+# Embedding model of the "local" mode, run on the CPU by fastembed
+DEFAULT_EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
+
+_WORD = re.compile(r"\w+")
+
+
+def resolve_memory_mode(memory: bool | str | None) -> str:
+    """
+    Memory mode from the workflow's `memory` argument.
+
+    True (or None) selects MEMORY_MODE, defaulting to CrewAI's memory, and
+    False turns memory off.
+    """
+    if memory is False:
+        return "off"
+    mode = memory if isinstance(memory, str) else os.getenv("MEMORY_MODE", "crewai")
+    if mode not in MEMORY_MODES:
+        raise ValueError(
+            f"Unknown memory mode '{mode}'. Choose one of: {', '.join(MEMORY_MODES)}"
+        )
+    return mode
+
+
+def _text(value: Any) -> str:
+    return value if isinstance(value, str) else str(value)
+
+
+class BoundedStore:
+    """
+    In-process memory storage keeping the latest entries, ranked by word overlap.
+
+    Implements CrewAI's storage interface (`save`, `search`, `reset`). Scores
+    are cosine similarities of word counts; they aren't comparable with
+    embedding similarities, so the caller's score threshold is not applied
+    and only entries sharing no word with the query are left out.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MEMORY_ENTRIES):
+        self.entries: deque = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _words(text: str) -> Counter:
+        return Counter(word.lower() for word in _WORD.findall(text))
+
+    def entry_bytes(self, value: Any) -> int:
+        return len(_text(value).encode("utf-8"))
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(len(entry["context"].encode("utf-8")) for entry in self.entries)
+
+    def save(self, value: Any, metadata: Dict[str, Any]) -> None:
+        text = _text(value)
+        words = self._words(text)
+        entry = {
+            "context": text,
+            "metadata": metadata or {},
+            "words": words,
+            "norm": math.sqrt(sum(count * count for count in words.values())),
+        }
+        with self._lock:
+            self.entries.append(entry)
+
+    def search(
+        self, query: str, limit: int = 3, score_threshold: float = 0.35
+    ) -> List[Dict[str, Any]]:
+        words = self._words(query)
+        norm = math.sqrt(sum(count * count for count in words.values()))
+        with self._lock:
+            entries = list(self.entries)
+        scored = []
+        for entry in entries:
+            if not norm or not entry["norm"]:
+                continue
+            overlap = sum(
+                count * entry["words"][word]
+                for word, count in words.items()
+                if word in entry["words"]
+            )
+            if overlap:
+                scored.append((overlap / (norm * entry["norm"]), entry))
+        scored.sort(key=lambda item: -item[0])
+        return [
+            {"context": entry["context"], "metadata": entry["metadata"], "score": score}
+            for score, entry in scored[:limit]
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.entries.clear()
+
+
+_embedders: Dict[str, Any] = {}
+_embedders_lock = threading.Lock()
+
+
+def _embedder(model_name: str) -> Any:
+    """Local embedding model, loaded once per process."""
+    with _embedders_lock:
+        if model_name not in _embedders:
+            try:
+                from fastembed import TextEmbedding
+            except ImportError as e:
+                raise ImportError(
+                    "The 'local' memory mode requires the 'fastembed' package"
+                ) from e
+            _embedders[model_name] = TextEmbedding(model_name)
+        return _embedders[model_name]
+
+
+class LocalIndexStore:
+    """
+    Memory storage embedding entries with a local model into an index on disk.
+
+    Implements CrewAI's storage interface. The index is a matrix of
+    normalized embeddings searched by cosine similarity, written to
+    `directory` after every save so a resumed run finds the memories of the
+    tasks it skips.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        model_name: str = DEFAULT_EMBEDDING_MODEL,
+        max_entries: int = DEFAULT_MEMORY_ENTRIES,
+        reset: bool = False,
+    ):
+        """
+        Open (or create) the index.
+
+        Args:
+            directory: Directory of the index (None keeps it in memory only)
+            model_name: fastembed model embedding the entries
+            max_entries: Entries kept before the oldest are dropped
+            reset: Start empty even if `directory` holds an index
+        """
+        self.directory = directory
+        self.model = _embedder(model_name)
+        self.max_entries = max_entries
+        self.entries: List[Dict[str, Any]] = []
+        self.vectors = None
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            if reset:
+                self.reset()
+            else:
+                self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self) -> None:
+        try:
+            with open(self._path("entries.json"), encoding="utf-8") as f:
+                entries = json.load(f)
+            vectors = np.load(self._path("vectors.npy"))
+        except (OSError, ValueError):
+            return
+        if len(entries) == len(vectors):
+            self.entries, self.vectors = entries, vectors
+
+    def _persist(self) -> None:
+        if self.directory is None:
+            return
+        # Written under temporary names first so a crash never tears the index
+        with open(self._path("vectors.npy.tmp"), "wb") as f:
+            np.save(f, self.vectors)
+        with open(self._path("entries.json.tmp"), "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(self._path("vectors.npy.tmp"), self._path("vectors.npy"))
+        os.replace(self._path("entries.json.tmp"), self._path("entries.json"))
+
+    def _embed(self, text: str):
+        vector = np.asarray(next(iter(self.model.embed([text]))), "float32")
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def entry_bytes(self, value: Any) -> int:
+        dimensions = self.vectors.shape[1] if self.vectors is not None else 0
+        return len(_text(value).encode("utf-8")) + 4 * dimensions
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            vectors = self.vectors.nbytes if self.vectors is not None else 0
+            return vectors + sum(
+                len(entry["context"].encode("utf-8")) for entry in self.entries
+            )
+
+    def save(self, value: Any, metadata: Dict[str, Any]) -> None:
+        text = _text(value)
+        vector = self._embed(text)
+        with self._lock:
+            self.entries.append(
+                {
+                    "context": text,
+                    "metadata": json.loads(json.dumps(metadata or {}, default=str)),
+                }
+            )
+            self.vectors = (
+                vector[None, :]
+                if self.vectors is None
+                else np.vstack([self.vectors, vector])
+            )
+            if len(self.entries) > self.max_entries:
+                self.entries = self.entries[-self.max_entries :]
+                self.vectors = self.vectors[-self.max_entries :]
+            self._persist()
+
+    def search(
+        self, query: str, limit: int = 3, score_threshold: float = 0.35
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self.vectors is None:
+                return []
+            entries, vectors = list(self.entries), self.vectors
+        scores = vectors @ self._embed(query)
+        ranked = np.argsort(-scores)[:limit]
+        return [
+            {**entries[i], "score": float(scores[i])}
+            for i in ranked
+            if scores[i] >= score_threshold
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.entries, self.vectors = [], None
+            if self.directory is not None:
+                for name in ("entries.json", "vectors.npy"):
+                    if os.path.exists(self._path(name)):
+                        os.remove(self._path(name))
+
+
+class MemoryStats:
+    """Time and storage each task spent on memory."""
+
+    def __init__(self):
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, task: str, operation: str, seconds: float, nbytes: int = 0):
+        with self._lock:
+            entry = self.tasks.setdefault(
+                task, {"saves": 0, "searches": 0, "seconds": 0.0, "bytes": 0}
+            )
+            entry["saves" if operation == "save" else "searches"] += 1
+            entry["seconds"] += seconds
+            entry["bytes"] += nbytes
+
+    def totals(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = list(self.tasks.values())
+        return {
+            key: sum(entry[key] for entry in entries)
+            for key in ("saves", "searches", "seconds", "bytes")
+        }
+
+
+class InstrumentedStorage:
+    """
+    Memory storage proxy timing every save and search as a span and charging
+    it, with the bytes saved, to the task running in the calling thread.
+    """
+
+    def __init__(self, storage: Any, kind: str, stats: MemoryStats, tracer: Tracer):
+        self.storage = storage
+        self.kind = kind
+        self.stats = stats
+        self.tracer = tracer
+
+    def _task(self) -> str:
+        # Task spans are opened from CrewAI's events in the task's thread
+        span = self.tracer.current()
+        return (span.attributes.get("task") if span else None) or "crew"
+
+    def save(self, value: Any, metadata: Dict[str, Any]) -> None:
+        task = self._task()
+        started = time.perf_counter()
+        with self.tracer.span("memory.save", memory=self.kind) as span:
+            self.storage.save(value, metadata)
+            # Measured after saving: the local index learns its dimensions then
+            entry_bytes = getattr(self.storage, "entry_bytes", None)
+            nbytes = entry_bytes(value) if entry_bytes else len(_text(value).encode())
+            span.set(bytes=nbytes)
+        self.stats.record(task, "save", time.perf_counter() - started, nbytes)
+
+    def search(self, query: str, limit: int = 3, score_threshold: float = 0.35):
+        task = self._task()
+        started = time.perf_counter()
+        with self.tracer.span("memory.search", memory=self.kind) as span:
+            results = self.storage.search(
+                query=query, limit=limit, score_threshold=score_threshold
+            )
+            span.set(results=len(results))
+        self.stats.record(task, "search", time.perf_counter() - started)
+        return results
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.storage, name)
+
+
+class _NoLongTermMemory:
+    """
+    Falsy stand-in for the crew's long-term memory.
+
+    CrewAI evaluates every task output with an extra LLM call only when the
+    crew has a long-term memory; the search still runs when agents build
+    their prompts, so it answers with nothing.
+    """
+
+    def __bool__(self) -> bool:
+        return False
+
+    def search(self, task: str, latest_n: int = 3) -> List[Dict[str, Any]]:
+        return []
+
+    def save(self, item: Any) -> None:
+        pass
+
+    def reset(self) -> None:
+        pass
+
+
+class CrewMemory:
+    """Memory of a workflow's crew in one of `MEMORY_MODES`."""
+
+    def __init__(
+        self,
+        mode: str,
+        tracer: Tracer,
+        directory: str | None = None,
+        max_entries: int | None = None,
+        reset: bool = True,
+    ):
+        """
+        Set up the memory.
+
+        Args:
+            mode: One of MEMORY_MODES
+            tracer: Tracer receiving the memory spans
+            directory: Where the "local" mode keeps its index (None for in memory)
+            max_entries: Entries kept per store (defaults to MEMORY_MAX_ENTRIES or 256)
+            reset: Drop the memories of an earlier run in `directory`
+        """
+        self.mode = resolve_memory_mode(mode)
+        self.tracer = tracer
+        self.stats = MemoryStats()
+        self.stores: Dict[str, Any] = {}
+        max_entries = max_entries or int(
+            os.getenv("MEMORY_MAX_ENTRIES", DEFAULT_MEMORY_ENTRIES)
+        )
+        for kind in ("short_term", "entities"):
+            if self.mode == "bounded":
+                self.stores[kind] = BoundedStore(max_entries)
+            elif self.mode == "local":
+                self.stores[kind] = LocalIndexStore(
+                    os.path.join(directory, kind) if directory else None,
+                    model_name=os.getenv(
+                        "MEMORY_EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL
+                    ),
+                    max_entries=max_entries,
+                    reset=reset,
+                )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def crew_kwargs(self) -> Dict[str, Any]:
+        """Memory arguments of the `Crew`."""
+        if not self.stores:
+            return {"memory": self.enabled}
+        from crewai.memory import EntityMemory, ShortTermMemory
+
+        return {
+            "memory": True,
+            "short_term_memory": ShortTermMemory(
+                storage=self._instrument(self.stores["short_term"], "short_term")
+            ),
+            "entity_memory": EntityMemory(
+                storage=self._instrument(self.stores["entities"], "entities")
+            ),
+        }
+
+    def _instrument(self, storage: Any, kind: str) -> InstrumentedStorage:
+        return InstrumentedStorage(storage, kind, self.stats, self.tracer)
+
+    def install(self, crew: Any) -> None:
+        """Finish setting up the memory of a crew created with `crew_kwargs`."""
+        if self.mode == "crewai":
+            # Measure CrewAI's own stores as well, so the modes can be compared
+            for attribute, kind in (
+                ("_short_term_memory", "short_term"),
+                ("_entity_memory", "entities"),
+            ):
+                memory = getattr(crew, attribute, None)
+                if memory is not None and not isinstance(
+                    memory.storage, InstrumentedStorage
+                ):
+                    memory.storage = self._instrument(memory.storage, kind)
+        elif self.stores:
+            crew._long_term_memory = _NoLongTermMemory()
+
+    @property
+    def nbytes(self) -> int | None:
+        """Bytes the stores hold, when they are known."""
+        if not self.stores:
+            return None
+        return sum(store.nbytes for store in self.stores.values())
+
+    def summary(self) -> List[str]:
+        """One line per task with the time and storage it spent on memory."""
+        lines = []
+        for task, entry in self.stats.tasks.items():
+            lines.append(
+                f"{task}: {entry['seconds']:.2f}s over {entry['saves']} save(s) and "
+                f"{entry['searches']} search(es), {entry['bytes'] / 1e3:.1f} KB stored"
+            )
+        return lines
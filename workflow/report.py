@@ -0,0 +1,372 @@
+import html
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import IO, Any, Dict, List
+
+from workflow.context_compaction import parse_structured
+
+REPORT_FORMATS = ("markdown", "json", "html")
+
+# File extension of each format, used for default report names
+REPORT_EXTENSIONS = {"markdown": ".md", "json": ".json", "html": ".html"}
+
+# Sections of the report in order: (key, title). Task sections are keyed by
+# the task whose output they show.
+REPORT_SECTIONS = (
+    ("overview", "Dataset overview"),
+    ("data_cleanup", "Data cleanup"),
+    ("data_analysis", "Analysis"),
+    ("insight_generation", "Insights"),
+    ("time_series_prediction", "Time series"),
+    ("report_creation", "Report Creator narrative"),
+    ("charts", "Charts"),
+)
+
+_PROFILE_FIELDS = ("name", "kind", "missing", "unique", "mean", "min", "max")
+
+_IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".svg")
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_cell(item) for item in value)
+    return str(value)
+
+
+def overview_section(profile: Dict[str, Any] | None, dataset_path: str) -> Dict:
+    """Section describing the dataset, from its profile."""
+    if not profile:
+        return {"data": {"dataset": dataset_path}}
+    rows, columns = profile["shape"]
+    return {
+        "data": {
+            "dataset": dataset_path,
+            "format": profile.get("format"),
+            "rows": rows,
+            "columns": columns,
+            "duplicate_rows": profile.get("duplicate_rows"),
+        },
+        "table": {
+            "columns": list(_PROFILE_FIELDS),
+            "rows": [
+                [column.get(field) for field in _PROFILE_FIELDS]
+                for column in profile["columns"]
+            ],
+        },
+    }
+
+
+def task_section(raw: str) -> Dict:
+    """Section showing a task's output: its dictionary when it returned one."""
+    structured = parse_structured(raw or "")
+    return {"data": structured} if structured is not None else {"text": raw or ""}
+
+
+def time_series_section(screening: Dict[str, Any] | None, raw: str | None) -> Dict:
+    """Section with the local time series screening and the agent's output."""
+    section = task_section(raw) if raw is not None else {}
+    if screening and screening.get("time_series_variables"):
+        section["table"] = {
+            "columns": [
+                "series",
+                "score",
+                "trend",
+                "seasonality",
+                "stationary",
+                "models",
+            ],
+            "rows": [
+                [
+                    variable["name"],
+                    variable["suitability_score"],
+                    variable["characteristics"]["trend"],
+                    variable["characteristics"]["seasonality"],
+                    variable["characteristics"]["stationary"],
+                    variable["recommended_models"],
+                ]
+                for variable in screening["time_series_variables"]
+            ],
+        }
+    return section
+
+
+def charts_section(paths: List[str]) -> Dict | None:
+    """Section showing the run's charts, or None without any."""
+    return {"images": list(paths)} if paths else None
+
+
+class _Writer(ABC):
+    def __init__(self, f: IO[str], base_dir: str):
+        self.f = f
+        self.base_dir = base_dir
+
+    def link(self, path: str) -> str:
+        """Path of an artifact relative to the report, so links survive moves."""
+        try:
+            return os.path.relpath(path, self.base_dir)
+        except ValueError:
+            return path
+
+    def begin(self, title: str) -> None:  # noqa: B027
+        """Write what precedes the sections (nothing by default)."""
+
+    @abstractmethod
+    def section(self, key: str, title: str, content: Dict) -> None:
+        """Write one section of the report."""
+
+    def end(self) -> None:  # noqa: B027
+        """Write what follows the sections (nothing by default)."""
+
+
+class _MarkdownWriter(_Writer):
+    def begin(self, title: str) -> None:
+        self.f.write(f"# {title}\n\n")
+
+    def _value(self, value: Any, depth: int = 0) -> List[str]:
+        indent = "  " * depth
+        if isinstance(value, dict):
+            lines = []
+            for key, item in value.items():
+                if isinstance(item, (dict, list)) and item:
+                    lines.append(f"{indent}- **{key}**:")
+                    lines.extend(self._value(item, depth + 1))
+                else:
+                    lines.append(f"{indent}- **{key}**: {_cell(item)}")
+            return lines
+        if isinstance(value, list):
+            lines = []
+            for item in value:
+                if not isinstance(item, (dict, list)):
+                    lines.append(f"{indent}- {_cell(item)}")
+                    continue
+                # Scalars share the item's bullet; a bullet each would nest
+                # them under the first one
+                entries = item.items() if isinstance(item, dict) else enumerate(item)
+                scalars, nested = [], {}
+                for key, entry in entries:
+                    if isinstance(entry, (dict, list)) and entry:
+                        nested[key] = entry
+                    elif isinstance(item, dict):
+                        scalars.append(f"**{key}**: {_cell(entry)}")
+                    else:
+                        scalars.append(_cell(entry))
+                lines.append(f"{indent}- " + ", ".join(scalars))
+                if isinstance(item, dict):
+                    lines.extend(self._value(nested, depth + 1))
+                else:
+                    lines.extend(self._value(list(nested.values()), depth + 1))
+            return lines
+        return [f"{indent}{_cell(value)}"]
+
+    def section(self, key: str, title: str, content: Dict) -> None:
+        parts = [f"## {title}\n"]
+        if content.get("data") is not None:
+            parts.append("\n".join(self._value(content["data"])) + "\n")
+        table = content.get("table")
+        if table:
+            escape = lambda value: _cell(value).replace("|", "\\|")  # noqa: E731
+            parts.append(
+                "\n".join(
+                    [
+                        "| " + " | ".join(table["columns"]) + " |",
+                        "|" + "---|" * len(table["columns"]),
+                    ]
+                    + [
+                        "| " + " | ".join(escape(value) for value in row) + " |"
+                        for row in table["rows"]
+                    ]
+                )
+                + "\n"
+            )
+        if content.get("text"):
+            parts.append(content["text"].strip() + "\n")
+        for path in content.get("images", []):
+            name = os.path.basename(path)
+            if path.lower().endswith(_IMAGE_EXTENSIONS):
+                parts.append(f"![{name}]({self.link(path)})\n")
+            else:
+                parts.append(f"- [{name}]({self.link(path)})\n")
+        self.f.write("\n".join(parts) + "\n")
+
+
+def _markdown_to_html(text: str) -> str:
+    try:
+        import markdown
+    except ImportError:
+        # Without the optional 'markdown' package the text is shown as is
+        return f"<pre>{html.escape(text)}</pre>"
+    return markdown.markdown(text, extensions=["tables", "fenced_code"])
+
+
+class _HtmlWriter(_Writer):
+    def begin(self, title: str) -> None:
+        self.f.write(
+            '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+            f"<title>{html.escape(title)}</title>\n"
+            "<style>body{font-family:sans-serif;max-width:1100px;margin:auto;"
+            "padding:1em}table{border-collapse:collapse}td,th{border:1px solid "
+            "#ccc;padding:4px 8px;text-align:left}img{max-width:100%}"
+            "pre{white-space:pre-wrap}</style>\n</head>\n<body>\n"
+            f"<h1>{html.escape(title)}</h1>\n"
+        )
+
+    def _value(self, value: Any) -> str:
+        if isinstance(value, dict):
+            items = "".join(
+                f"<li><strong>{html.escape(str(key))}</strong>: {self._value(item)}</li>"
+                for key, item in value.items()
+            )
+            return f"<ul>{items}</ul>"
+        if isinstance(value, list):
+            return (
+                "<ul>"
+                + "".join(f"<li>{self._value(item)}</li>" for item in value)
+                + "</ul>"
+            )
+        return html.escape(_cell(value))
+
+    def section(self, key: str, title: str, content: Dict) -> None:
+        parts = [f'<section id="{html.escape(key)}">', f"<h2>{html.escape(title)}</h2>"]
+        if content.get("data") is not None:
+            parts.append(self._value(content["data"]))
+        table = content.get("table")
+        if table:
+            header = "".join(
+                f"<th>{html.escape(name)}</th>" for name in table["columns"]
+            )
+            rows = "".join(
+                "<tr>"
+                + "".join(f"<td>{html.escape(_cell(value))}</td>" for value in row)
+                + "</tr>"
+                for row in table["rows"]
+            )
+            parts.append(f"<table><tr>{header}</tr>{rows}</table>")
+        if content.get("text"):
+            parts.append(_markdown_to_html(content["text"]))
+        for path in content.get("images", []):
+            link = html.escape(self.link(path))
+            name = html.escape(os.path.basename(path))
+            if path.lower().endswith(_IMAGE_EXTENSIONS):
+                parts.append(f'<figure><img src="{link}" alt="{name}"></figure>')
+            else:
+                parts.append(f'<p><a href="{link}">{name}</a></p>')
+        parts.append("</section>\n")
+        self.f.write("\n".join(parts))
+
+    def end(self) -> None:
+        self.f.write("</body>\n</html>\n")
+
+
+class _JsonWriter(_Writer):
+    """Writes `{"title": ..., "sections": [...]}` one section at a time."""
+
+    def begin(self, title: str) -> None:
+        self.f.write('{"title": ' + json.dumps(title) + ', "sections": [\n')
+        self.first = True
+
+    def section(self, key: str, title: str, content: Dict) -> None:
+        record = {"id": key, "title": title}
+        record.update(
+            {name: value for name, value in content.items() if name != "images"}
+        )
+        if content.get("images"):
+            record["images"] = [self.link(path) for path in content["images"]]
+        self.f.write(("" if self.first else ",\n") + json.dumps(record, default=str))
+        self.first = False
+
+    def end(self) -> None:
+        self.f.write("\n]}\n")
+
+
+_WRITERS = {"markdown": _MarkdownWriter, "html": _HtmlWriter, "json": _JsonWriter}
+
+
+class ReportRenderer:
+    """
+    Renders the final report from the tasks' outputs, without an LLM.
+
+    Sections are written to the output file in `REPORT_SECTIONS` order as
+    soon as they and every section before them are available, so the report
+    fills in while the crew runs. Sections that never arrive are left out
+    when the renderer is closed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        output_format: str = "markdown",
+        title: str = "Data Analysis Report",
+    ):
+        """
+        Open the report.
+
+        Args:
+            path: File the report is written to
+            output_format: One of REPORT_FORMATS
+            title: Title of the report
+        """
+        if output_format not in REPORT_FORMATS:
+            raise ValueError(
+                f"Unknown report format '{output_format}'. "
+                f"Choose one of: {', '.join(REPORT_FORMATS)}"
+            )
+        self.path = path
+        self.output_format = output_format
+        self.written: List[str] = []
+        self._ready: Dict[str, Dict | None] = {}
+        self._next = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        self._writer = _WRITERS[output_format](self._file, directory)
+        self._writer.begin(title)
+        self._file.flush()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def add(self, key: str, content: Dict | None) -> None:
+        """
+        Hand over a section (None when it won't be part of the report).
+
+        Args:
+            key: Section key from REPORT_SECTIONS
+            content: Any of "text", "data", "table" ({"columns", "rows"}) and
+                "images" (local paths)
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            self._ready[key] = content
+            self._flush()
+
+    def _flush(self) -> None:
+        while self._next < len(REPORT_SECTIONS):
+            key, title = REPORT_SECTIONS[self._next]
+            if key not in self._ready:
+                return
+            content = self._ready.pop(key)
+            if content:
+                self._writer.section(key, title, content)
+                self._file.flush()
+                self.written.append(key)
+            self._next += 1
+
+    def close(self) -> None:
+        """Write the sections still waiting, skipping the missing ones, and finish the file."""
+        with self._lock:
+            if self._file.closed:
+                return
+            for key, _ in REPORT_SECTIONS:
+                self._ready.setdefault(key, None)
+            self._flush()
+            self._writer.end()
+            self._file.close()
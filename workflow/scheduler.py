@@ -0,0 +1,61 @@
+from typing import Dict, List, Set
+
+
+def plan_stages(dependencies: Dict[str, List[str]]) -> List[List[str]]:
+    """
+    Group tasks into stages that can run concurrently.
+
+    Every task is placed in the earliest stage after all of its dependencies,
+    so the number of stages equals the length of the critical path.
+
+    Args:
+        dependencies: Mapping of task name to the names of the tasks it depends on,
+            in declaration order
+
+    Returns:
+        List of stages, each a list of task names in declaration order
+    """
+    unknown = {dep for deps in dependencies.values() for dep in deps} - set(
+        dependencies
+    )
+    if unknown:
+        raise ValueError(f"Unknown task dependencies: {', '.join(sorted(unknown))}")
+
+    stages: List[List[str]] = []
+    placed: Set[str] = set()
+    remaining = list(dependencies)
+    while remaining:
+        stage = [
+            name
+            for name in remaining
+            if all(dep in placed for dep in dependencies[name])
+        ]
+        if not stage:
+            raise ValueError(
+                f"Task dependencies contain a cycle: {', '.join(remaining)}"
+            )
+        stages.append(stage)
+        placed.update(stage)
+        remaining = [name for name in remaining if name not in placed]
+    return stages
+
+
+def concurrent_tasks(stages: List[List[str]]) -> Set[str]:
+    """
+    Names of the tasks to run with `async_execution=True`.
+
+    CrewAI starts consecutive asynchronous tasks together and waits for all of
+    them at the next synchronous task. A multi-task stage therefore runs
+    concurrently unless that would break CrewAI's rules: the stage right after
+    a concurrent stage, and a multi-task final stage, run sequentially instead.
+    """
+    concurrent: Set[str] = set()
+    previous_concurrent = False
+    for index, stage in enumerate(stages):
+        is_last = index == len(stages) - 1
+        if len(stage) > 1 and not previous_concurrent and not is_last:
+            concurrent.update(stage)
+            previous_concurrent = True
+        else:
+            previous_concurrent = False
+    return concurrent
@@ -0,0 +1,356 @@
+import json
+import re
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from workflow.dataset_profiler import (
+    DEFAULT_CHUNKSIZE,
+    infer_kind,
+    read_chunks,
+    to_numeric,
+)
+
+# Resampling frequencies, finest first:
+# (pandas period alias, name, period name, seasonal period)
+FREQUENCIES = (
+    ("D", "daily", "day", 7),
+    ("W", "weekly", "week", 52),
+    ("M", "monthly", "month", 12),
+    ("Q", "quarterly", "quarter", 4),
+)
+
+# Periods a series needs before it is screened at all
+MIN_PERIODS = 12
+
+# A frequency is used when this share of its periods has observations...
+MIN_COVERAGE = 0.9
+
+# ...and its non-empty periods hold this many rows on average
+MIN_ROWS_PER_PERIOD = 5
+
+# 5% critical value of the KPSS level-stationarity test (Kwiatkowski et al., 1992)
+KPSS_CRITICAL_5PCT = 0.463
+
+# Strength (R² of a linear trend, autocorrelation at the seasonal lag) from
+# which a trend or seasonality is reported
+STRENGTH_THRESHOLD = 0.3
+
+_MEASURE_KINDS = ("numeric", "currency", "percent", "numeric_text")
+
+_IDENTIFIER = re.compile(r"(^|[_\s])id$", re.IGNORECASE)
+
+
+def _adf_critical_5pct(n: int) -> float:
+    """MacKinnon (2010) 5% critical value of the ADF test with a constant."""
+    return -2.8621 - 2.738 / n - 8.36 / n**2
+
+
+def _choose_frequency(days: pd.DatetimeIndex, rows: int) -> tuple | None:
+    """Finest frequency whose periods are consistently populated, or None."""
+    for alias, name, unit, season in FREQUENCIES:
+        ordinals = pd.PeriodIndex(days, freq=alias).asi8
+        periods = int(ordinals.max() - ordinals.min()) + 1
+        if periods < MIN_PERIODS:
+            return None
+        filled = len(np.unique(ordinals))
+        if filled / periods >= MIN_COVERAGE and rows / filled >= MIN_ROWS_PER_PERIOD:
+            return alias, name, unit, season
+    return None
+
+
+def _daily_totals(
+    dates: pd.Series, values: pd.DataFrame, measures: Dict[str, str]
+) -> pd.DataFrame:
+    """
+    Row count and measure sums per day of one chunk.
+
+    Percentages also get their number of values per day, so their mean can
+    be taken once the days are resampled.
+    """
+    valid = dates.notna().to_numpy()
+    columns = {("rows", ""): np.ones(int(valid.sum()))}
+    for name, kind in measures.items():
+        column = values[name].to_numpy("float64")[valid]
+        columns[("sum", name)] = column
+        if kind == "percent":
+            columns[("count", name)] = (~np.isnan(column)).astype("float64")
+    days = dates[valid].dt.normalize().to_numpy()
+    return pd.DataFrame(columns).groupby(days).sum()
+
+
+def _trend(Y: np.ndarray) -> tuple:
+    """Slope and R² of a linear trend, and the detrended residuals, per column."""
+    t = np.arange(len(Y), dtype="float64")
+    t -= t.mean()
+    centered = Y - Y.mean(axis=0)
+    slope = t @ centered / (t @ t)
+    residuals = centered - np.outer(t, slope)
+    total = (centered**2).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = np.where(total > 0, 1 - (residuals**2).sum(axis=0) / total, 0.0)
+    return slope, r2, residuals
+
+
+def _autocorrelation(R: np.ndarray, lag: int) -> np.ndarray:
+    """Autocorrelation of each column of (centered) `R` at `lag`."""
+    if len(R) <= lag:
+        return np.zeros(R.shape[1])
+    total = (R**2).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, (R[lag:] * R[:-lag]).sum(axis=0) / total, 0.0)
+
+
+def _adf(Y: np.ndarray) -> tuple:
+    """
+    Augmented Dickey-Fuller statistic of every column, with a constant.
+
+    All series share a length, so the regressions of
+    Δy_t = a + b·y_{t-1} + Σ c_i·Δy_{t-i} are solved as one batch.
+    """
+    T, K = Y.shape
+    lags = int(np.floor((T - 1) ** (1 / 3)))
+    dy = np.diff(Y, axis=0)
+    n = T - 1 - lags
+    regressors = [np.ones((n, K)), Y[lags:-1]] + [
+        dy[lags - i : T - 1 - i] for i in range(1, lags + 1)
+    ]
+    X = np.stack(regressors, axis=-1).transpose(1, 0, 2)  # K x n x p
+    y = dy[lags:].T  # K x n
+    XtX_inv = np.linalg.pinv(np.einsum("knp,knq->kpq", X, X))
+    beta = np.einsum("kpq,knq,kn->kp", XtX_inv, X, y)
+    residuals = y - np.einsum("knp,kp->kn", X, beta)
+    dof = max(n - X.shape[2], 1)
+    variance = (residuals**2).sum(axis=1) / dof * XtX_inv[:, 1, 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = np.where(variance > 0, beta[:, 1] / np.sqrt(variance), np.nan)
+    return statistic, _adf_critical_5pct(n)
+
+
+def _kpss(Y: np.ndarray) -> np.ndarray:
+    """KPSS level-stationarity statistic of every column (Bartlett long-run variance)."""
+    T = len(Y)
+    lags = int(np.ceil(4 * (T / 100) ** 0.25))
+    e = Y - Y.mean(axis=0)
+    partial = np.cumsum(e, axis=0)
+    long_run = (e**2).sum(axis=0) / T
+    for j in range(1, min(lags, T - 1) + 1):
+        weight = 1 - j / (lags + 1)
+        long_run = long_run + 2 * weight * (e[j:] * e[:-j]).sum(axis=0) / T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            long_run > 0, (partial**2).sum(axis=0) / (T**2 * long_run), np.nan
+        )
+
+
+def _recommend(
+    periods: int, season: int, trend: bool, seasonal: bool, stationary: bool | None
+) -> List[str]:
+    if periods < 2 * season and periods < 24:
+        return ["Naive / moving-average baseline", "Simple exponential smoothing"]
+    if seasonal:
+        return ["SARIMA", "Holt-Winters (ETS)", "Prophet"]
+    if trend or stationary is False:
+        return ["ARIMA (differenced)", "Holt's linear trend", "Prophet"]
+    return ["ARIMA", "Simple exponential smoothing", "Gradient boosting on lags"]
+
+
+def _horizon(periods: int) -> str:
+    if periods < 36:
+        return "short-term"
+    if periods < 104:
+        return "medium-term"
+    return "long-term"
+
+
+def _screen(totals: pd.DataFrame, date_column: str, measures: Dict[str, str]) -> tuple:
+    """Resample the daily totals of one date column and screen every series."""
+    chosen = _choose_frequency(totals.index, int(totals[("rows", "")].sum()))
+    if chosen is None:
+        return None, []
+    alias, frequency, unit, season = chosen
+
+    ordinals = pd.PeriodIndex(totals.index, freq=alias).asi8
+    bucket = ordinals - ordinals.min()
+    periods = int(bucket.max()) + 1
+    grouped = totals.groupby(bucket).sum().reindex(range(periods), fill_value=0)
+    columns = {"row count": grouped[("rows", "")]}
+    aggregations = {"row count": "count"}
+    for name, kind in measures.items():
+        # Percentages are rates, so they are averaged; other measures add up
+        if kind == "percent":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                means = grouped[("sum", name)] / grouped[("count", name)]
+            series = means.where(grouped[("count", name)] > 0).ffill().bfill()
+            aggregations[name] = "mean"
+        else:
+            series = grouped[("sum", name)]
+            aggregations[name] = "sum"
+        columns[name] = series
+    names = list(columns)
+    Y = np.column_stack([columns[name].to_numpy("float64") for name in names])
+    Y = np.nan_to_num(Y)
+
+    # Every statistic is computed for all series of the date column at once
+    slope, trend_r2, residuals = _trend(Y)
+    seasonal_acf = _autocorrelation(residuals, season)
+    lag1_acf = _autocorrelation(Y - Y.mean(axis=0), 1)
+    adf, adf_critical = _adf(Y)
+    kpss = _kpss(Y)
+    means = Y.mean(axis=0)
+    constant = Y.std(axis=0) == 0
+    coverage = (Y != 0).mean(axis=0)
+
+    start = pd.Period(ordinal=int(ordinals.min()), freq=alias)
+    info = {
+        "frequency": frequency,
+        "periods": periods,
+        "start": str(start),
+        "end": str(start + periods - 1),
+    }
+    variables = []
+    for k, measure in enumerate(names):
+        if constant[k]:
+            continue
+        trend = bool(trend_r2[k] >= STRENGTH_THRESHOLD)
+        seasonal = bool(periods >= 2 * season and seasonal_acf[k] >= STRENGTH_THRESHOLD)
+        adf_rejects = bool(np.isfinite(adf[k]) and adf[k] < adf_critical)
+        kpss_rejects = bool(np.isfinite(kpss[k]) and kpss[k] > KPSS_CRITICAL_5PCT)
+        # Stationary when ADF rejects a unit root and KPSS doesn't reject
+        # stationarity, non-stationary in the opposite case
+        stationary = (
+            True
+            if adf_rejects and not kpss_rejects
+            else False if kpss_rejects and not adf_rejects else None
+        )
+        signal = float(
+            np.clip(max(trend_r2[k], seasonal_acf[k], abs(lag1_acf[k])), 0.0, 1.0)
+        )
+        score = 10 * (0.35 * min(periods / 48, 1.0) + 0.15 * coverage[k] + 0.5 * signal)
+        name = (
+            f"rows per {unit} of {date_column}"
+            if measure == "row count"
+            else f"{measure} ({aggregations[measure]}) per {unit} of {date_column}"
+        )
+        variables.append(
+            {
+                "name": name,
+                "date_column": date_column,
+                "measure": measure,
+                "aggregation": aggregations[measure],
+                "suitability_score": round(float(score), 1),
+                "characteristics": {
+                    "trend": trend,
+                    "trend_strength": round(float(trend_r2[k]), 3),
+                    "trend_slope_per_period": round(float(slope[k]), 4),
+                    "seasonality": seasonal,
+                    "seasonal_period": season,
+                    "seasonal_strength": round(float(seasonal_acf[k]), 3),
+                    "lag1_autocorrelation": round(float(lag1_acf[k]), 3),
+                    "stationary": stationary,
+                    "adf_statistic": round(float(adf[k]), 3),
+                    "adf_critical_5pct": round(float(adf_critical), 3),
+                    "kpss_statistic": round(float(kpss[k]), 3),
+                    "kpss_critical_5pct": KPSS_CRITICAL_5PCT,
+                    "mean": round(float(means[k]), 4),
+                    "nonzero_share": round(float(coverage[k]), 3),
+                },
+                "recommended_models": _recommend(
+                    periods, season, trend, seasonal, stationary
+                ),
+                "prediction_horizon": _horizon(periods),
+            }
+        )
+    return info, variables
+
+
+def detect_time_series(
+    path: str,
+    profile: Dict[str, Any] | None = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    max_series: int = 12,
+) -> Dict[str, Any]:
+    """
+    Detect the dataset's time series and screen them for forecasting.
+
+    Date-like columns (per the profile's column kinds) are each used as a
+    time axis. The row count and every numeric measure are resampled along
+    it at the finest consistently populated frequency (daily, weekly,
+    monthly or quarterly), and each resulting series gets a linear trend
+    strength, a seasonal autocorrelation, ADF and KPSS stationarity tests
+    and a 0-10 suitability score. The file is reduced to daily totals chunk
+    by chunk, so memory is bounded by the number of distinct days. Statistics
+    are computed with numpy for all series of a date column at once, so the
+    result is deterministic.
+
+    Args:
+        path: Path to the dataset file
+        profile: Profile of the dataset from `profile_dataset`, reused for column kinds
+        chunksize: Rows read per chunk; each chunk is reduced to daily totals
+        max_series: Series reported, best suitability first
+
+    Returns:
+        The screening, with `time_series_variables` in the format the time
+        series task expects
+    """
+    kinds = {
+        column["name"]: column["kind"] for column in (profile or {}).get("columns", [])
+    }
+    # Each chunk is reduced to per-day totals of every date column, so memory
+    # is bounded by the number of distinct days rather than rows
+    date_columns: List[str] = []
+    measures: Dict[str, str] = {}
+    totals: Dict[str, pd.DataFrame] = {}
+    for chunk in read_chunks(path, chunksize):
+        if not kinds:
+            for column in chunk.columns:
+                kinds[str(column)] = infer_kind(chunk[column].dropna().head(1_000))
+        if not date_columns:
+            date_columns = [
+                str(column)
+                for column in chunk.columns
+                if kinds.get(str(column)) == "datetime"
+            ]
+            measures = {
+                str(column): kinds[str(column)]
+                for column in chunk.columns
+                if kinds.get(str(column)) in _MEASURE_KINDS
+                and not _IDENTIFIER.search(str(column))
+            }
+            if not date_columns:
+                break
+        chunk.columns = [str(column) for column in chunk.columns]
+        values = pd.DataFrame(
+            {name: to_numeric(chunk[name], kind) for name, kind in measures.items()},
+            index=chunk.index,
+        )
+        for date_column in date_columns:
+            dates = pd.to_datetime(chunk[date_column], errors="coerce", format="mixed")
+            daily = _daily_totals(dates, values, measures)
+            if date_column in totals:
+                daily = totals[date_column].add(daily, fill_value=0)
+            totals[date_column] = daily
+
+    axes: Dict[str, Any] = {}
+    variables: List[Dict[str, Any]] = []
+    for date_column in date_columns:
+        info, found = None, []
+        if date_column in totals and not totals[date_column].empty:
+            info, found = _screen(totals[date_column], date_column, measures)
+        if info is None:
+            axes[date_column] = {"skipped": "too few or too sparse periods"}
+            continue
+        axes[date_column] = info
+        variables.extend(found)
+    variables.sort(key=lambda variable: -variable["suitability_score"])
+    return {
+        "date_columns": axes,
+        "series_screened": len(variables),
+        "time_series_variables": variables[:max_series],
+    }
+
+
+def format_time_series(screening: Dict[str, Any]) -> str:
+    """Compact JSON rendering of a screening for task descriptions."""
+    return json.dumps(screening, separators=(",", ":"), default=str)